@@ -8,19 +8,34 @@ Capabilities:
 - Search user entries and (optionally) the base graph in both languages.
 """
 import argparse
+import csv
+import json
 import sqlite3
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import torch
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from sentence_transformers import SentenceTransformer
 
-from ai_initializer import CJK_RE, MODEL_NAME, ensure_tables, query_from_db
+from ai_initializer import (
+    CJK_RE,
+    MODEL_NAME,
+    UPSERT_TRANSLATION_EDGE,
+    ensure_lookup_indexes,
+    ensure_tables,
+    get_model,
+    query_from_db,
+)
+from embed_cache import EmbeddingCache, default_cache_path, shared_cache
 
 
 USER_SOURCE = "user"
+EMBED_BATCH = 256
+IMPORT_FIELDS = ("en", "zh", "meaning_en", "meaning_zh")
+IMPORT_ALIASES = {"en_term": "en", "zh_term": "zh", "english": "en", "chinese": "zh"}
 
 
 @dataclass
@@ -70,6 +85,37 @@ def ensure_user_tables(conn: sqlite3.Connection):
         END;
         """
     )
+    # one normalized vector per entry (of build_user_text); edits and deletes drop it so it gets re-encoded
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_vocab_embedding(
+            entry_id INTEGER PRIMARY KEY,
+            model TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_user_vocab_embedding_stale
+        AFTER UPDATE OF en_term, zh_term, meaning_en, meaning_zh ON user_vocab
+        FOR EACH ROW
+        BEGIN
+            DELETE FROM user_vocab_embedding WHERE entry_id = OLD.id;
+        END;
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_user_vocab_embedding_delete
+        AFTER DELETE ON user_vocab
+        FOR EACH ROW
+        BEGIN
+            DELETE FROM user_vocab_embedding WHERE entry_id = OLD.id;
+        END;
+        """
+    )
     conn.commit()
 
 
@@ -86,6 +132,8 @@ def ensure_db(db_path: Path, sql_seed: Optional[Path]):
         seed_from_sql(conn, sql_seed)
     ensure_tables(conn)
     ensure_user_tables(conn)
+    if sql_seed and first_time:
+        ensure_lookup_indexes(conn)
     conn.close()
 
 
@@ -107,17 +155,19 @@ def attach_translation(conn: sqlite3.Connection, en_term: Optional[str], zh_term
     if not en_term or not zh_term:
         return
     cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT OR REPLACE INTO translation_edge(en_term, zh_term, score, source)
-        VALUES (?, ?, ?, ?)
-        """,
-        (normalize(en_term, "en"), normalize(zh_term, "zh"), score, USER_SOURCE),
-    )
+    # an upsert, not OR REPLACE: the trigram index on translation_edge needs the update trigger
+    cur.execute(UPSERT_TRANSLATION_EDGE, (normalize(en_term, "en"), normalize(zh_term, "zh"), score, USER_SOURCE))
     conn.commit()
 
 
-def add_entry(db_path: Path, en_term: Optional[str], zh_term: Optional[str], meaning_en: Optional[str], meaning_zh: Optional[str]) -> int:
+def add_entry(
+    db_path: Path,
+    en_term: Optional[str],
+    zh_term: Optional[str],
+    meaning_en: Optional[str],
+    meaning_zh: Optional[str],
+    model: Optional[SentenceTransformer] = None,
+) -> int:
     if not en_term and not zh_term:
         raise ValueError("Provide at least one of --en or --zh")
     conn = sqlite3.connect(db_path)
@@ -136,10 +186,92 @@ def add_entry(db_path: Path, en_term: Optional[str], zh_term: Optional[str], mea
     row_id = cur.lastrowid
     upsert_terms(conn, [en_term, zh_term])
     attach_translation(conn, en_term, zh_term)
+    if model is not None:
+        entry = UserEntry(row_id, en_term or "", zh_term or "", meaning_en or "", meaning_zh or "")
+        store_entry_embeddings(conn, [entry], model)
     conn.close()
     return row_id
 
 
+def _clean_field(value) -> str:
+    # CSV_FORMAT_GUIDELINES.md: trim ASCII spaces/tabs and the full-width space
+    return str(value).strip(" \t\u3000") if value is not None else ""
+
+
+def _import_row(record: dict) -> Tuple[str, str, str, str]:
+    fields = {IMPORT_ALIASES.get(k.strip(), k.strip()): v for k, v in record.items() if k}
+    return tuple(_clean_field(fields.get(name)) for name in IMPORT_FIELDS)
+
+
+def iter_import_rows(path: Path, fmt: str = "auto") -> Iterator[Tuple[str, str, str, str]]:
+    """Stream (en, zh, meaning_en, meaning_zh) from a CSV with a header row or from NDJSON."""
+    if fmt == "auto":
+        fmt = "ndjson" if path.suffix.lower() in {".ndjson", ".jsonl"} else "csv"
+    with path.open(encoding="utf-8", newline="") as f:
+        if fmt == "ndjson":
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _import_row(json.loads(line))
+            return
+        lines = (line for line in f if not line.lstrip().startswith("#"))
+        for record in csv.DictReader(lines, skipinitialspace=True):
+            yield _import_row(record)
+
+
+def import_entries(
+    db_path: Path,
+    rows: Iterable[Tuple[str, str, str, str]],
+    batch_size: int = 1000,
+    model: Optional[SentenceTransformer] = None,
+) -> Dict[str, float]:
+    """Insert rows in batched transactions; terms and translation edges are upserted once per batch."""
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    ensure_tables(conn)
+    ensure_user_tables(conn)
+    imported = skipped = 0
+    rows = iter(rows)
+    while True:
+        batch = [r for r in (next(rows, None) for _ in range(batch_size)) if r is not None]
+        if not batch:
+            break
+        now = datetime.utcnow().isoformat()
+        entries: List[UserEntry] = []
+        terms = set()
+        translations = set()
+        with conn:
+            cur = conn.cursor()
+            for en_term, zh_term, meaning_en, meaning_zh in batch:
+                if not en_term and not zh_term:
+                    skipped += 1
+                    continue
+                cur.execute(
+                    """
+                    INSERT INTO user_vocab(en_term, zh_term, meaning_en, meaning_zh, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (en_term, zh_term, meaning_en, meaning_zh, now, now),
+                )
+                entries.append(UserEntry(cur.lastrowid, en_term, zh_term, meaning_en, meaning_zh))
+                for term in (en_term, zh_term):
+                    if term:
+                        lang = "zh" if CJK_RE.search(term) else "en"
+                        terms.add((normalize(term, lang), lang))
+                if en_term and zh_term:
+                    translations.add((normalize(en_term, "en"), normalize(zh_term, "zh")))
+            cur.executemany("INSERT OR IGNORE INTO terms(term, language) VALUES (?, ?)", sorted(terms))
+            cur.executemany(
+                UPSERT_TRANSLATION_EDGE, [(en, zh, 1.0, USER_SOURCE) for en, zh in sorted(translations)]
+            )
+        if model is not None:
+            store_entry_embeddings(conn, entries, model)
+        imported += len(entries)
+    conn.close()
+    dt = time.perf_counter() - t0
+    return {"imported": imported, "skipped": skipped, "seconds": dt, "rows_per_sec": imported / dt if dt else 0.0}
+
+
 def load_user_entries(conn: sqlite3.Connection) -> List[UserEntry]:
     cur = conn.cursor()
     cur.execute("SELECT id, en_term, zh_term, meaning_en, meaning_zh FROM user_vocab")
@@ -155,26 +287,88 @@ def build_user_text(entry: UserEntry) -> str:
     return " | ".join(parts)
 
 
-def search_user_entries(db_path: Path, query_text: str, topk: int, model: SentenceTransformer) -> List[dict]:
+def store_entry_embeddings(conn: sqlite3.Connection, entries: List[UserEntry], model: SentenceTransformer):
+    if not entries:
+        return
+    vecs = model.encode(
+        [build_user_text(e) for e in entries], convert_to_numpy=True, normalize_embeddings=True, batch_size=EMBED_BATCH
+    )
+    vecs = np.asarray(vecs, dtype=np.float32)
+    conn.executemany(
+        "INSERT OR REPLACE INTO user_vocab_embedding(entry_id, model, dim, vector) VALUES (?, ?, ?, ?)",
+        [(e.id, MODEL_NAME, int(v.shape[0]), v.tobytes()) for e, v in zip(entries, vecs)],
+    )
+    conn.commit()
+
+
+def backfill_entry_embeddings(conn: sqlite3.Connection, model: SentenceTransformer, batch_size: int = EMBED_BATCH) -> int:
+    """Encode entries that have no (current-model) vector yet, batch_size at a time."""
+    done = 0
+    while True:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT u.id, u.en_term, u.zh_term, u.meaning_en, u.meaning_zh
+            FROM user_vocab u
+            LEFT JOIN user_vocab_embedding e ON e.entry_id = u.id AND e.model = ?
+            WHERE e.entry_id IS NULL
+            LIMIT ?
+            """,
+            (MODEL_NAME, batch_size),
+        )
+        batch = [UserEntry(*row) for row in cur.fetchall()]
+        if not batch:
+            return done
+        store_entry_embeddings(conn, batch, model)
+        done += len(batch)
+
+
+def load_entry_matrix(conn: sqlite3.Connection):
+    """(entry ids, (N, dim) matrix) of the stored vectors for MODEL_NAME."""
+    rows = conn.execute(
+        "SELECT entry_id, dim, vector FROM user_vocab_embedding WHERE model = ? ORDER BY entry_id", (MODEL_NAME,)
+    ).fetchall()
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    matrix = np.frombuffer(b"".join(r[2] for r in rows), dtype=np.float32).reshape(len(rows), rows[0][1])
+    return ids, matrix
+
+
+def search_user_entries(
+    db_path: Path, query_text: str, topk: int, model: SentenceTransformer, cache: Optional[EmbeddingCache] = None
+) -> List[dict]:
+    """One query encode + one matrix-vector product over the stored entry vectors."""
     conn = sqlite3.connect(db_path)
     ensure_user_tables(conn)
-    entries = load_user_entries(conn)
-    conn.close()
-    if not entries:
+    backfill_entry_embeddings(conn, model)
+    ids, matrix = load_entry_matrix(conn)
+    if not ids.size:
+        conn.close()
         return []
-    texts = [build_user_text(e) for e in entries]
-    query_vec = model.encode([query_text], convert_to_tensor=True, normalize_embeddings=True)
-    entry_vecs = model.encode(texts, convert_to_tensor=True, normalize_embeddings=True)
-    scores = util.cos_sim(query_vec, entry_vecs)[0]
+    if cache is None:
+        cache = shared_cache(default_cache_path(db_path), MODEL_NAME)
+    scores = matrix @ cache.encode([query_text], model)[0]
     k = min(topk, scores.shape[0])
-    values, indices = torch.topk(scores, k)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    top_ids = [int(ids[i]) for i in top]
+    placeholders = ",".join("?" * len(top_ids))
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT id, en_term, zh_term, meaning_en, meaning_zh FROM user_vocab WHERE id IN ({placeholders})", top_ids
+    )
+    by_id = {row[0]: UserEntry(*row) for row in cur.fetchall()}
+    conn.close()
     results = []
-    for val, idx in zip(values.tolist(), indices.tolist()):
-        entry = entries[idx]
+    for idx in top:
+        entry = by_id.get(int(ids[idx]))
+        if entry is None:
+            continue
         results.append(
             {
                 "source": "user",
-                "score": float(val),
+                "score": float(scores[idx]),
                 "en_term": entry.en_term,
                 "zh_term": entry.zh_term,
                 "meaning_en": entry.meaning_en,
@@ -190,7 +384,7 @@ def search_base(db_path: Path, text: str, language: str, topk: int) -> List[dict
 
 
 def run_search(db_path: Path, text: str, language: str, topk: int, include_base: bool) -> List[dict]:
-    model = SentenceTransformer(MODEL_NAME)
+    model = get_model()
     results = search_user_entries(db_path, text, topk, model)
 
     lang = language
@@ -245,6 +439,9 @@ def main():
     p_add.add_argument("--zh", help="Chinese term")
     p_add.add_argument("--meaning-en", help="Meaning in English")
     p_add.add_argument("--meaning-zh", help="Meaning in Chinese")
+    p_add.add_argument(
+        "--no-embed", action="store_true", help="Skip encoding the entry now (search backfills it later)"
+    )
 
     p_search = sub.add_parser("search", help="Search user vocab (and optionally base DB)")
     p_search.add_argument("--text", required=True, help="Query text")
@@ -252,6 +449,12 @@ def main():
     p_search.add_argument("--topk", type=int, default=10, help="Number of results to return")
     p_search.add_argument("--include-base", action="store_true", help="Also search the base DB tables")
 
+    p_import = sub.add_parser("import", help="Bulk-add entries from a CSV (header: en,zh,meaning_en,meaning_zh) or NDJSON")
+    p_import.add_argument("path", type=Path, help="Input file")
+    p_import.add_argument("--format", choices=["auto", "csv", "ndjson"], default="auto", help="Input format")
+    p_import.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction")
+    p_import.add_argument("--embed", action="store_true", help="Also encode entry vectors for search, in batches")
+
     p_list = sub.add_parser("list", help="List recent user entries")
     p_list.add_argument("--limit", type=int, default=10, help="Rows to show")
 
@@ -264,10 +467,20 @@ def main():
         return
 
     if args.cmd == "add":
-        row_id = add_entry(db_path, args.en, args.zh, args.meaning_en, args.meaning_zh)
+        model = None if args.no_embed else get_model()
+        row_id = add_entry(db_path, args.en, args.zh, args.meaning_en, args.meaning_zh, model)
         print(f"Inserted entry #{row_id}")
         return
 
+    if args.cmd == "import":
+        model = get_model() if args.embed else None
+        stats = import_entries(db_path, iter_import_rows(args.path, args.format), args.batch_size, model)
+        print(
+            f"Imported {stats['imported']} entries ({stats['skipped']} skipped) in {stats['seconds']:.2f}s "
+            f"({stats['rows_per_sec']:.0f} rows/s)"
+        )
+        return
+
     if args.cmd == "search":
         results = run_search(db_path, args.text, args.language, args.topk, args.include_base)
         for hit in results:
@@ -153,8 +153,10 @@ void FastVocabService::ensure_term(const string &term, const string &lang) {
 }
 
 void FastVocabService::upsert_translation_edge(const string &en_term, const string &zh_term, double score) {
+    // upsert rather than OR REPLACE, so the update trigger keeps translation_edge_trgm in step
     static const char *SQL =
-        "INSERT OR REPLACE INTO translation_edge(en_term, zh_term, score, source) VALUES (?, ?, ?, 'user');";
+        "INSERT INTO translation_edge(en_term, zh_term, score, source) VALUES (?, ?, ?, 'user') "
+        "ON CONFLICT(en_term, zh_term, source) DO UPDATE SET score = excluded.score;";
     sqlite3_stmt *stmt = nullptr;
     if (sqlite3_prepare_v2(db_, SQL, -1, &stmt, nullptr) != SQLITE_OK) return;
     sqlite3_bind_text(stmt, 1, en_term.c_str(), -1, SQLITE_TRANSIENT);
@@ -1,14 +1,28 @@
 import argparse
-import csv
-import re
+import hashlib
+import json
+import os
+import shutil
 import sqlite3
-from itertools import combinations
+import time
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
+import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer, util
 
+from embed_cache import EmbeddingCache, default_cache_path, shared_cache
+from source_parse import (
+    CJK_RE,
+    iter_en_synonym_groups,
+    iter_parsed_parallel,
+    iter_translation_pairs,
+    iter_zh_synonym_groups,
+    plan_workers,
+)
+
 # Data locations
 DATA_ROOT = Path("Unchanged-Databases")
 EN_SYNONYMS = DATA_ROOT / "English_Thesaurus" / "WordnetThesaurus.csv"
@@ -20,58 +34,79 @@ MODEL_NAME = "intfloat/multilingual-e5-small"
 SYN_THRESHOLD = 0.62
 TRANS_THRESHOLD = 0.48
 BATCH_SIZE = 256
+MEMORY_BUDGET_MB = 1024
 
-CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_MODELS: Dict[str, SentenceTransformer] = {}
+_WORKER_MODEL = None
 
 
-def clean_translation_field(raw: str) -> List[str]:
-    """Parse the translation column into candidate Chinese terms."""
-    raw = re.sub(r"\[.*?\]|\(.*?\)", "", raw)
-    raw = raw.replace("\u3000", " ")  # full-width space
-    raw = re.sub(r"[;\uFF1B/\u3001]+", ",", raw)
-    out: List[str] = []
-    for part in raw.split(","):
-        tok = part.strip()
-        if not tok or not CJK_RE.search(tok):
-            continue
-        punct_ratio = sum(ch in ".,;\uFF0C\u3001/()[]" for ch in tok) / len(tok)
-        if punct_ratio > 0.3 or len(tok) > 30:
-            continue
-        out.append(tok)
-    return out
+def get_model(model_name: str = MODEL_NAME) -> SentenceTransformer:
+    """Load each SentenceTransformer at most once per process."""
+    if model_name not in _MODELS:
+        _MODELS[model_name] = SentenceTransformer(model_name)
+    return _MODELS[model_name]
 
 
-def iter_en_synonym_groups(path: Path) -> Iterable[List[str]]:
-    with path.open(newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            tokens = [col.strip().lower() for col in row if col.strip()]
-            if len(tokens) > 1:
-                yield tokens
+def _init_encode_worker(model_name: str, threads: int):
+    global _WORKER_MODEL
+    torch.set_num_threads(threads)
+    _WORKER_MODEL = SentenceTransformer(model_name)
 
 
-def iter_zh_synonym_groups(path: Path) -> Iterable[List[str]]:
-    with path.open(encoding="utf-8") as f:
-        for raw in f:
-            tokens = [p.strip().lower() for p in re.split(r"[,\uFF0C\s]+", raw) if p.strip()]
-            if len(tokens) > 1:
-                yield tokens
-
-
-def iter_translation_pairs(path: Path) -> Iterable[Tuple[str, str]]:
-    with path.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            en = (row.get("word") or "").strip().lower()
-            if not en:
-                continue
-            for zh in clean_translation_field(row.get("translation", "")):
-                yield en, zh
+def _encode_chunk(chunk: List[str]):
+    return chunk, _WORKER_MODEL.encode(chunk, convert_to_numpy=True, normalize_embeddings=True)
+
 
+def iter_batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
 
-def encode_terms(terms: Sequence[str], model: SentenceTransformer) -> Dict[str, torch.Tensor]:
-    """Embed all terms with normalization and return a term->vector map."""
+
+def iter_encoded_chunks(terms: Iterable[str], workers: int, model_name: str = MODEL_NAME):
+    """
+    Shard terms across a process pool; every worker loads its own model with a pinned
+    torch thread count. Yields (chunk_terms, numpy_vectors) in input order.
+    """
+    import multiprocessing as mp
+
+    n_proc, threads = plan_workers(workers)
+    chunks = iter_batches(terms, BATCH_SIZE)
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(processes=n_proc, initializer=_init_encode_worker, initargs=(model_name, threads)) as pool:
+        for chunk, vecs in pool.imap(_encode_chunk, chunks):
+            yield chunk, vecs
+
+
+def encode_terms(
+    terms: Sequence[str],
+    model: Optional[SentenceTransformer] = None,
+    workers: int = 1,
+    cache: Optional[EmbeddingCache] = None,
+) -> Dict[str, torch.Tensor]:
+    """Embed all terms with normalization and return a term->vector map.
+
+    workers != 1 encodes through a process pool (workers <= 0 uses every core) and
+    never loads the model in this process; otherwise an EmbeddingCache, if given,
+    serves known terms and stores new ones. model defaults to get_model().
+    """
     out: Dict[str, torch.Tensor] = {}
+    if workers != 1 and len(terms) > BATCH_SIZE:
+        for chunk, vecs in iter_encoded_chunks(terms, workers):
+            for term, vec in zip(chunk, torch.from_numpy(vecs)):
+                out[term] = vec
+        return out
+    if model is None:
+        model = get_model()
+    if cache is not None and workers == 1:
+        for i in range(0, len(terms), BATCH_SIZE):
+            chunk = terms[i : i + BATCH_SIZE]
+            for term, vec in zip(chunk, torch.from_numpy(cache.encode(chunk, model, BATCH_SIZE))):
+                out[term] = vec
+        return out
     for i in range(0, len(terms), BATCH_SIZE):
         chunk = terms[i : i + BATCH_SIZE]
         vecs = model.encode(chunk, convert_to_tensor=True, normalize_embeddings=True)
@@ -80,37 +115,61 @@ def encode_terms(terms: Sequence[str], model: SentenceTransformer) -> Dict[str,
     return out
 
 
+def _pack_embeddings(terms: Iterable[str], emb_map: Dict[str, torch.Tensor]) -> Tuple[torch.Tensor, Dict[str, int]]:
+    """Stack the vectors of the known terms into one L2-normalized matrix + term->row map."""
+    rows: Dict[str, int] = {}
+    vecs: List[torch.Tensor] = []
+    for term in terms:
+        if term in rows:
+            continue
+        vec = emb_map.get(term)
+        if vec is None:
+            continue
+        rows[term] = len(vecs)
+        vecs.append(vec)
+    if not vecs:
+        return torch.empty((0, 0)), rows
+    mat = torch.nn.functional.normalize(torch.stack(vecs).float(), dim=1)
+    return mat, rows
+
+
 def score_synonym_edges(groups: List[List[str]], emb_map: Dict[str, torch.Tensor], language: str, threshold: float):
+    """One normalized matrix product per group; the upper triangle is thresholded at once."""
+    mat, rows = _pack_embeddings((t for g in groups for t in g), emb_map)
     edges = []
     for group in groups:
-        uniq = sorted(set(group))
-        for a, b in combinations(uniq, 2):
-            va, vb = emb_map.get(a), emb_map.get(b)
-            if va is None or vb is None:
-                continue
-            score = float(util.cos_sim(va, vb))
-            if score >= threshold:
-                edges.append((a, b, language, score, "thesaurus"))
+        uniq = [t for t in sorted(set(group)) if t in rows]
+        if len(uniq) < 2:
+            continue
+        block = mat[[rows[t] for t in uniq]]
+        sims = block @ block.T
+        left, right = torch.triu_indices(len(uniq), len(uniq), offset=1)
+        scores = sims[left, right]
+        keep = torch.nonzero(scores >= threshold, as_tuple=True)[0].tolist()
+        left, right, scores = left.tolist(), right.tolist(), scores.tolist()
+        for k in keep:
+            edges.append((uniq[left[k]], uniq[right[k]], language, scores[k], "thesaurus"))
     return edges
 
 
 def score_translation_edges(pairs: List[Tuple[str, str]], emb_map: Dict[str, torch.Tensor], threshold: float):
-    edges = []
-    for en, zh in pairs:
-        ve, vz = emb_map.get(en), emb_map.get(zh)
-        if ve is None or vz is None:
-            continue
-        score = float(util.cos_sim(ve, vz))
-        if score >= threshold:
-            edges.append((en, zh, score, "translation"))
-    return edges
+    """Row-wise dot products over gathered en/zh index arrays, thresholded for the whole batch."""
+    mat, rows = _pack_embeddings((t for pair in pairs for t in pair), emb_map)
+    kept = [(en, zh) for en, zh in pairs if en in rows and zh in rows]
+    if not kept:
+        return []
+    en_idx = torch.tensor([rows[en] for en, _ in kept], dtype=torch.long)
+    zh_idx = torch.tensor([rows[zh] for _, zh in kept], dtype=torch.long)
+    scores = (mat[en_idx] * mat[zh_idx]).sum(dim=1)
+    keep = torch.nonzero(scores >= threshold, as_tuple=True)[0].tolist()
+    scores = scores.tolist()
+    return [(kept[k][0], kept[k][1], scores[k], "translation") for k in keep]
 
 
-def ensure_tables(conn: sqlite3.Connection):
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS synonym_edge(
+# {name} is the table name, so _swap_in_edges can build <table>_new from the same schema
+EDGE_TABLE_DDL = {
+    "synonym_edge": """
+        CREATE TABLE IF NOT EXISTS {name}(
             id INTEGER PRIMARY KEY,
             left_term TEXT,
             right_term TEXT,
@@ -119,11 +178,9 @@ def ensure_tables(conn: sqlite3.Connection):
             source TEXT,
             UNIQUE(left_term, right_term, language, source)
         )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS translation_edge(
+    """,
+    "translation_edge": """
+        CREATE TABLE IF NOT EXISTS {name}(
             id INTEGER PRIMARY KEY,
             en_term TEXT,
             zh_term TEXT,
@@ -131,8 +188,31 @@ def ensure_tables(conn: sqlite3.Connection):
             source TEXT,
             UNIQUE(en_term, zh_term, source)
         )
-        """
-    )
+    """,
+}
+
+
+# covering indexes for the equality lookups of simple_lookup/simple_pair_lookup (each
+# side of synonym_edge and translation_edge); built once the edges are loaded, since
+# they roughly double the edge tables on disk
+LOOKUP_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_syn_left_lookup ON synonym_edge(left_term, language, right_term, score)",
+    "CREATE INDEX IF NOT EXISTS idx_syn_right_lookup ON synonym_edge(right_term, language, left_term, score)",
+    "CREATE INDEX IF NOT EXISTS idx_trans_en_lookup ON translation_edge(en_term, zh_term, score)",
+    "CREATE INDEX IF NOT EXISTS idx_trans_zh_lookup ON translation_edge(zh_term, en_term, score)",
+)
+
+
+def ensure_lookup_indexes(conn: sqlite3.Connection):
+    for ddl in LOOKUP_INDEXES:
+        conn.execute(ddl)
+    conn.commit()
+
+
+def ensure_tables(conn: sqlite3.Connection):
+    cur = conn.cursor()
+    for table, ddl in EDGE_TABLE_DDL.items():
+        cur.execute(ddl.format(name=table))
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS terms(
@@ -142,9 +222,74 @@ def ensure_tables(conn: sqlite3.Connection):
         """
     )
     conn.commit()
+    ensure_substring_index(conn)
+
+
+# ---- substring index ------------------------------------------------------
+# `LIKE '%needle%'` cannot use a b-tree index, so every term lookup used to scan
+# the whole table. Each searchable table gets an external-content FTS5 trigram
+# index kept in sync by triggers; substring_match_clause turns a needle into a
+# rowid filter served by that index. Needles shorter than three characters have
+# no trigram and fall back to the plain scan. Edge writes are upserts (ON CONFLICT
+# DO UPDATE), which fire the update trigger; INSERT OR REPLACE would delete the old
+# row without firing the delete trigger and leave its rowid in the index. Callers
+# keep their LIKE as well, so DBs written before that stay correct until
+# rebuild_substring_index runs.
 
+SUBSTRING_INDEXES = {
+    # table: (fts table, key column, indexed columns)
+    "terms": ("terms_trgm", "rowid", ("term",)),
+    "translation_edge": ("translation_edge_trgm", "id", ("en_term", "zh_term")),
+    "synonym_edge": ("synonym_edge_trgm", "id", ("left_term", "right_term")),
+}
 
-def persist_terms(conn: sqlite3.Connection, vocab: Set[str]):
+
+def ensure_substring_index(conn: sqlite3.Connection):
+    cur = conn.cursor()
+    for table, (fts, key, cols) in SUBSTRING_INDEXES.items():
+        exists = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)).fetchone()
+        col_list = ", ".join(cols)
+        new_vals = ", ".join(f"new.{c}" for c in cols)
+        old_vals = ", ".join(f"old.{c}" for c in cols)
+        cur.executescript(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {col_list}, content='{table}', content_rowid='{key}', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {col_list}) VALUES (new.{key}, {new_vals});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.{key}, {old_vals});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.{key}, {old_vals});
+                INSERT INTO {fts}(rowid, {col_list}) VALUES (new.{key}, {new_vals});
+            END;
+            """
+        )
+        if not exists:
+            # index rows that were already there (existing DBs, SQL dumps)
+            cur.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def rebuild_substring_index(conn: sqlite3.Connection, table: str):
+    fts = SUBSTRING_INDEXES[table][0]
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def substring_match_clause(table: str, needle: str, columns: Optional[Sequence[str]] = None) -> Tuple[str, List[str]]:
+    """SQL condition + params limiting `table` to rows whose columns may contain needle."""
+    fts, key, cols = SUBSTRING_INDEXES[table]
+    if len(needle) < 3:
+        return "1", []
+    phrase = '"' + needle.replace('"', '""') + '"'
+    query = "{" + " ".join(columns or cols) + "} : " + phrase
+    return f"{key} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)", [query]
+
+
+def persist_terms(conn: sqlite3.Connection, vocab: Set[str], commit: bool = True):
     cur = conn.cursor()
     rows = []
     for term in vocab:
@@ -154,42 +299,543 @@ def persist_terms(conn: sqlite3.Connection, vocab: Set[str]):
         "INSERT OR IGNORE INTO terms(term, language) VALUES (?, ?)",
         rows,
     )
+    if commit:
+        conn.commit()
+
+
+UPSERT_SYNONYM_EDGE = """
+    INSERT INTO synonym_edge(left_term, right_term, language, score, source) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(left_term, right_term, language, source) DO UPDATE SET score = excluded.score
+"""
+UPSERT_TRANSLATION_EDGE = """
+    INSERT INTO translation_edge(en_term, zh_term, score, source) VALUES (?, ?, ?, ?)
+    ON CONFLICT(en_term, zh_term, source) DO UPDATE SET score = excluded.score
+"""
+
+
+def insert_edges(conn: sqlite3.Connection, syn_edges, trans_edges):
+    cur = conn.cursor()
+    cur.executemany(UPSERT_SYNONYM_EDGE, syn_edges)
+    cur.executemany(UPSERT_TRANSLATION_EDGE, trans_edges)
     conn.commit()
 
 
-def persist_edges(db_path: Path, syn_edges, trans_edges, vocab: Set[str]):
+# ---- bulk load ------------------------------------------------------------
+# Edges are appended to unconstrained staging tables with relaxed durability,
+# merged with the live rows by set-based SQL into a fresh table (staged rows win,
+# like INSERT OR REPLACE), and the fresh table is indexed and swapped in within a
+# single transaction. A crash before the swap leaves the live tables untouched,
+# and the next run drops the leftovers, so the load can be re-run on any DB.
+
+# sources written by score_synonym_edges/score_translation_edges; a build replaces all of
+# them, while user edges ("user", "user_input") are kept
+BUILD_SOURCES = ("thesaurus", "translation")
+
+EDGE_TABLES = {
+    "synonym_edge": (
+        ["left_term", "right_term", "language", "score", "source"],
+        ["left_term", "right_term", "language", "source"],
+    ),
+    "translation_edge": (
+        ["en_term", "zh_term", "score", "source"],
+        ["en_term", "zh_term", "source"],
+    ),
+}
+
+
+def _table_ddl(conn: sqlite3.Connection, table: str, kind: str, skip: Sequence[str] = ()) -> List[str]:
+    rows = conn.execute(
+        f"""
+        SELECT sql FROM sqlite_master
+        WHERE type = ? AND tbl_name = ? AND sql IS NOT NULL AND name NOT IN ({','.join('?' * len(skip)) or "''"})
+        """,
+        (kind, table, *skip),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def _stage_rows(conn: sqlite3.Connection, table: str, cols: List[str], rows: Iterable[Sequence[Any]]) -> int:
+    placeholders = ", ".join("?" * len(cols))
+    n = 0
+    for batch in iter_batches(rows, 50000):
+        conn.executemany(f"INSERT INTO {table}({', '.join(cols)}) VALUES ({placeholders})", batch)
+        n += len(batch)
+    return n
+
+
+def _swap_in_edges(conn: sqlite3.Connection, table: str, replace_sources: Sequence[str] = ()):
+    """
+    Merge live + staged rows into <table>_new, then atomically replace table with it.
+    Live rows whose source is in replace_sources are dropped instead of merged.
+    """
+    cols, key = EDGE_TABLES[table]
+    col_list = ", ".join(cols)
+    live_filter = ""
+    if replace_sources:
+        live_filter = "WHERE source NOT IN (" + ", ".join("?" * len(replace_sources)) + ")"
+    # older loads added uq_<table>; the UNIQUE constraint of EDGE_TABLE_DDL covers it now
+    keep_indexes = _table_ddl(conn, table, "index", skip=[f"uq_{table}"])
+    keep_triggers = _table_ddl(conn, table, "trigger")
+    conn.execute(f"DROP TABLE IF EXISTS {table}_new")
+    conn.execute(EDGE_TABLE_DDL[table].format(name=f"{table}_new"))
+    conn.execute(
+        f"""
+        INSERT INTO {table}_new({col_list})
+        SELECT {col_list} FROM (
+            SELECT {col_list},
+                   ROW_NUMBER() OVER (PARTITION BY {', '.join(key)} ORDER BY prio DESC, seq DESC) AS rn
+            FROM (
+                SELECT {col_list}, 0 AS prio, rowid AS seq FROM {table} {live_filter}
+                UNION ALL
+                SELECT {col_list}, 1 AS prio, rowid AS seq FROM temp.{table}_stage
+            )
+        )
+        WHERE rn = 1
+        ORDER BY {', '.join(key)}
+        """,
+        tuple(replace_sources),
+    )
+    conn.commit()
+    conn.execute("PRAGMA synchronous = FULL;")
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        for ddl in keep_indexes + keep_triggers:
+            conn.execute(ddl)
+        if table in SUBSTRING_INDEXES:
+            # the swapped-in table has new ids; re-derive its trigram index from it
+            rebuild_substring_index(conn, table)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = ""
+        conn.execute("PRAGMA synchronous = OFF;")
+
+
+def bulk_load_edges(
+    db_path: Path,
+    syn_edges: Iterable[Sequence[Any]],
+    trans_edges: Iterable[Sequence[Any]],
+    vocab: Iterable[str] = (),
+    replace_sources: Sequence[str] = (),
+) -> Dict[str, float]:
+    """
+    Bulk-ingest terms and edges (same tuples as persist_edges) and report rows/sec.
+    Existing edges from replace_sources are dropped rather than merged.
+    """
+    t0 = time.perf_counter()
     conn = sqlite3.connect(db_path)
     ensure_tables(conn)
-    persist_terms(conn, vocab)
-    cur = conn.cursor()
-    cur.executemany(
-        """INSERT OR REPLACE INTO synonym_edge(left_term, right_term, language, score, source)
-               VALUES (?, ?, ?, ?, ?)""",
-        syn_edges,
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute("PRAGMA temp_store = FILE;")
+    conn.execute("PRAGMA cache_size = -262144;")  # 256 MiB page cache
+
+    conn.execute("DROP TABLE IF EXISTS temp.terms_stage")
+    conn.execute("CREATE TEMP TABLE terms_stage(term TEXT, language TEXT)")
+    n_terms = _stage_rows(
+        conn, "temp.terms_stage", ["term", "language"], ((t, "zh" if CJK_RE.search(t) else "en") for t in vocab)
     )
-    cur.executemany(
-        """INSERT OR REPLACE INTO translation_edge(en_term, zh_term, score, source)
-               VALUES (?, ?, ?, ?)""",
-        trans_edges,
+    # terms keeps its rowids (the term matrix is keyed by them), so it is merged in place
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO terms(term, language)
+        SELECT term, MIN(language) FROM temp.terms_stage GROUP BY term ORDER BY term
+        """
     )
+    conn.execute("DROP TABLE temp.terms_stage")
     conn.commit()
+
+    staged = {}
+    for table, rows in (("synonym_edge", syn_edges), ("translation_edge", trans_edges)):
+        cols, _ = EDGE_TABLES[table]
+        conn.execute(f"DROP TABLE IF EXISTS temp.{table}_stage")
+        conn.execute(f"CREATE TEMP TABLE {table}_stage({', '.join(cols)})")
+        staged[table] = _stage_rows(conn, f"temp.{table}_stage", cols, rows)
+        conn.commit()
+        _swap_in_edges(conn, table, replace_sources)
+        conn.execute(f"DROP TABLE temp.{table}_stage")
+    conn.execute("PRAGMA synchronous = FULL;")
+    ensure_lookup_indexes(conn)
+    conn.close()
+
+    dt = time.perf_counter() - t0
+    total = n_terms + staged["synonym_edge"] + staged["translation_edge"]
+    return {
+        "terms": n_terms,
+        "synonym_edges": staged["synonym_edge"],
+        "translation_edges": staged["translation_edge"],
+        "seconds": dt,
+        "rows_per_sec": total / dt if dt else 0.0,
+    }
+
+
+def persist_edges(db_path: Path, syn_edges, trans_edges, vocab: Set[str], bulk: bool = False):
+    if bulk:
+        return bulk_load_edges(db_path, syn_edges, trans_edges, vocab)
+    conn = sqlite3.connect(db_path)
+    ensure_tables(conn)
+    persist_terms(conn, vocab)
+    insert_edges(conn, syn_edges, trans_edges)
+    ensure_lookup_indexes(conn)
     conn.close()
 
 
-def build_edges(syn_threshold: float, trans_threshold: float):
+def build_edges(syn_threshold: float, trans_threshold: float, workers: int = 1, cache: Optional[EmbeddingCache] = None):
     en_groups = list(iter_en_synonym_groups(EN_SYNONYMS))
     zh_groups = list(iter_zh_synonym_groups(ZH_SYNONYMS))
     translation_pairs = list(iter_translation_pairs(TRANSLATIONS))
 
     vocab = sorted({w for g in en_groups + zh_groups for w in g} | {w for pair in translation_pairs for w in pair})
-    model = SentenceTransformer(MODEL_NAME)
-    emb_map = encode_terms(vocab, model)
+    emb_map = encode_terms(vocab, workers=workers, cache=cache)
+    # only set if encoding ran in this process; query_in_memory callers use get_model() otherwise
+    model = _MODELS.get(MODEL_NAME)
 
     syn_edges = []
     syn_edges.extend(score_synonym_edges(en_groups, emb_map, "en", syn_threshold))
     syn_edges.extend(score_synonym_edges(zh_groups, emb_map, "zh", syn_threshold))
     trans_edges = score_translation_edges(translation_pairs, emb_map, trans_threshold)
-    return syn_edges, trans_edges, emb_map, model, set(vocab)
+    return syn_edges, trans_edges, TermMatrix.from_emb_map(emb_map), model, set(vocab)
+
+
+# ---- streaming build ----------------------------------------------------
+# build_edges keeps every group, pair and vector in memory. The staged build below
+# spills parsed rows and the deduplicated term list to a work directory, encodes
+# into a memory-mapped float32 matrix and scores edges chunk by chunk, so peak
+# memory follows memory_budget_mb instead of the dataset size.
+#
+# Every stage is checkpointed in <work_dir>/manifest.json under a hash of its
+# inputs (source file contents, model name, thresholds). A restarted build skips
+# stages whose key still matches, resumes encoding at the last finished shard and
+# scoring at the last finished edge shard; changing only the thresholds re-scores
+# from the cached embeddings.
+
+
+def default_work_dir(db_path: Path) -> Path:
+    return Path(str(db_path) + ".build")
+
+
+def _write_jsonl(path: Path, rows: Iterable[Any]) -> int:
+    """Write rows to path atomically (tmp file + rename) and return the row count."""
+    n = 0
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as out:
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            n += 1
+    os.replace(tmp, path)
+    return n
+
+
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _budget_rows(memory_budget_mb: int, dim: int, share: float) -> int:
+    """Number of float32 vectors of size dim that fit into share of the budget."""
+    return max(BATCH_SIZE, int(memory_budget_mb * 1024 * 1024 * share) // (dim * 4))
+
+
+def file_digest(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stage_key(*parts: Any) -> str:
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+class BuildManifest:
+    """Stage checkpoints for a work directory, persisted as manifest.json."""
+
+    def __init__(self, work_dir: Path, fresh: bool = False):
+        self.path = work_dir / "manifest.json"
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists() and not fresh:
+            try:
+                self.stages = json.loads(self.path.read_text())
+            except ValueError:
+                self.stages = {}
+
+    def get(self, stage: str, key: str) -> Dict[str, Any]:
+        """Checkpoint info for stage if it was recorded under key, else {}."""
+        info = self.stages.get(stage) or {}
+        return info if info.get("key") == key else {}
+
+    def done(self, stage: str, key: str) -> bool:
+        return bool(self.get(stage, key).get("done"))
+
+    def mark(self, stage: str, key: str, done: bool = True, **info: Any):
+        self.stages[stage] = {"key": key, "done": done, **info}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.stages, indent=2))
+        os.replace(tmp, self.path)
+
+
+def stage_parse(work_dir: Path, manifest: BuildManifest, workers: int = 1) -> Tuple[str, Dict[str, int]]:
+    """
+    Stream the source datasets to en_groups/zh_groups/translation_pairs JSONL files.
+    With workers != 1 each file is parsed in byte ranges across a process pool.
+    """
+    key = stage_key(file_digest(EN_SYNONYMS), file_digest(ZH_SYNONYMS), file_digest(TRANSLATIONS))
+    info = manifest.get("parse", key)
+    if info.get("done"):
+        return key, info["counts"]
+    sources = (
+        ("en_groups", EN_SYNONYMS, iter_en_synonym_groups),
+        ("zh_groups", ZH_SYNONYMS, iter_zh_synonym_groups),
+        ("translation_pairs", TRANSLATIONS, iter_translation_pairs),
+    )
+    counts: Dict[str, int] = {}
+    rates: Dict[str, float] = {}
+    for name, path, iter_rows in sources:
+        t0 = time.perf_counter()
+        if workers != 1:
+            rows = iter_parsed_parallel(name, path, workers)
+        else:
+            rows = (list(r) for r in iter_rows(path))
+        counts[name] = _write_jsonl(work_dir / f"{name}.jsonl", rows)
+        # output rows over wall time (parse + write) on both paths, so the two rates compare
+        dt = time.perf_counter() - t0
+        rates[name] = counts[name] / dt if dt else 0.0
+        print(f"parsed {path.name}: {counts[name]} {name} in {dt:.1f}s ({rates[name]:.0f} rows/s)")
+    manifest.mark("parse", key, counts=counts, rows_per_sec=rates)
+    return key, counts
+
+
+def stage_terms(work_dir: Path, manifest: BuildManifest, parse_key: str) -> Tuple[str, int]:
+    """Dedupe every term of the parsed files through a scratch SQLite table into sorted terms.jsonl."""
+    key = stage_key(parse_key)
+    info = manifest.get("terms", key)
+    if info.get("done"):
+        return key, info["count"]
+    scratch_path = work_dir / "terms.scratch.sqlite"
+    if scratch_path.exists():
+        scratch_path.unlink()
+    scratch = sqlite3.connect(scratch_path)
+    scratch.execute("PRAGMA journal_mode = OFF;")
+    scratch.execute("PRAGMA synchronous = OFF;")
+    scratch.execute("CREATE TABLE term(term TEXT PRIMARY KEY) WITHOUT ROWID")
+    for name in ("en_groups", "zh_groups", "translation_pairs"):
+        tokens = ((t,) for row in iter_jsonl(work_dir / f"{name}.jsonl") for t in row)
+        for batch in iter_batches(tokens, 50000):
+            scratch.executemany("INSERT OR IGNORE INTO term(term) VALUES (?)", batch)
+    scratch.commit()
+    count = _write_jsonl(
+        work_dir / "terms.jsonl", (t for (t,) in scratch.execute("SELECT term FROM term ORDER BY term"))
+    )
+    scratch.close()
+    scratch_path.unlink()
+    manifest.mark("terms", key, count=count)
+    return key, count
+
+
+def stage_encode(
+    work_dir: Path,
+    manifest: BuildManifest,
+    terms_key: str,
+    n_terms: int,
+    workers: int = 1,
+    memory_budget_mb: int = MEMORY_BUDGET_MB,
+) -> str:
+    """
+    Encode terms.jsonl into work_dir/embeddings.npy (memory-mapped float32, row i =
+    term i). The matrix is filled in shards; each finished shard is checkpointed so an
+    interrupted run continues from rows_done.
+    """
+    key = stage_key(terms_key, MODEL_NAME)
+    info = manifest.get("encode", key)
+    if info.get("done"):
+        return key
+    out_path = work_dir / "embeddings.npy"
+    rows_done = int(info.get("rows_done", 0)) if out_path.exists() else 0
+    terms = islice(iter_jsonl(work_dir / "terms.jsonl"), rows_done, None)
+    if workers != 1:
+        chunks = iter_encoded_chunks(terms, workers)
+    else:
+        model = get_model()
+        chunks = (
+            (batch, model.encode(batch, convert_to_numpy=True, normalize_embeddings=True))
+            for batch in iter_batches(terms, BATCH_SIZE)
+        )
+    mat = np.load(out_path, mmap_mode="r+") if rows_done else None
+    dim = int(mat.shape[1]) if mat is not None else int(info.get("dim", 0))
+    shard_rows = _budget_rows(memory_budget_mb, dim, 0.25) if dim else BATCH_SIZE
+    row = rows_done
+    for batch, vecs in chunks:
+        if mat is None:
+            dim = int(vecs.shape[1])
+            mat = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(max(n_terms, 1), dim))
+            shard_rows = _budget_rows(memory_budget_mb, dim, 0.25)
+        mat[row : row + len(batch)] = vecs
+        row += len(batch)
+        if row - rows_done >= shard_rows:
+            mat.flush()
+            rows_done = row
+            manifest.mark("encode", key, done=False, rows_done=rows_done, dim=dim)
+    if mat is not None:
+        mat.flush()
+        del mat
+    else:
+        np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(1, dim or 1)).flush()
+    manifest.mark("encode", key, rows_done=row, dim=dim)
+    return key
+
+
+def load_term_index(work_dir: Path) -> Dict[str, int]:
+    return {term: i for i, term in enumerate(iter_jsonl(work_dir / "terms.jsonl"))}
+
+
+def iter_budget_chunks(rows: Iterable[List[str]], max_terms: int) -> Iterator[List[List[str]]]:
+    """Group rows so that each chunk references at most ~max_terms terms."""
+    chunk: List[List[str]] = []
+    n = 0
+    for row in rows:
+        chunk.append(row)
+        n += len(row)
+        if n >= max_terms:
+            yield chunk
+            chunk, n = [], 0
+    if chunk:
+        yield chunk
+
+
+def gather_embeddings(rows: List[List[str]], index: Dict[str, int], mat) -> Dict[str, torch.Tensor]:
+    """Load only the vectors referenced by rows from the memory-mapped matrix."""
+    terms = sorted({t for row in rows for t in row if t in index})
+    if not terms:
+        return {}
+    idxs = np.array([index[t] for t in terms], dtype=np.int64)
+    block = torch.from_numpy(np.ascontiguousarray(mat[idxs]))
+    return {t: block[i] for i, t in enumerate(terms)}
+
+
+def stage_score(
+    work_dir: Path,
+    manifest: BuildManifest,
+    encode_key: str,
+    syn_threshold: float,
+    trans_threshold: float,
+    memory_budget_mb: int = MEMORY_BUDGET_MB,
+) -> Tuple[str, Path]:
+    """
+    Score edges chunk by chunk from the embedding matrix. Each chunk is written as an
+    edge shard under work_dir/edges/<key>/; shards already on disk are skipped.
+    """
+    key = stage_key(encode_key, syn_threshold, trans_threshold, memory_budget_mb)
+    shard_dir = work_dir / "edges" / key
+    if manifest.done("score", key):
+        return key, shard_dir
+    if not manifest.get("score", key) and (work_dir / "edges").exists():
+        shutil.rmtree(work_dir / "edges")
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    manifest.mark("score", key, done=False)
+
+    index = load_term_index(work_dir)
+    mat = np.load(work_dir / "embeddings.npy", mmap_mode="r")
+    max_terms = _budget_rows(memory_budget_mb, int(mat.shape[1]), 0.5)
+    jobs = (
+        ("syn_en", "en_groups", "en"),
+        ("syn_zh", "zh_groups", "zh"),
+        ("trans", "translation_pairs", None),
+    )
+    for prefix, name, language in jobs:
+        for i, rows in enumerate(iter_budget_chunks(iter_jsonl(work_dir / f"{name}.jsonl"), max_terms)):
+            shard = shard_dir / f"{prefix}_{i:05d}.jsonl"
+            if shard.exists():
+                continue
+            emb_map = gather_embeddings(rows, index, mat)
+            if language:
+                edges = score_synonym_edges(rows, emb_map, language, syn_threshold)
+            else:
+                edges = score_translation_edges([tuple(p) for p in rows], emb_map, trans_threshold)
+            _write_jsonl(shard, edges)
+    manifest.mark("score", key)
+    return key, shard_dir
+
+
+def iter_edge_shards(shard_dir: Path, prefix: str) -> Iterator[Tuple[Any, ...]]:
+    for shard in sorted(shard_dir.glob(f"{prefix}_*.jsonl")):
+        for edge in iter_jsonl(shard):
+            yield tuple(edge)
+
+
+def stage_load(
+    work_dir: Path, manifest: BuildManifest, score_key: str, shard_dir: Path, db_path: Path, bulk: bool = False
+) -> Dict[str, int]:
+    """Write terms and edge shards into db_path and export the term matrix next to it."""
+    key = stage_key(score_key, Path(db_path).resolve())
+    info = manifest.get("load", key)
+    if info.get("done") and Path(db_path).exists() and os.path.getmtime(db_path) == info.get("db_mtime"):
+        return info["stats"]
+    if bulk:
+        stats = bulk_load_edges(
+            db_path,
+            (e for prefix in ("syn_en", "syn_zh") for e in iter_edge_shards(shard_dir, prefix)),
+            iter_edge_shards(shard_dir, "trans"),
+            iter_jsonl(work_dir / "terms.jsonl"),
+            replace_sources=BUILD_SOURCES,
+        )
+        print(f"bulk-loaded in {stats['seconds']:.1f}s ({stats['rows_per_sec']:.0f} rows/s)")
+    else:
+        conn = sqlite3.connect(db_path)
+        ensure_tables(conn)
+        stats = {"terms": 0, "synonym_edges": 0, "translation_edges": 0}
+        for batch in iter_batches(iter_jsonl(work_dir / "terms.jsonl"), 50000):
+            persist_terms(conn, batch)
+            stats["terms"] += len(batch)
+        # one transaction: the previous build's edges go (a higher threshold must not keep
+        # them), user edges stay, and a failure leaves the old edges in place
+        placeholders = ", ".join("?" * len(BUILD_SOURCES))
+        with conn:
+            for table in EDGE_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE source IN ({placeholders})", BUILD_SOURCES)
+            for prefix in ("syn_en", "syn_zh"):
+                for batch in iter_batches(iter_edge_shards(shard_dir, prefix), 50000):
+                    conn.executemany(UPSERT_SYNONYM_EDGE, batch)
+                    stats["synonym_edges"] += len(batch)
+            for batch in iter_batches(iter_edge_shards(shard_dir, "trans"), 50000):
+                conn.executemany(UPSERT_TRANSLATION_EDGE, batch)
+                stats["translation_edges"] += len(batch)
+        ensure_lookup_indexes(conn)
+        conn.close()
+    save_term_matrix_from_build(db_path, work_dir)
+    manifest.mark("load", key, stats=stats, db_mtime=os.path.getmtime(db_path))
+    return stats
+
+
+def build_edges_streaming(
+    db_path: Path,
+    syn_threshold: float,
+    trans_threshold: float,
+    work_dir: Path = None,
+    memory_budget_mb: int = MEMORY_BUDGET_MB,
+    workers: int = 1,
+    fresh: bool = False,
+    bulk: bool = False,
+) -> Dict[str, int]:
+    """parse -> terms -> encode -> score -> load, each stage resumable from work_dir."""
+    work_dir = work_dir or default_work_dir(db_path)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    manifest = BuildManifest(work_dir, fresh=fresh)
+    parse_key, _ = stage_parse(work_dir, manifest, workers=workers)
+    terms_key, n_terms = stage_terms(work_dir, manifest, parse_key)
+    encode_key = stage_encode(work_dir, manifest, terms_key, n_terms, workers=workers, memory_budget_mb=memory_budget_mb)
+    score_key, shard_dir = stage_score(
+        work_dir, manifest, encode_key, syn_threshold, trans_threshold, memory_budget_mb=memory_budget_mb
+    )
+    return stage_load(work_dir, manifest, score_key, shard_dir, db_path, bulk=bulk)
 
 
 def collect_terms_for_language(db_path: Path, language: str) -> List[str]:
@@ -220,47 +866,277 @@ def collect_terms_for_language(db_path: Path, language: str) -> List[str]:
     return sorted(t for t in terms if t)
 
 
-def encode_term_list(terms: Sequence[str], model: SentenceTransformer) -> torch.Tensor:
+def encode_term_list(
+    terms: Sequence[str], model: SentenceTransformer, cache: Optional[EmbeddingCache] = None
+) -> torch.Tensor:
     vecs: List[torch.Tensor] = []
     for i in range(0, len(terms), BATCH_SIZE):
         chunk = terms[i : i + BATCH_SIZE]
-        chunk_vecs = model.encode(chunk, convert_to_tensor=True, normalize_embeddings=True)
+        if cache is not None:
+            chunk_vecs = torch.from_numpy(cache.encode(chunk, model, BATCH_SIZE))
+        else:
+            chunk_vecs = model.encode(chunk, convert_to_tensor=True, normalize_embeddings=True)
         vecs.append(chunk_vecs)
     return torch.cat(vecs, dim=0) if vecs else torch.empty((0,))
 
 
-def query_from_db(db_path: Path, text: str, language: str, top_k: int = 10):
-    model = SentenceTransformer(MODEL_NAME)
-    terms = collect_terms_for_language(db_path, language)
-    if not terms:
-        return []
-    term_vecs = encode_term_list(terms, model)
-    query_vec = model.encode([text], convert_to_tensor=True, normalize_embeddings=True)
-    scores = util.cos_sim(query_vec, term_vecs)[0]
-    k = min(top_k, scores.shape[0])
-    values, indices = torch.topk(scores, k)
-    return [(terms[idx], float(val)) for val, idx in zip(values, indices)]
-
-
-def query_in_memory(text: str, language: str, emb_map: Dict[str, torch.Tensor], model: SentenceTransformer, top_k: int = 10):
-    query_vec = model.encode([text], convert_to_tensor=True, normalize_embeddings=True)
-    scored = []
-    for term, vec in emb_map.items():
-        is_zh = bool(CJK_RE.search(term))
-        if language == "en" and is_zh:
-            continue
-        if language == "zh" and not is_zh:
+# ---- persistent term matrix -----------------------------------------------
+# Every row of terms gets one L2-normalized float32 vector in <db>.vectors/. The
+# matrix, the terms.rowid of each row and a zh/en mask are raw append-only files,
+# so new terms recorded after the build are appended instead of re-encoding all.
+# Deletions are not tracked; they need a full rebuild (delete <db>.vectors/).
+
+
+def term_matrix_paths(db_path: Path) -> Dict[str, Path]:
+    base = Path(str(db_path) + ".vectors")
+    return {
+        "dir": base,
+        "matrix": base / "matrix.f32",
+        "ids": base / "term_ids.i64",
+        "lang": base / "is_zh.u8",
+        "meta": base / "meta.json",
+    }
+
+
+class TermMatrix:
+    """Packed term vectors (one row per terms.rowid) with a precomputed language mask.
+
+    In-memory matrices built from an emb_map also carry the term strings in `terms`
+    (term_ids are then just row numbers).
+    """
+
+    def __init__(self, term_ids: np.ndarray, matrix: np.ndarray, is_zh: np.ndarray, terms: Optional[List[str]] = None):
+        self.term_ids = term_ids
+        self.matrix = matrix
+        self.is_zh = is_zh
+        self.terms = terms
+        # (COUNT(*), MAX(rowid)) of terms when this matrix was last reconciled with it
+        self.synced: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return int(self.term_ids.shape[0])
+
+    @property
+    def max_id(self) -> int:
+        return int(self.term_ids.max()) if len(self) else 0
+
+    @classmethod
+    def load(cls, db_path: Path, model_name: str = MODEL_NAME):
+        paths = term_matrix_paths(db_path)
+        if not paths["meta"].exists():
+            return None
+        meta = json.loads(paths["meta"].read_text())
+        if meta.get("model") != model_name:
+            return None
+        n, dim = int(meta["count"]), int(meta["dim"])
+        if n == 0:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros((0, dim), dtype=np.float32), np.zeros(0, dtype=bool))
+        matrix = np.memmap(paths["matrix"], dtype=np.float32, mode="r", shape=(n, dim))
+        term_ids = np.fromfile(paths["ids"], dtype=np.int64, count=n)
+        is_zh = np.fromfile(paths["lang"], dtype=np.uint8, count=n).astype(bool)
+        return cls(term_ids, matrix, is_zh)
+
+    @classmethod
+    def from_emb_map(cls, emb_map: Dict[str, torch.Tensor]):
+        terms = list(emb_map)
+        mat, _ = _pack_embeddings(terms, emb_map)
+        if not terms:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=bool), [])
+        is_zh = np.fromiter((bool(CJK_RE.search(t)) for t in terms), dtype=bool, count=len(terms))
+        matrix = np.ascontiguousarray(mat.cpu().numpy(), dtype=np.float32)
+        return cls(np.arange(len(terms), dtype=np.int64), matrix, is_zh, terms)
+
+    def search(self, query_vec: np.ndarray, language: str, top_k: int) -> List[Tuple[int, float]]:
+        """One (masked) matrix-vector product plus top-k selection; returns (row, score)."""
+        if not len(self):
+            return []
+        scores = np.asarray(self.matrix @ np.asarray(query_vec, dtype=np.float32), dtype=np.float32)
+        if language in ("en", "zh"):
+            mask = self.is_zh if language == "zh" else ~self.is_zh
+            scores = np.where(mask, scores, -np.inf)
+            available = int(mask.sum())
+        else:
+            available = len(self)
+        k = min(top_k, available)
+        if k <= 0:
+            return []
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [(int(i), float(scores[i])) for i in idx]
+
+
+def _reset_term_matrix(paths: Dict[str, Path]):
+    paths["dir"].mkdir(parents=True, exist_ok=True)
+    for key in ("matrix", "ids", "lang", "meta"):
+        if paths[key].exists():
+            paths[key].unlink()
+
+
+def _truncate_term_rows(paths: Dict[str, Path], count: int, dim: int):
+    # drop rows a crashed append left past meta's count, so new rows line up with their ids
+    for key, row_bytes in (("matrix", dim * 4), ("ids", 8), ("lang", 1)):
+        size = count * row_bytes
+        if paths[key].exists() and paths[key].stat().st_size > size:
+            with paths[key].open("r+b") as f:
+                f.truncate(size)
+
+
+def _append_term_rows(paths: Dict[str, Path], term_ids: Sequence[int], is_zh: Sequence[bool], vecs: np.ndarray):
+    with paths["matrix"].open("ab") as f:
+        f.write(np.ascontiguousarray(vecs, dtype=np.float32).tobytes())
+    with paths["ids"].open("ab") as f:
+        f.write(np.asarray(term_ids, dtype=np.int64).tobytes())
+    with paths["lang"].open("ab") as f:
+        f.write(np.asarray(is_zh, dtype=np.uint8).tobytes())
+
+
+def _write_term_meta(paths: Dict[str, Path], count: int, dim: int, model_name: str = MODEL_NAME):
+    # written last, and appends start by truncating to the old count, so a crash
+    # mid-append never exposes or builds on a partial row
+    paths["meta"].write_text(json.dumps({"model": model_name, "dim": dim, "count": count}))
+
+
+def save_term_matrix_from_build(db_path: Path, work_dir: Path):
+    """Copy the build's embeddings.npy into <db>.vectors/, keyed by terms.rowid."""
+    paths = term_matrix_paths(db_path)
+    _reset_term_matrix(paths)
+    mat = np.load(work_dir / "embeddings.npy", mmap_mode="r")
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    row = 0
+    for batch in iter_batches(iter_jsonl(work_dir / "terms.jsonl"), 900):
+        placeholders = ",".join("?" * len(batch))
+        cur.execute(f"SELECT term, rowid, language FROM terms WHERE term IN ({placeholders})", batch)
+        found = {term: (rid, lang) for term, rid, lang in cur.fetchall()}
+        ids = [found[t][0] for t in batch]
+        is_zh = [found[t][1] == "zh" for t in batch]
+        _append_term_rows(paths, ids, is_zh, mat[row : row + len(batch)])
+        row += len(batch)
+    conn.close()
+    _write_term_meta(paths, row, int(mat.shape[1]))
+    # terms rows outside the build (user vocab written meanwhile) are appended on first query
+    _TERM_MATRICES.pop(str(Path(db_path).resolve()), None)
+
+
+def _terms_signature(conn: sqlite3.Connection) -> Tuple[int, int]:
+    count, max_rowid = conn.execute("SELECT COUNT(*), MAX(rowid) FROM terms").fetchone()
+    return int(count), int(max_rowid or 0)
+
+
+def refresh_term_matrix(db_path: Path, model: SentenceTransformer) -> TermMatrix:
+    """Encode and append every terms row the matrix lacks (all terms if there is none).
+
+    Missing rows are found by rowid set difference rather than a rowid watermark, so
+    inserts that land below the highest rowid are not skipped. Rows are only ever
+    appended: a deleted term keeps its row (query_from_db drops rowids that no longer
+    resolve), and a term that takes over a deleted term's rowid keeps the old vector.
+    After deleting terms, remove <db>.vectors/ so the next query rebuilds it in full.
+    """
+    paths = term_matrix_paths(db_path)
+    tm = TermMatrix.load(db_path)
+    if tm is None:
+        _reset_term_matrix(paths)
+        count, dim = 0, int(model.get_sentence_embedding_dimension())
+        known = np.zeros(0, dtype=np.int64)
+    else:
+        count, dim, known = len(tm), int(tm.matrix.shape[1]), np.asarray(tm.term_ids)
+    _truncate_term_rows(paths, count, dim)
+    conn = sqlite3.connect(db_path)
+    signature = _terms_signature(conn)
+    all_ids = np.fromiter((r[0] for r in conn.execute("SELECT rowid FROM terms")), dtype=np.int64)
+    missing = np.setdiff1d(all_ids, known).tolist()
+    for start in range(0, len(missing), BATCH_SIZE):
+        wanted = missing[start : start + BATCH_SIZE]
+        rows = []
+        for batch in iter_batches(wanted, 900):
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(
+                conn.execute(f"SELECT rowid, term, language FROM terms WHERE rowid IN ({placeholders})", batch)
+            )
+        if not rows:
             continue
-        scored.append((term, float(util.cos_sim(query_vec, vec))))
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[:top_k]
+        vecs = model.encode([r[1] for r in rows], convert_to_numpy=True, normalize_embeddings=True)
+        _append_term_rows(paths, [r[0] for r in rows], [r[2] == "zh" for r in rows], vecs)
+        count += len(rows)
+    conn.close()
+    _write_term_meta(paths, count, dim)
+    tm = TermMatrix.load(db_path)
+    tm.synced = signature
+    return tm
+
+
+_TERM_MATRICES: Dict[str, TermMatrix] = {}
+
+
+def get_term_matrix(db_path: Path, model: SentenceTransformer):
+    """Process-cached TermMatrix for db_path, refreshed when terms has changed; None if terms is empty."""
+    conn = sqlite3.connect(db_path)
+    signature = _terms_signature(conn)
+    conn.close()
+    if not signature[0]:
+        return None
+    key = str(Path(db_path).resolve())
+    tm = _TERM_MATRICES.get(key) or TermMatrix.load(db_path)
+    if tm is None or tm.synced != signature:
+        tm = refresh_term_matrix(db_path, model)
+    _TERM_MATRICES[key] = tm
+    return tm
+
+
+def _terms_by_rowid(db_path: Path, rowids: Sequence[int]) -> Dict[int, str]:
+    if not rowids:
+        return {}
+    conn = sqlite3.connect(db_path)
+    placeholders = ",".join("?" * len(rowids))
+    rows = conn.execute(f"SELECT rowid, term FROM terms WHERE rowid IN ({placeholders})", list(rowids)).fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def query_from_db(db_path: Path, text: str, language: str, top_k: int = 10):
+    """One query encode plus one matrix-vector product against the persisted term matrix."""
+    model = get_model()
+    cache = shared_cache(default_cache_path(db_path), MODEL_NAME)
+    tm = get_term_matrix(db_path, model)
+    if tm is None:
+        # terms table not populated: fall back to encoding the edge vocabulary
+        terms = collect_terms_for_language(db_path, language)
+        if not terms:
+            return []
+        term_vecs = encode_term_list(terms, model, cache)
+        query_vec = torch.from_numpy(cache.encode([text], model))
+        scores = util.cos_sim(query_vec, term_vecs)[0]
+        k = min(top_k, scores.shape[0])
+        values, indices = torch.topk(scores, k)
+        return [(terms[idx], float(val)) for val, idx in zip(values, indices)]
+    query_vec = cache.encode([text], model)[0]
+    hits = tm.search(query_vec, language, top_k)
+    names = _terms_by_rowid(db_path, [int(tm.term_ids[i]) for i, _ in hits])
+    return [(names[int(tm.term_ids[i])], score) for i, score in hits if int(tm.term_ids[i]) in names]
+
+
+def query_in_memory(text: str, language: str, term_matrix: TermMatrix, model: SentenceTransformer, top_k: int = 10):
+    """Same masked matrix-vector search as query_from_db, over the matrix build_edges returns."""
+    if isinstance(term_matrix, dict):
+        term_matrix = TermMatrix.from_emb_map(term_matrix)
+    query_vec = model.encode([text], convert_to_numpy=True, normalize_embeddings=True)[0]
+    return [(term_matrix.terms[i], score) for i, score in term_matrix.search(query_vec, language, top_k)]
 
 
 def run_build(args):
-    syn_edges, trans_edges, _, _, vocab = build_edges(args.syn_threshold, args.trans_threshold)
-    persist_edges(Path(args.db), syn_edges, trans_edges, vocab)
+    stats = build_edges_streaming(
+        Path(args.db),
+        args.syn_threshold,
+        args.trans_threshold,
+        work_dir=Path(args.work_dir) if args.work_dir else None,
+        memory_budget_mb=args.memory_budget_mb,
+        workers=args.workers,
+        fresh=args.fresh,
+        bulk=args.bulk_load,
+    )
     print(
-        f"Persisted {len(vocab)} terms, {len(syn_edges)} synonym edges, and {len(trans_edges)} translation edges to {args.db}"
+        f"Persisted {stats['terms']} terms, {stats['synonym_edges']} synonym edges, "
+        f"and {stats['translation_edges']} translation edges to {args.db}"
     )
 
 
@@ -278,6 +1154,17 @@ def main():
     p_build.add_argument("--db", default="notebook.db", help="SQLite path to write edges")
     p_build.add_argument("--syn-threshold", type=float, default=SYN_THRESHOLD, help="Cosine threshold for synonyms")
     p_build.add_argument("--trans-threshold", type=float, default=TRANS_THRESHOLD, help="Cosine threshold for translations")
+    p_build.add_argument(
+        "--workers", type=int, default=1, help="Parse/encode processes (0 = one per core, 1 = in-process)"
+    )
+    p_build.add_argument("--work-dir", help="Directory for intermediate build files (default: <db>.build)")
+    p_build.add_argument(
+        "--memory-budget-mb", type=int, default=MEMORY_BUDGET_MB, help="Approximate peak memory for encode/score chunks"
+    )
+    p_build.add_argument("--fresh", action="store_true", help="Ignore checkpoints in the work dir and rebuild every stage")
+    p_build.add_argument(
+        "--bulk-load", action="store_true", help="Load edges via staging tables + atomic table swap (fast for large builds)"
+    )
     p_build.set_defaults(func=run_build)
 
     p_query = sub.add_parser("query", help="Embed client text and return nearest terms from DB")
@@ -292,8 +1179,4 @@ def main():
 
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 792df40 (lasdfsa)
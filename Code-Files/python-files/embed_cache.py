@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Two-tier embedding cache shared by main_workflow, vocab_cli and ai_initializer.
+
+- Tier 1: in-process LRU of float32 vectors, bounded by a byte budget.
+- Tier 2: a sidecar SQLite file (default <db>.embcache) keyed by (model, sha1(text)),
+  so vectors survive restarts and can be shared by every tool pointing at the same DB.
+
+Vectors are stored L2-normalized, exactly as model.encode(..., normalize_embeddings=True)
+returns them.
+"""
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+ENCODE_BATCH = 256
+
+
+def default_cache_path(db_path: Path) -> Path:
+    return Path(str(db_path) + ".embcache")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """LRU (max_bytes) in front of an on-disk store; pass path=None for a memory-only cache."""
+
+    def __init__(self, path: Optional[Path], model_name: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else None
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.conn: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_cache(
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY(model, text_hash)
+                ) WITHOUT ROWID
+                """
+            )
+            self.conn.commit()
+
+    # ---- memory tier ------------------------------------------------------
+    def _remember(self, text: str, vec: np.ndarray):
+        size = vec.nbytes + len(text)
+        if size > self.max_bytes:
+            return
+        old = self._lru.pop(text, None)
+        if old is not None:
+            self._bytes -= old.nbytes + len(text)
+        self._lru[text] = vec
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            evicted_text, evicted = self._lru.popitem(last=False)
+            self._bytes -= evicted.nbytes + len(evicted_text)
+
+    # ---- lookups ----------------------------------------------------------
+    def get_many(self, texts: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for whichever of texts are known; counts hits and misses."""
+        found: Dict[str, np.ndarray] = {}
+        pending: List[str] = []
+        for text in dict.fromkeys(texts):
+            vec = self._lru.get(text)
+            if vec is not None:
+                self._lru.move_to_end(text)
+                found[text] = vec
+                self.memory_hits += 1
+            else:
+                pending.append(text)
+        if pending and self.conn is not None:
+            by_hash = {text_hash(t): t for t in pending}
+            hashes = list(by_hash)
+            for i in range(0, len(hashes), 900):
+                chunk = hashes[i : i + 900]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [self.model_name, *chunk],
+                ).fetchall()
+                for h, blob in rows:
+                    text = by_hash[h]
+                    vec = np.frombuffer(blob, dtype=np.float32)
+                    found[text] = vec
+                    self._remember(text, vec)
+                    self.disk_hits += 1
+        self.misses += sum(1 for t in pending if t not in found)
+        return found
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]):
+        rows = []
+        for text, vec in items:
+            vec = np.ascontiguousarray(vec, dtype=np.float32)
+            self._remember(text, vec)
+            rows.append((self.model_name, text_hash(text), int(vec.shape[0]), vec.tobytes()))
+        if rows and self.conn is not None:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache(model, text_hash, dim, vector) VALUES (?, ?, ?, ?)", rows
+            )
+            self.conn.commit()
+
+    def encode(self, texts: Sequence[str], model, batch_size: int = ENCODE_BATCH) -> np.ndarray:
+        """(len(texts), dim) float32 matrix; only cache misses go through the model, in large batches."""
+        found = self.get_many(texts)
+        missing = [t for t in dict.fromkeys(texts) if t not in found]
+        for i in range(0, len(missing), batch_size):
+            chunk = missing[i : i + batch_size]
+            vecs = model.encode(chunk, convert_to_numpy=True, normalize_embeddings=True, batch_size=batch_size)
+            vecs = np.asarray(vecs, dtype=np.float32)
+            self.put_many(list(zip(chunk, vecs)))
+            found.update(zip(chunk, vecs))
+        if not texts:
+            dim = int(model.get_sentence_embedding_dimension())
+            return np.zeros((0, dim), dtype=np.float32)
+        return np.stack([found[t] for t in texts])
+
+    # ---- bookkeeping ------------------------------------------------------
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "memory_bytes": self._bytes,
+        }
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+_SHARED: Dict[Tuple[str, str], EmbeddingCache] = {}
+
+
+def shared_cache(path: Optional[Path], model_name: str, max_bytes: int = DEFAULT_MAX_BYTES) -> EmbeddingCache:
+    """Process-wide cache per (path, model) so callers in one process share the LRU."""
+    key = (str(Path(path).resolve()) if path else "", model_name)
+    cache = _SHARED.get(key)
+    if cache is None:
+        cache = _SHARED[key] = EmbeddingCache(path, model_name, max_bytes)
+    return cache
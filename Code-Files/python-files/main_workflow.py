@@ -7,23 +7,31 @@ Provides a single CLI that can:
 - Record new English/Chinese vocab pairs with optional meanings.
 - Link new entries into the existing synonym/translation tables.
 - Search a user's recorded vocab bilingually with semantic fallback.
+- Run as a daemon (`serve`) that keeps the model, caches and DB warm; `record`
+  and `search` then forward to it instead of loading everything per call.
 """
 import argparse
+import csv
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
 import sqlite3
+import sys
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-import torch
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
 
-from ai_initializer import (
-    CJK_RE,
-    MODEL_NAME,
-    SYN_THRESHOLD,
-    TRANS_THRESHOLD,
-    ensure_tables,
-    persist_terms,
-)
+from embed_cache import DEFAULT_MAX_BYTES, default_cache_path, shared_cache
+from source_parse import CJK_RE
+
+# ai_initializer pulls in torch and sentence_transformers; NotebookApp imports it on first
+# use so the thin-client commands (stats, stop, record/search through the daemon) stay light
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 
 def normalize_en(text: Optional[str]) -> Optional[str]:
@@ -41,7 +49,15 @@ def detect_language(text: str) -> str:
 class NotebookApp:
     """Wraps DB + embedding model so we only load heavy assets once."""
 
-    def __init__(self, db_path: Path, sql_dump: Optional[Path] = None, rebuild: bool = False):
+    def __init__(
+        self,
+        db_path: Path,
+        sql_dump: Optional[Path] = None,
+        rebuild: bool = False,
+        cache_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        from ai_initializer import MODEL_NAME, ensure_lookup_indexes, ensure_tables
+
         self.db_path = db_path
         if rebuild and db_path.exists():
             db_path.unlink()
@@ -53,8 +69,14 @@ class NotebookApp:
             self.import_sql_dump(sql_dump)
             ensure_tables(self.conn)
             self.ensure_user_tables()
-        self.model: Optional[SentenceTransformer] = None
-        self._embed_cache: Dict[str, torch.Tensor] = {}
+        # a DB hydrated from word_relations.sql (here or by hand) lacks the covering indexes
+        # the build creates; simple_lookup/simple_pair_lookup open it read-only and rely on them
+        ensure_lookup_indexes(self.conn)
+        self.model: Optional["SentenceTransformer"] = None
+        self.embed_cache = shared_cache(default_cache_path(db_path), MODEL_NAME, cache_bytes)
+        # (entries, field matrix, per-entry field rows) for search_user_vocab; reset by record_vocab
+        self._user_index: Optional[Tuple[List[Dict[str, Optional[str]]], np.ndarray, np.ndarray]] = None
+        self._user_index_marker: Optional[Tuple[int, ...]] = None
 
     # ---- schema helpers -------------------------------------------------
     def ensure_user_tables(self):
@@ -74,6 +96,11 @@ class NotebookApp:
             CREATE INDEX IF NOT EXISTS idx_user_vocab_en ON user_vocab(english);
             CREATE INDEX IF NOT EXISTS idx_user_vocab_zh ON user_vocab(chinese);
             CREATE INDEX IF NOT EXISTS idx_terms_lang_term ON terms(language, term);
+            CREATE TABLE IF NOT EXISTS user_vocab_field_emb(
+                text_hash TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL
+            );
             """
         )
         self.conn.commit()
@@ -93,83 +120,125 @@ class NotebookApp:
         self.conn.commit()
 
     # ---- embeddings -----------------------------------------------------
-    def _get_model(self) -> SentenceTransformer:
+    def _get_model(self) -> "SentenceTransformer":
         if self.model is None:
+            from ai_initializer import MODEL_NAME
+            from sentence_transformers import SentenceTransformer
+
             self.model = SentenceTransformer(MODEL_NAME)
         return self.model
 
-    def _embed(self, text: str) -> torch.Tensor:
-        if text not in self._embed_cache:
-            vec = self._get_model().encode([text], convert_to_tensor=True, normalize_embeddings=True)[0]
-            self._embed_cache[text] = vec
-        return self._embed_cache[text]
+    def _embed(self, text: str) -> np.ndarray:
+        return self.embed_cache.encode([text], self._get_model())[0]
 
-    # ---- linking helpers ------------------------------------------------
-    def _translation_score(
-        self,
-        english: Optional[str],
-        chinese: Optional[str],
-        meaning_en: Optional[str],
-        meaning_zh: Optional[str],
-    ) -> Optional[float]:
-        left = english or meaning_en
-        right = chinese or meaning_zh
-        if not left or not right:
-            return None
-        return float(util.cos_sim(self._embed(left), self._embed(right)))
-
-    def _upsert_translation_edge(
-        self, english: Optional[str], chinese: Optional[str], meaning_en: Optional[str], meaning_zh: Optional[str]
-    ) -> Optional[float]:
-        if not english or not chinese:
-            return None
-        score = self._translation_score(english, chinese, meaning_en, meaning_zh)
-        if score is None:
-            return None
+    @staticmethod
+    def _field_hash(text: str) -> str:
+        from ai_initializer import MODEL_NAME
+
+        return hashlib.sha1(f"{MODEL_NAME}\0{text}".encode("utf-8")).hexdigest()
+
+    def _field_embeddings(self, texts: Iterable[str], commit: bool = True) -> Dict[str, np.ndarray]:
+        """Stored user_vocab field vectors; missing ones are encoded in one batch and saved."""
+        by_hash = {self._field_hash(t): t for t in texts}
+        found: Dict[str, np.ndarray] = {}
         cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT OR REPLACE INTO translation_edge(en_term, zh_term, score, source)
-            VALUES (?, ?, ?, ?)
-            """,
-            (english, chinese, score, "user_input"),
+        hashes = list(by_hash)
+        for i in range(0, len(hashes), 900):
+            chunk = hashes[i : i + 900]
+            cur.execute(
+                f"SELECT text_hash, vector FROM user_vocab_field_emb WHERE text_hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for h, blob in cur.fetchall():
+                found[by_hash[h]] = np.frombuffer(blob, dtype=np.float32)
+        missing = [by_hash[h] for h in hashes if by_hash[h] not in found]
+        if missing:
+            vecs = self.embed_cache.encode(missing, self._get_model())
+            self._store_field_vectors(cur, zip(missing, vecs))
+            if commit:
+                self.conn.commit()
+            found.update(zip(missing, vecs))
+        return found
+
+    def _store_field_vectors(self, cur: sqlite3.Cursor, items: Iterable[Tuple[str, np.ndarray]]):
+        cur.executemany(
+            "INSERT OR REPLACE INTO user_vocab_field_emb(text_hash, dim, vector) VALUES (?, ?, ?)",
+            [(self._field_hash(t), int(v.shape[0]), np.asarray(v, dtype=np.float32).tobytes()) for t, v in items],
         )
-        self.conn.commit()
-        return score
 
+    def _user_vocab_index(self) -> Tuple[List[Dict[str, Optional[str]]], np.ndarray, np.ndarray]:
+        """All user_vocab rows, one matrix of distinct field vectors, and an (entries x 4) row map (-1 = empty)."""
+        marker = self._user_vocab_marker()
+        if self._user_index is None or marker != self._user_index_marker:
+            entries = self._fetch_user_vocab()
+            fields = ("english", "chinese", "meaning_en", "meaning_zh")
+            texts = sorted({e[f] for e in entries for f in fields if e[f]})
+            vecs = self._field_embeddings(texts)
+            rows = {t: i for i, t in enumerate(texts)}
+            if texts:
+                matrix = np.stack([vecs[t] for t in texts])
+            else:
+                matrix = np.zeros((0, 0), dtype=np.float32)
+            field_rows = np.array(
+                [[rows[e[f]] if e[f] else -1 for f in fields] for e in entries], dtype=np.int64
+            ).reshape(len(entries), len(fields))
+            self._user_index = (entries, matrix, field_rows)
+            self._user_index_marker = marker
+        return self._user_index
+
+    def _user_vocab_marker(self) -> Tuple[int, ...]:
+        # data_version moves when another connection (a second CLI, a sqlite shell) commits;
+        # row count and max id catch inserts/deletes made on this connection outside record_many
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        count, max_id = self.conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM user_vocab").fetchone()
+        return data_version, count, max_id
+
+    # ---- linking helpers ------------------------------------------------
     def _candidate_terms(self, needle: str, language: str, limit: int) -> List[str]:
+        from ai_initializer import substring_match_clause
+
         pattern = f"%{needle}%"
+        clause, params = substring_match_clause("terms", needle)
         cur = self.conn.cursor()
         cur.execute(
-            """
+            f"""
             SELECT term FROM terms
-            WHERE language = ? AND term LIKE ?
+            WHERE {clause} AND language = ? AND term LIKE ?
             LIMIT ?
             """,
-            (language, pattern, limit),
+            (*params, language, pattern, limit),
         )
         return [row[0] for row in cur.fetchall()]
 
-    def _link_synonyms(
-        self, term: Optional[str], language: str, contexts: Sequence[str], like_limit: int
-    ) -> int:
+    def _synonym_candidates(
+        self, term: Optional[str], language: str, contexts: Sequence[str], like_limit: int, pending: Sequence[str] = ()
+    ) -> List[str]:
+        """Existing terms matching term/contexts, plus matching terms from the same (not yet written) batch."""
         if not term:
-            return 0
+            return []
         seen: set[str] = set()
         candidates: List[str] = []
         for ctx in [term, *contexts]:
             if not ctx:
                 continue
-            for cand in self._candidate_terms(ctx, language, like_limit):
+            needle = ctx.casefold()
+            batch_hits = [p for p in pending if needle in p.casefold()]
+            for cand in [*self._candidate_terms(ctx, language, like_limit), *batch_hits]:
                 if cand == term or cand in seen:
                     continue
                 seen.add(cand)
                 candidates.append(cand)
+        return candidates
+
+    @staticmethod
+    def _synonym_rows(
+        term: str, language: str, candidates: Sequence[str], vecs: Dict[str, np.ndarray]
+    ) -> List[Tuple[str, str, str, float, str]]:
+        from ai_initializer import SYN_THRESHOLD
+
         if not candidates:
-            return 0
-        cand_vecs = self._get_model().encode(candidates, convert_to_tensor=True, normalize_embeddings=True)
-        base_vec = self._embed(term)
-        scores = util.cos_sim(base_vec, cand_vecs)[0]
+            return []
+        scores = np.stack([vecs[c] for c in candidates]) @ vecs[term]
         rows = []
         for cand, score in zip(candidates, scores):
             score_val = float(score)
@@ -177,17 +246,7 @@ class NotebookApp:
                 continue
             left, right = sorted([term, cand])
             rows.append((left, right, language, score_val, "user_input"))
-        if rows:
-            cur = self.conn.cursor()
-            cur.executemany(
-                """
-                INSERT OR REPLACE INTO synonym_edge(left_term, right_term, language, score, source)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                rows,
-            )
-            self.conn.commit()
-        return len(rows)
+        return rows
 
     # ---- user operations ------------------------------------------------
     def record_vocab(
@@ -198,32 +257,87 @@ class NotebookApp:
         meaning_zh: Optional[str],
         like_limit: int = 120,
     ) -> Dict[str, Optional[float]]:
-        en_norm = normalize_en(english)
-        zh_norm = normalize_zh(chinese)
-        meaning_en = meaning_en.strip() if meaning_en else None
-        meaning_zh = meaning_zh.strip() if meaning_zh else None
-        if not en_norm and not zh_norm:
-            raise ValueError("Provide at least one of --english/--chinese")
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO user_vocab(english, chinese, meaning_en, meaning_zh, created_at, updated_at)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            ON CONFLICT(english, chinese) DO UPDATE SET
-                meaning_en = excluded.meaning_en,
-                meaning_zh = excluded.meaning_zh,
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            (en_norm, zh_norm, meaning_en, meaning_zh),
-        )
-        self.conn.commit()
-        vocab_terms = {t for t in (en_norm, zh_norm) if t}
-        if vocab_terms:
-            persist_terms(self.conn, vocab_terms)
-        trans_score = self._upsert_translation_edge(en_norm, zh_norm, meaning_en, meaning_zh)
-        en_links = self._link_synonyms(en_norm, "en", [meaning_en or ""], like_limit)
-        zh_links = self._link_synonyms(zh_norm, "zh", [meaning_zh or ""], like_limit)
-        return {"translation_score": trans_score, "en_links": en_links, "zh_links": zh_links}
+        return self.record_many([(english, chinese, meaning_en, meaning_zh)], like_limit)[0]
+
+    def record_many(
+        self,
+        items: Sequence[Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]],
+        like_limit: int = 120,
+    ) -> List[Dict[str, Optional[float]]]:
+        """Record (english, chinese, meaning_en, meaning_zh) rows as one transaction.
+
+        Candidate lookup happens up front, every text that needs a vector (entries,
+        meanings, synonym candidates of both languages) goes through one batched
+        encode, and all writes share a single commit; a failure leaves the DB untouched.
+        """
+        from ai_initializer import UPSERT_SYNONYM_EDGE, UPSERT_TRANSLATION_EDGE, persist_terms
+
+        plans = []
+        for english, chinese, meaning_en, meaning_zh in items:
+            en_norm = normalize_en(english)
+            zh_norm = normalize_zh(chinese)
+            meaning_en = meaning_en.strip() if meaning_en else None
+            meaning_zh = meaning_zh.strip() if meaning_zh else None
+            if not en_norm and not zh_norm:
+                raise ValueError("Provide at least one of --english/--chinese")
+            plans.append({"english": en_norm, "chinese": zh_norm, "meaning_en": meaning_en, "meaning_zh": meaning_zh})
+        pending = {
+            "en": list(dict.fromkeys(p["english"] for p in plans if p["english"])),
+            "zh": list(dict.fromkeys(p["chinese"] for p in plans if p["chinese"])),
+        }
+        texts: Dict[str, None] = {}
+        for plan in plans:
+            plan["en_cands"] = self._synonym_candidates(
+                plan["english"], "en", [plan["meaning_en"] or ""], like_limit, pending["en"]
+            )
+            plan["zh_cands"] = self._synonym_candidates(
+                plan["chinese"], "zh", [plan["meaning_zh"] or ""], like_limit, pending["zh"]
+            )
+            for text in (plan["english"], plan["chinese"], plan["meaning_en"], plan["meaning_zh"]):
+                if text:
+                    texts[text] = None
+            texts.update(dict.fromkeys(plan["en_cands"] + plan["zh_cands"]))
+        order = list(texts)
+        vecs = dict(zip(order, self.embed_cache.encode(order, self._get_model()))) if order else {}
+
+        results: List[Dict[str, Optional[float]]] = []
+        user_rows, field_texts, trans_rows, syn_rows = [], {}, [], []
+        for plan in plans:
+            en_norm, zh_norm = plan["english"], plan["chinese"]
+            user_rows.append((en_norm, zh_norm, plan["meaning_en"], plan["meaning_zh"]))
+            for text in (en_norm, zh_norm, plan["meaning_en"], plan["meaning_zh"]):
+                if text:
+                    field_texts[text] = vecs[text]
+            trans_score = None
+            if en_norm and zh_norm:
+                trans_score = float(np.dot(vecs[en_norm], vecs[zh_norm]))
+                trans_rows.append((en_norm, zh_norm, trans_score, "user_input"))
+            en_rows = self._synonym_rows(en_norm, "en", plan["en_cands"], vecs) if en_norm else []
+            zh_rows = self._synonym_rows(zh_norm, "zh", plan["zh_cands"], vecs) if zh_norm else []
+            syn_rows.extend(en_rows + zh_rows)
+            results.append({"translation_score": trans_score, "en_links": len(en_rows), "zh_links": len(zh_rows)})
+
+        with self.conn:
+            cur = self.conn.cursor()
+            cur.executemany(
+                """
+                INSERT INTO user_vocab(english, chinese, meaning_en, meaning_zh, created_at, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT(english, chinese) DO UPDATE SET
+                    meaning_en = excluded.meaning_en,
+                    meaning_zh = excluded.meaning_zh,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                user_rows,
+            )
+            self._store_field_vectors(cur, field_texts.items())
+            vocab_terms = set(pending["en"]) | set(pending["zh"])
+            if vocab_terms:
+                persist_terms(self.conn, vocab_terms, commit=False)
+            cur.executemany(UPSERT_TRANSLATION_EDGE, trans_rows)
+            cur.executemany(UPSERT_SYNONYM_EDGE, syn_rows)
+        self._user_index = None
+        return results
 
     def _fetch_user_vocab(self) -> List[Dict[str, Optional[str]]]:
         cur = self.conn.cursor()
@@ -246,78 +360,54 @@ class NotebookApp:
     ) -> Tuple[List[Tuple[float, Dict[str, Optional[str]]]], List[Dict[str, object]]]:
         query = query.strip()
         lang = language if language != "auto" else detect_language(query)
-        query_vec = self._embed(query)
-        entries = self._fetch_user_vocab()
-        scored: List[Tuple[float, Dict[str, Optional[str]]]] = []
-        for entry in entries:
-            fields: Iterable[Optional[str]]
-            if lang == "en":
-                fields = (entry["english"], entry["meaning_en"], entry["chinese"], entry["meaning_zh"])
-            elif lang == "zh":
-                fields = (entry["chinese"], entry["meaning_zh"], entry["english"], entry["meaning_en"])
-            else:
-                fields = (entry["english"], entry["chinese"], entry["meaning_en"], entry["meaning_zh"])
-            best_score: Optional[float] = None
-            for text in fields:
-                if not text:
-                    continue
-                score = float(util.cos_sim(query_vec, self._embed(text)))
-                if best_score is None or score > best_score:
-                    best_score = score
-            if best_score is not None:
-                scored.append((best_score, entry))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        user_hits = scored[:topk]
+        entries, matrix, field_rows = self._user_vocab_index()
+        user_hits: List[Tuple[float, Dict[str, Optional[str]]]] = []
+        if entries and matrix.size:
+            sims = matrix @ self._embed(query)
+            # best field per entry; entries with no text at all stay at -inf and are dropped
+            per_field = np.where(field_rows >= 0, sims[np.maximum(field_rows, 0)], -np.inf)
+            best = per_field.max(axis=1)
+            valid = np.flatnonzero(np.isfinite(best))
+            k = min(topk, valid.size)
+            if k > 0:
+                top = valid[np.argpartition(-best[valid], k - 1)[:k]]
+                top = top[np.argsort(-best[top], kind="stable")]
+                user_hits = [(float(best[i]), entries[i]) for i in top]
         base_hits = self.search_base_dictionary(query, lang, include_base) if include_base else []
         return user_hits, base_hits
 
     def search_base_dictionary(self, query: str, language: str, limit: int) -> List[Dict[str, object]]:
+        from ai_initializer import substring_match_clause
+
         pattern = f"%{query}%"
         cur = self.conn.cursor()
         rows: List[Dict[str, object]] = []
-        if language in {"en", "both"}:
-            cur.execute(
-                """
-                SELECT en_term, zh_term, score FROM translation_edge
-                WHERE en_term LIKE ?
-                ORDER BY score DESC
-                LIMIT ?
-                """,
-                (pattern, limit),
-            )
-            for en_term, zh_term, score in cur.fetchall():
-                rows.append({"english": en_term, "chinese": zh_term, "score": score, "kind": "translation"})
-            cur.execute(
-                """
-                SELECT left_term, right_term, score FROM synonym_edge
-                WHERE language = 'en' AND (left_term LIKE ? OR right_term LIKE ?)
-                ORDER BY score DESC
-                LIMIT ?
-                """,
-                (pattern, pattern, limit),
-            )
-            for left, right, score in cur.fetchall():
-                rows.append({"english": left, "chinese": right, "score": score, "kind": "synonym"})
-        if language in {"zh", "both"}:
+        trans_cols = {"en": "en_term", "zh": "zh_term"}
+        for lang in ("en", "zh"):
+            if language not in {lang, "both"}:
+                continue
+            col = trans_cols[lang]
+            clause, params = substring_match_clause("translation_edge", query, [col])
             cur.execute(
-                """
+                f"""
                 SELECT en_term, zh_term, score FROM translation_edge
-                WHERE zh_term LIKE ?
+                WHERE {clause} AND {col} LIKE ?
                 ORDER BY score DESC
                 LIMIT ?
                 """,
-                (pattern, limit),
+                (*params, pattern, limit),
             )
             for en_term, zh_term, score in cur.fetchall():
                 rows.append({"english": en_term, "chinese": zh_term, "score": score, "kind": "translation"})
+            clause, params = substring_match_clause("synonym_edge", query)
             cur.execute(
-                """
+                f"""
                 SELECT left_term, right_term, score FROM synonym_edge
-                WHERE language = 'zh' AND (left_term LIKE ? OR right_term LIKE ?)
+                WHERE {clause} AND language = ? AND (left_term LIKE ? OR right_term LIKE ?)
                 ORDER BY score DESC
                 LIMIT ?
                 """,
-                (pattern, pattern, limit),
+                (*params, lang, pattern, pattern, limit),
             )
             for left, right, score in cur.fetchall():
                 rows.append({"english": left, "chinese": right, "score": score, "kind": "synonym"})
@@ -325,9 +415,216 @@ class NotebookApp:
         return rows[:limit]
 
 
+# ---- daemon -------------------------------------------------------------
+# `serve` keeps one NotebookApp alive and answers newline-delimited JSON
+# requests, either over stdin/stdout (--stdio) or on a localhost socket.
+# The socket address and a random token are written to <db>.daemon.json
+# (owner-only, 0600) so CLI calls against the same DB can find it; the first
+# line of every connection must carry that token. Requests are handled one at
+# a time, which matches the single sqlite connection the app holds.
+
+
+def daemon_state_path(db_path: Path) -> Path:
+    return Path(str(db_path) + ".daemon.json")
+
+
+class DaemonConnection:
+    """Newline-delimited JSON over a socket; messages are only ever json-decoded."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.file = sock.makefile("rwb")
+
+    def send(self, message: Dict[str, object]):
+        self.file.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.file.flush()
+
+    def recv(self) -> Dict[str, object]:
+        line = self.file.readline()
+        if not line:
+            raise EOFError("daemon connection closed")
+        message = json.loads(line)
+        if not isinstance(message, dict):
+            raise ValueError("expected a JSON object")
+        return message
+
+    def close(self):
+        try:
+            self.file.close()
+        finally:
+            self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_daemon_state(state_path: Path, state: Dict[str, object]):
+    # unlink first: O_CREAT only applies the mode to a file it creates
+    state_path.unlink(missing_ok=True)
+    fd = os.open(state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+
+
+def handle_request(app: NotebookApp, request: Dict[str, object]) -> Dict[str, object]:
+    cmd = request.get("cmd")
+    try:
+        if cmd == "ping":
+            return {"ok": True, "db": str(app.db_path), "pid": os.getpid()}
+        if cmd == "stats":
+            return {"ok": True, "embed_cache": app.embed_cache.stats()}
+        if cmd == "record":
+            result = app.record_vocab(
+                request.get("english"),
+                request.get("chinese"),
+                request.get("meaning_en"),
+                request.get("meaning_zh"),
+                int(request.get("link_limit") or 120),
+            )
+            return {"ok": True, "result": result}
+        if cmd == "record_many":
+            rows = [
+                (r.get("english"), r.get("chinese"), r.get("meaning_en"), r.get("meaning_zh"))
+                for r in request.get("rows") or []
+            ]
+            return {"ok": True, "results": app.record_many(rows, int(request.get("link_limit") or 120))}
+        if cmd == "search":
+            user_hits, base_hits = app.search_user_vocab(
+                str(request.get("query") or ""),
+                str(request.get("language") or "auto"),
+                int(request.get("topk") or 5),
+                int(request.get("include_base") or 0),
+            )
+            return {"ok": True, "user_hits": [[score, entry] for score, entry in user_hits], "base_hits": base_hits}
+        return {"ok": False, "error": f"unknown command: {cmd}"}
+    except ValueError as exc:
+        return {"ok": False, "error": str(exc)}
+    except Exception as exc:  # noqa: BLE001 - keep the daemon alive for the next request
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def serve_stdio(app: NotebookApp):
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            response = {"ok": False, "error": "invalid json"}
+        else:
+            if request.get("cmd") == "shutdown":
+                break
+            response = handle_request(app, request)
+        sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+def _authenticated(conn: DaemonConnection, token: str) -> bool:
+    try:
+        hello = conn.recv()
+    except (OSError, EOFError, ValueError):
+        return False
+    return hmac.compare_digest(str(hello.get("token", "")), token)
+
+
+def serve_socket(app: NotebookApp, port: int = 0):
+    state_path = daemon_state_path(app.db_path)
+    token = secrets.token_hex(16)
+    with socket.create_server(("127.0.0.1", port)) as listener:
+        host, bound_port = listener.getsockname()[:2]
+        write_daemon_state(state_path, {"pid": os.getpid(), "host": host, "port": bound_port, "token": token})
+        print(f"Serving {app.db_path} on {host}:{bound_port}", flush=True)
+        try:
+            running = True
+            while running:
+                try:
+                    sock, _ = listener.accept()
+                except OSError:
+                    continue
+                with DaemonConnection(sock) as conn:
+                    if not _authenticated(conn, token):
+                        # wrong token or dropped client; keep serving
+                        continue
+                    conn.send({"ok": True})
+                    while True:
+                        try:
+                            request = conn.recv()
+                        except (OSError, EOFError):
+                            break
+                        except ValueError:
+                            response = {"ok": False, "error": "invalid json"}
+                        else:
+                            if request.get("cmd") == "shutdown":
+                                conn.send({"ok": True})
+                                running = False
+                                break
+                            response = handle_request(app, request)
+                        try:
+                            conn.send(response)
+                        except OSError:
+                            break
+        finally:
+            state_path.unlink(missing_ok=True)
+
+
+def connect_daemon(db_path: Path) -> Optional[DaemonConnection]:
+    """Connection to a live daemon serving db_path, or None (stale state files are removed).
+
+    A refused connection, a rejected token or a garbled state file all mean the
+    daemon that wrote the file is gone, so callers fall back to running locally.
+    """
+    state_path = daemon_state_path(db_path)
+    if not state_path.exists():
+        return None
+    conn = None
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        sock = socket.create_connection((state["host"], int(state["port"])), timeout=5.0)
+        sock.settimeout(None)
+        conn = DaemonConnection(sock)
+        conn.send({"token": str(state["token"])})
+        if conn.recv().get("ok"):
+            conn.send({"cmd": "ping"})
+            if conn.recv().get("ok"):
+                return conn
+    except (OSError, EOFError, ValueError, KeyError, TypeError):
+        state_path.unlink(missing_ok=True)
+    if conn is not None:
+        conn.close()
+    return None
+
+
+def daemon_request(args: argparse.Namespace, request: Dict[str, object]) -> Optional[Dict[str, object]]:
+    """Send request to the daemon for args.db if one is running; None means run locally."""
+    if getattr(args, "no_daemon", False) or getattr(args, "sql_dump", None):
+        return None
+    conn = connect_daemon(Path(args.db))
+    if conn is None:
+        return None
+    try:
+        with conn:
+            conn.send(request)
+            response = conn.recv()
+    except (OSError, EOFError, ValueError):
+        # daemon went away mid-request; the local path redoes it (record writes are upserts)
+        return None
+    if not response.get("ok"):
+        raise SystemExit(response.get("error") or "daemon request failed")
+    return response
+
+
 def build_app(args: argparse.Namespace) -> NotebookApp:
     sql_dump = Path(args.sql_dump) if getattr(args, "sql_dump", None) else None
-    return NotebookApp(Path(args.db), sql_dump=sql_dump, rebuild=getattr(args, "rebuild", False))
+    return NotebookApp(
+        Path(args.db),
+        sql_dump=sql_dump,
+        rebuild=getattr(args, "rebuild", False),
+        cache_bytes=int(getattr(args, "cache_mb", DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024,
+    )
 
 
 def cmd_init(args: argparse.Namespace):
@@ -335,18 +632,71 @@ def cmd_init(args: argparse.Namespace):
     print(f"Database ready at {app.db_path}")
 
 
-def cmd_record(args: argparse.Namespace):
-    app = build_app(args)
-    result = app.record_vocab(args.english, args.chinese, args.meaning_en, args.meaning_zh, args.link_limit)
+def print_record_result(result: Dict[str, Optional[float]]):
     print("Saved vocab entry.")
     if result["translation_score"] is not None:
         print(f"translation_edge score={result['translation_score']:.3f}")
     print(f"linked {result['en_links']} English synonym edges, {result['zh_links']} Chinese synonym edges")
 
 
-def cmd_search(args: argparse.Namespace):
+def cmd_record(args: argparse.Namespace):
+    response = daemon_request(
+        args,
+        {
+            "cmd": "record",
+            "english": args.english,
+            "chinese": args.chinese,
+            "meaning_en": args.meaning_en,
+            "meaning_zh": args.meaning_zh,
+            "link_limit": args.link_limit,
+        },
+    )
+    if response is not None:
+        print_record_result(response["result"])
+        return
     app = build_app(args)
-    user_hits, base_hits = app.search_user_vocab(args.query, args.language, args.topk, args.include_base)
+    print_record_result(app.record_vocab(args.english, args.chinese, args.meaning_en, args.meaning_zh, args.link_limit))
+
+
+RECORD_CSV_FIELDS = ("english", "chinese", "meaning_en", "meaning_zh")
+
+
+def iter_vocab_csv(path: Path) -> Iterator[Tuple[Optional[str], ...]]:
+    """Rows of a CSV with an english,chinese,meaning_en,meaning_zh header (see CSV_FORMAT_GUIDELINES.md)."""
+    with path.open(encoding="utf-8", newline="") as f:
+        reader = csv.DictReader((line for line in f if not line.lstrip().startswith("#")), skipinitialspace=True)
+        for row in reader:
+            values = []
+            for field in RECORD_CSV_FIELDS:
+                value = (row.get(field) or "").strip(" \t\u3000")
+                values.append(value or None)
+            yield tuple(values)
+
+
+def cmd_record_many(args: argparse.Namespace):
+    rows = list(iter_vocab_csv(Path(args.csv)))
+    valid = [r for r in rows if r[0] or r[1]]
+    skipped = len(rows) - len(valid)
+    app: Optional[NotebookApp] = None
+    linked = 0
+    for i in range(0, len(valid), args.batch_size):
+        batch = valid[i : i + args.batch_size]
+        request = {
+            "cmd": "record_many",
+            "rows": [dict(zip(RECORD_CSV_FIELDS, r)) for r in batch],
+            "link_limit": args.link_limit,
+        }
+        response = daemon_request(args, request)
+        if response is not None:
+            results = response["results"]
+        else:
+            app = app or build_app(args)
+            results = app.record_many(batch, args.link_limit)
+        linked += sum(r["en_links"] + r["zh_links"] for r in results)
+    print(f"Saved {len(valid)} vocab entries ({skipped} skipped without english/chinese), linked {linked} synonym edges")
+
+
+def print_search_results(user_hits, base_hits):
     print("User vocab hits:")
     for score, entry in user_hits:
         print(f"{score:.3f}\tEN: {entry['english'] or '-'}\tZH: {entry['chinese'] or '-'}")
@@ -363,10 +713,71 @@ def cmd_search(args: argparse.Namespace):
             )
 
 
+def cmd_search(args: argparse.Namespace):
+    response = daemon_request(
+        args,
+        {
+            "cmd": "search",
+            "query": args.query,
+            "language": args.language,
+            "topk": args.topk,
+            "include_base": args.include_base,
+        },
+    )
+    if response is not None:
+        print_search_results(response["user_hits"], response["base_hits"])
+        return
+    app = build_app(args)
+    user_hits, base_hits = app.search_user_vocab(args.query, args.language, args.topk, args.include_base)
+    print_search_results(user_hits, base_hits)
+
+
+def cmd_serve(args: argparse.Namespace):
+    if connect_daemon(Path(args.db)) is not None:
+        raise SystemExit(f"A daemon is already serving {args.db}")
+    app = build_app(args)
+    if args.preload:
+        app._get_model()
+    if args.stdio:
+        serve_stdio(app)
+    else:
+        serve_socket(app, args.port)
+
+
+def cmd_stats(args: argparse.Namespace):
+    conn = connect_daemon(Path(args.db))
+    if conn is None:
+        print("No daemon running.")
+        return
+    with conn:
+        conn.send({"cmd": "stats"})
+        stats = conn.recv()["embed_cache"]
+    print(
+        f"embedding cache: hit_rate={stats['hit_rate']:.3f} memory_hits={stats['memory_hits']} "
+        f"disk_hits={stats['disk_hits']} misses={stats['misses']} "
+        f"entries={stats['memory_entries']} bytes={stats['memory_bytes']}"
+    )
+
+
+def cmd_stop(args: argparse.Namespace):
+    conn = connect_daemon(Path(args.db))
+    if conn is None:
+        print("No daemon running.")
+        return
+    with conn:
+        conn.send({"cmd": "shutdown"})
+        conn.recv()
+    print("Daemon stopped.")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Vocab notebook main workflow")
     parser.add_argument("--db", default="notebook.db", help="SQLite path to read/write")
     parser.add_argument("--sql-dump", help="Optional .sql dump to hydrate the DB if missing")
+    parser.add_argument("--no-daemon", action="store_true", help="Run in-process even if a daemon is serving --db")
+    parser.add_argument(
+        "--cache-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="In-memory embedding cache budget"
+    )
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p_init = sub.add_parser("init", help="Create/open DB and optionally load a SQL dump")
@@ -381,6 +792,12 @@ def main():
     p_record.add_argument("--link-limit", type=int, default=120, help="Max LIKE candidates when linking synonyms")
     p_record.set_defaults(func=cmd_record)
 
+    p_many = sub.add_parser("record-many", help="Record every row of a CSV (english,chinese,meaning_en,meaning_zh)")
+    p_many.add_argument("--csv", required=True, help="CSV file with a header row")
+    p_many.add_argument("--batch-size", type=int, default=500, help="Rows per transaction / encode batch")
+    p_many.add_argument("--link-limit", type=int, default=120, help="Max LIKE candidates when linking synonyms")
+    p_many.set_defaults(func=cmd_record_many)
+
     p_search = sub.add_parser("search", help="Search recorded vocab bilingually")
     p_search.add_argument("--query", required=True, help="Text to search for")
     p_search.add_argument("--language", choices=["auto", "en", "zh", "both"], default="auto", help="Language hint")
@@ -390,6 +807,18 @@ def main():
     )
     p_search.set_defaults(func=cmd_search)
 
+    p_serve = sub.add_parser("serve", help="Keep the model and DB loaded and answer record/search requests")
+    p_serve.add_argument("--stdio", action="store_true", help="Read JSON requests from stdin instead of a socket")
+    p_serve.add_argument("--port", type=int, default=0, help="Localhost port (0 picks a free one)")
+    p_serve.add_argument("--preload", action="store_true", help="Load the embedding model before serving")
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_stats = sub.add_parser("stats", help="Show embedding cache statistics of the running daemon")
+    p_stats.set_defaults(func=cmd_stats)
+
+    p_stop = sub.add_parser("stop", help="Stop the daemon serving --db")
+    p_stop.set_defaults(func=cmd_stop)
+
     args = parser.parse_args()
     args.func(args)
 
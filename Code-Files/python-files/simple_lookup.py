@@ -6,11 +6,20 @@ Examples:
   python Code-Files/python-files/simple_lookup.py --db notebook.db --text "hao" --language zh
 
 Returns whether the term exists in the edges DB and lists direct synonyms (and translations).
+
+Batch mode reads one term per line from a file (or `-` for stdin) and writes TSV or JSONL:
+  python Code-Files/python-files/simple_lookup.py --db notebook.db --batch terms.txt --language en --format jsonl
 """
 import argparse
+import json
 import sqlite3
+import sys
 from pathlib import Path
-from typing import List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Set, TextIO, Tuple
+
+BATCH_ROWS = 50000
+# names of ai_initializer.LOOKUP_INDEXES (not imported: that module pulls in torch)
+LOOKUP_INDEX_NAMES = ("idx_syn_left_lookup", "idx_syn_right_lookup", "idx_trans_en_lookup", "idx_trans_zh_lookup")
 
 
 def normalize(term: str, language: str) -> str:
@@ -60,17 +69,119 @@ def lookup(db_path: Path, raw_term: str, language: str) -> Tuple[bool, List[str]
     return found, sorted(synonyms), sorted(translations)
 
 
+def iter_chunks(lines: Iterable[str], size: int = BATCH_ROWS) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for line in lines:
+        line = line.strip().lstrip("\ufeff")
+        if not line:
+            continue
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def lookup_batch(
+    conn: sqlite3.Connection, raw_terms: List[str], language: str
+) -> Iterator[Tuple[str, bool, List[str], List[str]]]:
+    """Resolve many terms with three joins against a temp table instead of two queries per term."""
+    terms = [normalize(t, language) for t in raw_terms]
+    cur = conn.cursor()
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_terms(term TEXT PRIMARY KEY)")
+    cur.execute("DELETE FROM temp.lookup_terms")
+    cur.executemany("INSERT OR IGNORE INTO temp.lookup_terms(term) VALUES (?)", [(t,) for t in terms])
+    synonyms: Dict[str, Set[str]] = {}
+    translations: Dict[str, Set[str]] = {}
+    cur.execute(
+        """
+        SELECT q.term, s.right_term FROM temp.lookup_terms q
+        JOIN synonym_edge s ON s.left_term = q.term AND s.language = ?
+        UNION ALL
+        SELECT q.term, s.left_term FROM temp.lookup_terms q
+        JOIN synonym_edge s ON s.right_term = q.term AND s.language = ?
+        """,
+        (language, language),
+    )
+    for term, peer in cur.fetchall():
+        if peer:
+            synonyms.setdefault(term, set()).add(peer)
+    own, other = ("en_term", "zh_term") if language == "en" else ("zh_term", "en_term")
+    cur.execute(
+        f"""
+        SELECT q.term, t.{other} FROM temp.lookup_terms q
+        JOIN translation_edge t ON t.{own} = q.term
+        """
+    )
+    for term, peer in cur.fetchall():
+        if peer:
+            translations.setdefault(term, set()).add(peer)
+    for raw, term in zip(raw_terms, terms):
+        syns = sorted(synonyms.get(term, ()))
+        trans = sorted(translations.get(term, ()))
+        yield raw, bool(syns or trans), syns, trans
+
+
+def warn_missing_indexes(conn: sqlite3.Connection, db_path: Path):
+    """Tell the user (on stderr) how to create the lookup indexes when the DB lacks them."""
+    placeholders = ",".join("?" * len(LOOKUP_INDEX_NAMES))
+    found = {
+        r[0]
+        for r in conn.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'index' AND name IN ({placeholders})", LOOKUP_INDEX_NAMES
+        )
+    }
+    missing = [name for name in LOOKUP_INDEX_NAMES if name not in found]
+    if missing:
+        print(
+            f"warning: {db_path} lacks the lookup indexes ({', '.join(missing)}); batch lookups will scan. "
+            f"Create them once with: python Code-Files/python-files/main_workflow.py --db {db_path} init",
+            file=sys.stderr,
+        )
+
+
+def run_batch(db_path: Path, source: TextIO, out: TextIO, language: str, fmt: str):
+    # read-only: the covering indexes come from the ai_initializer build (or main_workflow init
+    # for a DB loaded from the SQL dump); without them the joins fall back to the edge tables'
+    # UNIQUE indexes and a scan for the other side
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    warn_missing_indexes(conn, db_path)
+    if fmt == "tsv":
+        out.write("term\tfound\tsynonyms\ttranslations\n")
+    for chunk in iter_chunks(source):
+        for raw, found, syns, trans in lookup_batch(conn, chunk, language):
+            if fmt == "jsonl":
+                row = {"term": raw, "found": found, "synonyms": syns, "translations": trans}
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                out.write(f"{raw}\t{str(found).lower()}\t{'|'.join(syns)}\t{'|'.join(trans)}\n")
+    conn.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Simple synonym/translation lookup")
     parser.add_argument("--db", default="notebook.db", help="SQLite path produced by ai_initializer build")
-    parser.add_argument("--text", required=True, help="Input word/phrase")
+    parser.add_argument("--text", help="Input word/phrase")
+    parser.add_argument("--batch", help="File with one term per line ('-' for stdin)")
+    parser.add_argument("--format", choices=["tsv", "jsonl"], default="tsv", help="Batch output format")
     parser.add_argument("--language", choices=["en", "zh"], default="en", help="Language of the input")
     args = parser.parse_args()
+    if not args.text and not args.batch:
+        parser.error("one of --text or --batch is required")
 
     db_path = Path(args.db)
     if not db_path.exists():
         raise SystemExit(f"DB not found at {db_path}. Run ai_initializer/test_interface with --build first.")
 
+    if args.batch:
+        if args.batch == "-":
+            run_batch(db_path, sys.stdin, sys.stdout, args.language, args.format)
+        else:
+            with open(args.batch, encoding="utf-8") as source:
+                run_batch(db_path, source, sys.stdout, args.language, args.format)
+        return
+
     found, synonyms, translations = lookup(db_path, args.text, args.language)
     print(f"found={found}")
     if synonyms:
@@ -84,8 +195,4 @@ def main():
 
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 792df40 (lasdfsa)
@@ -4,16 +4,29 @@
 Example:
   python Code-Files/python-files/simple_pair_embed.py --w1 "happy" --w2 "glad" --language en
   python Code-Files/python-files/simple_pair_embed.py --w1 "happy" --w2 "快乐" --language zh
+
+Batch mode scores one pair per line ("w1<TAB>w2" or "w1,w2") from a file or stdin (`-`),
+encoding every distinct term once; --cache reuses vectors from a shared embedding cache file:
+  python Code-Files/python-files/simple_pair_embed.py --batch pairs.tsv --cache notebook.db.embcache
 """
 import argparse
+import json
 import re
-from typing import Tuple
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional, TextIO, Tuple
 
+import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer, util
 
+from embed_cache import EmbeddingCache
+from simple_lookup import iter_chunks
+from simple_pair_lookup import split_pair
+
 MODEL_NAME = "intfloat/multilingual-e5-small"
 DEFAULT_THRESHOLD = 0.60
+ENCODE_BATCH = 256
 CJK_RE = re.compile(r"[\u4e00-\u9fff]")
 
 
@@ -36,19 +49,87 @@ def score_pair(w1: str, w2: str, language: str, threshold: float) -> Tuple[float
     return score, score >= threshold
 
 
+def pair_language(w1: str, w2: str, language: str) -> str:
+    if language != "auto":
+        return language
+    return "zh" if infer_language(w1) == "zh" or infer_language(w2) == "zh" else "en"
+
+
+def score_pairs(
+    model: SentenceTransformer,
+    pairs: List[Tuple[str, str]],
+    language: str,
+    threshold: float,
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: int = ENCODE_BATCH,
+) -> Iterator[Tuple[str, str, float, bool]]:
+    """score_pair for many pairs: distinct terms are encoded once, scores are one row-wise dot product."""
+    if not pairs:
+        return
+    normed = []
+    for w1, w2 in pairs:
+        lang = pair_language(w1, w2, language)
+        normed.append((normalize(w1, lang), normalize(w2, lang)))
+    terms = list(dict.fromkeys(t for pair in normed for t in pair))
+    if cache is not None:
+        vecs = cache.encode(terms, model, batch_size)
+    else:
+        vecs = np.asarray(
+            model.encode(terms, convert_to_numpy=True, normalize_embeddings=True, batch_size=batch_size),
+            dtype=np.float32,
+        )
+    rows = {t: i for i, t in enumerate(terms)}
+    left = vecs[[rows[a] for a, _ in normed]]
+    right = vecs[[rows[b] for _, b in normed]]
+    scores = np.einsum("ij,ij->i", left, right)
+    for (w1, w2), score in zip(pairs, scores):
+        yield w1, w2, float(score), bool(score >= threshold)
+
+
+def run_batch(
+    source: TextIO, out: TextIO, language: str, threshold: float, fmt: str, cache: Optional[EmbeddingCache] = None
+):
+    model = SentenceTransformer(MODEL_NAME)
+    if fmt == "tsv":
+        out.write("w1\tw2\tsimilar\tscore\n")
+    for chunk in iter_chunks(source):
+        pairs = [p for p in (split_pair(line) for line in chunk) if p]
+        for w1, w2, score, passed in score_pairs(model, pairs, language, threshold, cache):
+            if fmt == "jsonl":
+                row = {"w1": w1, "w2": w2, "similar": passed, "score": score}
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                out.write(f"{w1}\t{w2}\t{str(passed).lower()}\t{score:.3f}\n")
+        out.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Embed two terms and check similarity")
-    parser.add_argument("--w1", required=True, help="First word")
-    parser.add_argument("--w2", required=True, help="Second word")
+    parser.add_argument("--w1", help="First word")
+    parser.add_argument("--w2", help="Second word")
+    parser.add_argument("--batch", help="File with one pair per line, tab or comma separated ('-' for stdin)")
+    parser.add_argument("--format", choices=["tsv", "jsonl"], default="tsv", help="Batch output format")
+    parser.add_argument("--cache", help="Embedding cache file to reuse/extend (e.g. notebook.db.embcache)")
     parser.add_argument("--language", choices=["en", "zh", "auto"], default="auto", help="Language for normalization; auto uses basic script detection")
     parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Cosine threshold to consider similar")
     args = parser.parse_args()
+    if not args.batch and not (args.w1 and args.w2):
+        parser.error("either --w1 and --w2, or --batch, is required")
+
+    if args.batch:
+        cache = EmbeddingCache(Path(args.cache), MODEL_NAME) if args.cache else None
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.language, args.threshold, args.format, cache)
+        else:
+            with open(args.batch, encoding="utf-8") as source:
+                run_batch(source, sys.stdout, args.language, args.threshold, args.format, cache)
+        if cache is not None:
+            stats = cache.stats()
+            print(f"cache hit_rate={stats['hit_rate']:.3f} misses={stats['misses']}", file=sys.stderr)
+            cache.close()
+        return
 
-    lang = args.language
-    if lang == "auto":
-        l1 = infer_language(args.w1)
-        l2 = infer_language(args.w2)
-        lang = "zh" if l1 == "zh" or l2 == "zh" else "en"
+    lang = pair_language(args.w1, args.w2, args.language)
 
     score, is_similar = score_pair(args.w1, args.w2, lang, args.threshold)
     print(f"similar={is_similar}")
@@ -57,8 +138,4 @@ def main():
 
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 792df40 (lasdfsa)
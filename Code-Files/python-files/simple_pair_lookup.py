@@ -6,11 +6,18 @@ Example:
   python Code-Files/python-files/simple_pair_lookup.py --db notebook.db --w1 "happy" --w2 "快乐" --language zh
 
 Returns true/false and any stored score from synonym_edge/translation_edge.
+
+Batch mode reads one pair per line ("w1<TAB>w2" or "w1,w2") from a file (or `-` for stdin):
+  python Code-Files/python-files/simple_pair_lookup.py --db notebook.db --batch pairs.tsv --language en --format tsv
 """
 import argparse
+import json
 import sqlite3
+import sys
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from simple_lookup import iter_chunks, warn_missing_indexes
 
 
 def normalize(term: str, language: str) -> str:
@@ -67,18 +74,98 @@ def check_pair(db_path: Path, w1: str, w2: str, language: str) -> Tuple[bool, Op
     return False, None, "none"
 
 
+def split_pair(line: str) -> Optional[Tuple[str, str]]:
+    parts = line.split("\t") if "\t" in line else line.replace("，", ",").split(",")
+    if len(parts) < 2:
+        return None
+    return parts[0].strip(), parts[1].strip()
+
+
+def check_pairs(
+    conn: sqlite3.Connection, pairs: List[Tuple[str, str]], language: str
+) -> Iterator[Tuple[str, str, bool, Optional[float], str]]:
+    """check_pair for many pairs: both edge tables are joined once against a temp table of pairs."""
+    cur = conn.cursor()
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_pairs(idx INTEGER PRIMARY KEY, a TEXT, b TEXT)")
+    cur.execute("DELETE FROM temp.lookup_pairs")
+    cur.executemany(
+        "INSERT INTO temp.lookup_pairs(idx, a, b) VALUES (?, ?, ?)",
+        [(i, normalize(w1, language), normalize(w2, language)) for i, (w1, w2) in enumerate(pairs)],
+    )
+    hits: Dict[int, Tuple[float, str]] = {}
+    cur.execute(
+        """
+        SELECT p.idx, s.score FROM temp.lookup_pairs p
+        JOIN synonym_edge s ON s.left_term = p.a AND s.language = ? AND s.right_term = p.b
+        UNION ALL
+        SELECT p.idx, s.score FROM temp.lookup_pairs p
+        JOIN synonym_edge s ON s.left_term = p.b AND s.language = ? AND s.right_term = p.a
+        """,
+        (language, language),
+    )
+    for idx, score in cur.fetchall():
+        hits.setdefault(idx, (score, "synonym_edge"))
+    cur.execute(
+        """
+        SELECT p.idx, t.score FROM temp.lookup_pairs p
+        JOIN translation_edge t ON t.en_term = p.a AND t.zh_term = p.b
+        UNION ALL
+        SELECT p.idx, t.score FROM temp.lookup_pairs p
+        JOIN translation_edge t ON t.en_term = p.b AND t.zh_term = p.a
+        """
+    )
+    for idx, score in cur.fetchall():
+        hits.setdefault(idx, (score, "translation_edge"))
+    for i, (w1, w2) in enumerate(pairs):
+        if i in hits:
+            score, source = hits[i]
+            yield w1, w2, True, score, source
+        else:
+            yield w1, w2, False, None, "none"
+
+
+def run_batch(db_path: Path, source: TextIO, out: TextIO, language: str, fmt: str):
+    # read-only, like simple_lookup.run_batch; the lookup indexes are optional but warned about
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    warn_missing_indexes(conn, db_path)
+    if fmt == "tsv":
+        out.write("w1\tw2\tlinked\tsource\tscore\n")
+    for chunk in iter_chunks(source):
+        pairs = [p for p in (split_pair(line) for line in chunk) if p]
+        for w1, w2, linked, score, src in check_pairs(conn, pairs, language):
+            if fmt == "jsonl":
+                row = {"w1": w1, "w2": w2, "linked": linked, "source": src, "score": score}
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                score_text = f"{score:.3f}" if score is not None else ""
+                out.write(f"{w1}\t{w2}\t{str(linked).lower()}\t{src}\t{score_text}\n")
+    conn.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Check if two terms are linked in the DB")
     parser.add_argument("--db", default="notebook.db", help="SQLite path from ai_initializer build")
-    parser.add_argument("--w1", required=True, help="First word")
-    parser.add_argument("--w2", required=True, help="Second word")
+    parser.add_argument("--w1", help="First word")
+    parser.add_argument("--w2", help="Second word")
+    parser.add_argument("--batch", help="File with one pair per line, tab or comma separated ('-' for stdin)")
+    parser.add_argument("--format", choices=["tsv", "jsonl"], default="tsv", help="Batch output format")
     parser.add_argument("--language", choices=["en", "zh"], default="en", help="Language of the pair (for synonym lookup)")
     args = parser.parse_args()
+    if not args.batch and not (args.w1 and args.w2):
+        parser.error("either --w1 and --w2, or --batch, is required")
 
     db_path = Path(args.db)
     if not db_path.exists():
         raise SystemExit(f"DB not found at {db_path}. Build it first (test_interface.py --build).")
 
+    if args.batch:
+        if args.batch == "-":
+            run_batch(db_path, sys.stdin, sys.stdout, args.language, args.format)
+        else:
+            with open(args.batch, encoding="utf-8") as source:
+                run_batch(db_path, source, sys.stdout, args.language, args.format)
+        return
+
     linked, score, source = check_pair(db_path, args.w1, args.w2, args.language)
     print(f"linked={linked}")
     print(f"source={source}")
@@ -87,8 +174,4 @@ def main():
 
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 792df40 (lasdfsa)
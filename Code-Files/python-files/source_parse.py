@@ -0,0 +1,199 @@
+"""
+Source dataset parsing for the ai_initializer build.
+
+Kept free of torch/sentence_transformers so the spawn workers of
+iter_parsed_parallel start with only the standard library imported.
+"""
+import codecs
+import csv
+import io
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+BRACKETS_RE = re.compile(r"\[.*?\]|\(.*?\)")
+TRANS_DELIMS_RE = re.compile(r"[;\uFF1B/\u3001]+")
+ZH_SPLIT_RE = re.compile(r"[,\uFF0C\s]+")
+
+
+def clean_translation_field(raw: str) -> List[str]:
+    """Parse the translation column into candidate Chinese terms."""
+    raw = BRACKETS_RE.sub("", raw)
+    raw = raw.replace("\u3000", " ")  # full-width space
+    raw = TRANS_DELIMS_RE.sub(",", raw)
+    out: List[str] = []
+    for part in raw.split(","):
+        tok = part.strip()
+        if not tok or not CJK_RE.search(tok):
+            continue
+        punct_ratio = sum(ch in ".,;\uFF0C\u3001/()[]" for ch in tok) / len(tok)
+        if punct_ratio > 0.3 or len(tok) > 30:
+            continue
+        out.append(tok)
+    return out
+
+
+def _en_group_from_row(row: List[str]) -> List[str]:
+    tokens = [col.strip().lower() for col in row if col.strip()]
+    return tokens if len(tokens) > 1 else []
+
+
+def _zh_group_from_line(raw: str) -> List[str]:
+    tokens = [p.strip().lower() for p in ZH_SPLIT_RE.split(raw) if p.strip()]
+    return tokens if len(tokens) > 1 else []
+
+
+def _pairs_from_row(row: Dict[str, str]) -> List[Tuple[str, str]]:
+    en = (row.get("word") or "").strip().lower()
+    if not en:
+        return []
+    return [(en, zh) for zh in clean_translation_field(row.get("translation") or "")]
+
+
+def iter_en_synonym_groups(path: Path) -> Iterable[List[str]]:
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            tokens = _en_group_from_row(row)
+            if tokens:
+                yield tokens
+
+
+def iter_zh_synonym_groups(path: Path) -> Iterable[List[str]]:
+    with path.open(encoding="utf-8-sig") as f:
+        for raw in f:
+            tokens = _zh_group_from_line(raw)
+            if tokens:
+                yield tokens
+
+
+def iter_translation_pairs(path: Path) -> Iterable[Tuple[str, str]]:
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            yield from _pairs_from_row(row)
+
+
+def plan_workers(workers: int = 0, total_threads: int = 0) -> Tuple[int, int]:
+    """
+    Split the core count into (processes, torch threads per process); workers <= 0
+    means one process per core. The only copy in this tree, shared by parsing and
+    encoding; app/backend/src/semantic/pool.py keeps the same rules for the
+    separately packaged backend.
+    """
+    cores = total_threads or os.cpu_count() or 1
+    n = workers if workers > 0 else cores
+    n = max(1, min(n, cores))
+    return n, max(1, cores // n)
+
+
+# ---- parallel parsing -----------------------------------------------------
+# The source files are split into byte ranges that end on record boundaries. For
+# CSV files the boundary search tracks double-quote parity so a newline inside a
+# quoted field never starts a new range ("" escapes keep the parity intact).
+
+
+def split_byte_ranges(path: Path, n_ranges: int, quoted: bool = True, start: int = 0) -> List[Tuple[int, int]]:
+    """Split path[start:] into ~n_ranges (begin, end) byte ranges that each end after a record's newline."""
+    size = path.stat().st_size
+    if size <= start:
+        return []
+    n_ranges = max(1, n_ranges)
+    targets = [start + (size - start) * i // n_ranges for i in range(1, n_ranges)]
+    bounds = [start]
+    ti = 0
+    want = targets[0] if targets else None
+    in_quotes = False
+    pos = 0
+    with path.open("rb") as f:
+        while want is not None:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            end = pos + len(block)
+            while want is not None and want < end:
+                k = max(want - pos, 0)
+                q = in_quotes ^ bool(block.count(b'"', 0, k) & 1) if quoted else False
+                found = -1
+                j = block.find(b"\n", k)
+                while j != -1:
+                    if quoted:
+                        q ^= bool(block.count(b'"', k, j) & 1)
+                    if not q:
+                        found = pos + j + 1
+                        break
+                    k = j + 1
+                    j = block.find(b"\n", k)
+                if found == -1:
+                    want = end  # keep looking from the start of the next block
+                    break
+                if found > bounds[-1] and found < size:
+                    bounds.append(found)
+                while ti < len(targets) and targets[ti] < found:
+                    ti += 1
+                want = targets[ti] if ti < len(targets) else None
+            if quoted:
+                in_quotes ^= bool(block.count(b'"') & 1)
+            pos = end
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _parse_range(job: Tuple[str, str, int, int, Optional[List[str]]]):
+    kind, path, begin, end, fieldnames = job
+    with open(path, "rb") as f:
+        f.seek(begin)
+        text = f.read(end - begin).decode("utf-8", "replace")
+    n_rows = 0
+    out: List[List[str]] = []
+    if kind == "translation_pairs":
+        for row in csv.DictReader(io.StringIO(text, newline=""), fieldnames=fieldnames):
+            n_rows += 1
+            out.extend(list(pair) for pair in _pairs_from_row(row))
+    elif kind == "en_groups":
+        for row in csv.reader(io.StringIO(text, newline="")):
+            n_rows += 1
+            tokens = _en_group_from_row(row)
+            if tokens:
+                out.append(tokens)
+    else:
+        for raw in text.splitlines():
+            n_rows += 1
+            tokens = _zh_group_from_line(raw)
+            if tokens:
+                out.append(tokens)
+    return n_rows, out
+
+
+def iter_parsed_parallel(kind: str, path: Path, workers: int = 0, stats: Optional[Dict[str, float]] = None):
+    """
+    Parse one source file (kind: en_groups, zh_groups or translation_pairs) across a
+    process pool and yield the same rows, in the same order, as the sequential
+    iter_* readers; repeated rows are left to the unique keys downstream. stats
+    receives rows, seconds and rows_per_sec once the generator is exhausted.
+    """
+    import multiprocessing as mp
+
+    t0 = time.perf_counter()
+    fieldnames = None
+    with path.open("rb") as f:
+        # skip a UTF-8 BOM, as the utf-8-sig sequential readers do
+        start = len(codecs.BOM_UTF8) if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 0
+        if kind == "translation_pairs":
+            f.seek(start)
+            header = f.readline()
+            fieldnames = next(csv.reader([header.decode("utf-8")]))
+            start += len(header)
+    n_proc, _ = plan_workers(workers)
+    ranges = split_byte_ranges(path, n_proc * 4, quoted=kind != "zh_groups", start=start)
+    jobs = [(kind, str(path), a, b, fieldnames) for a, b in ranges]
+    n_rows = 0
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(processes=n_proc) as pool:
+        for rows_read, results in pool.imap(_parse_range, jobs):
+            n_rows += rows_read
+            yield from results
+    dt = time.perf_counter() - t0
+    if stats is not None:
+        stats.update({"rows": n_rows, "seconds": dt, "rows_per_sec": n_rows / dt if dt else 0.0})
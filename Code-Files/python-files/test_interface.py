@@ -10,14 +10,13 @@ If the DB is missing, pass --build to construct it first.
 import argparse
 from pathlib import Path
 
-from ai_initializer import build_edges, persist_edges, query_from_db
+from ai_initializer import build_edges_streaming, query_from_db
 
 
 def ensure_db(db_path: Path, build: bool, syn_threshold: float, trans_threshold: float):
     if db_path.exists() and not build:
         return
-    syn_edges, trans_edges, _, _, vocab = build_edges(syn_threshold, trans_threshold)
-    persist_edges(db_path, syn_edges, trans_edges, vocab)
+    build_edges_streaming(db_path, syn_threshold, trans_threshold)
 
 
 def run_once(db_path: Path, text: str, language: str, topk: int):
@@ -64,8 +63,4 @@ def main():
 
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 792df40 (lasdfsa)
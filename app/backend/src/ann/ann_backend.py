@@ -9,6 +9,9 @@ class BaseAnnBackend:
     def search(self, index, query_vec, top_k: int):
         raise NotImplementedError
 
+    def search_batch(self, index, query_vecs, top_k: int):
+        return [self.search(index, q, top_k) for q in query_vecs]
+
     def save(self, index, path: str):
         raise NotImplementedError
 
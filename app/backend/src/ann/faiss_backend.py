@@ -38,6 +38,16 @@ class FaissBackend(BaseAnnBackend):
             res.append((int(idx), float(score)))
         return res
 
+    def search_batch(self, index: Any, query_vecs, top_k: int):
+        import numpy as np  # type: ignore
+        q = np.array(query_vecs, dtype=np.float32)
+        self.faiss.normalize_L2(q)
+        scores, idxs = index.search(q, top_k)
+        out = []
+        for row_scores, row_idxs in zip(scores, idxs):
+            out.append([(int(idx), float(score)) for score, idx in zip(row_scores, row_idxs) if idx != -1])
+        return out
+
     def save(self, index: Any, path: str):
         self.faiss.write_index(index, path)
 
@@ -4,13 +4,14 @@ from typing import List, Dict, Any, Optional
 import time
 from array import array
 
-from db import get_entry
+from db import get_entry, get_entries_by_ids
 from semantic import (
     DEFAULT_MODEL,
     SemanticUnavailable,
     _ensure_model,
     _encode,
     _unpack_vec,
+    semantic_search_batch,
 )
 from ann.faiss_backend import FaissBackend, AnnUnavailable
 from db import fetch_ann_queue, clear_ann_queue, count_ann_queue
@@ -146,3 +147,49 @@ def ann_search(db_path: Path, q: str, top_k: int = 10, model: str = DEFAULT_MODE
             }
         )
     return results
+
+
+def ann_search_batch(db_path: Path, queries: List[str], top_k: int = 10, model: str = DEFAULT_MODEL):
+    """
+    Encode all queries in one call and run a single FAISS batch search. Without a
+    usable ANN index the same query matrix is scored by semantic_search_batch, so
+    the fallback does not encode again; SemanticUnavailable means no encoder.
+    """
+    if not queries:
+        return []
+    model_obj = _ensure_model(model, None)
+    q_embs = _encode(model_obj, list(queries))
+    status = ann_status(db_path, model)
+    base, index_path, meta_path = _paths(db_path, model)
+    try:
+        if not status.get("enabled"):
+            raise AnnUnavailable("ANN backend not available")
+        if not index_path.exists() and rebuild_ann_index(db_path, model) == 0:
+            raise AnnUnavailable("No embeddings to build ANN")
+        backend = FaissBackend(len(q_embs[0]))
+    except (AnnUnavailable, SemanticUnavailable):
+        return semantic_search_batch(db_path, queries, top_k, model_name=model, query_embs=q_embs)
+    index = backend.load(str(index_path))
+    batch_hits = backend.search_batch(index, q_embs, top_k)
+    wanted = {eid for hits in batch_hits for eid, _ in hits}
+    entries = {e["id"]: e for e in get_entries_by_ids(db_path, list(wanted))}
+    results = []
+    for hits in batch_hits:
+        row = []
+        for eid, score in hits:
+            entry = entries.get(eid)
+            if not entry:
+                continue
+            row.append(
+                {
+                    "id": eid,
+                    "language": entry["language"],
+                    "word": entry["word"],
+                    "translation": entry.get("translation"),
+                    "notes": entry.get("notes"),
+                    "score": score,
+                    "match_type": "semantic_ann",
+                }
+            )
+        results.append(row)
+    return results
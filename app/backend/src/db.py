@@ -1,10 +1,14 @@
+import base64
+import json
 import sqlite3
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import time
 from difflib import SequenceMatcher
 
-DB_VERSION = 7
+DB_VERSION = 14
+BIGRAM_MAX_CHARS = 1024  # longer texts only get bigrams for their first 1024 characters
+BIGRAM_GLOB = "[\u3400-\u9fff][\u3400-\u9fff]"
 
 
 def _safe_text(val: Any) -> str:
@@ -19,6 +23,34 @@ def _safe_text(val: Any) -> str:
     return val.encode("utf-8", "surrogatepass").decode("utf-8", "replace")
 
 
+def encode_cursor(updated_at: Optional[float], row_id: int) -> str:
+    """Opaque keyset cursor for the row a page ended on."""
+    raw = json.dumps([updated_at, row_id], separators=(",", ":")).encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    if not cursor:
+        return None
+    try:
+        updated_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        # a NULL updated_at would never compare below the cursor; the v14 migration backfills them
+        return float(updated_at), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("invalid_cursor")
+
+
+def _keyset_page(
+    rows: List[Tuple[Any, ...]], limit: int, updated_idx: int
+) -> Tuple[List[Tuple[Any, ...]], Optional[str]]:
+    # rows were fetched with LIMIT limit + 1; the extra row only signals that another page exists
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[updated_idx], last[0])
+
+
 def _connect(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
     return sqlite3.connect(str(db_path))
@@ -30,6 +62,25 @@ def _get_version(cur) -> int:
     return row[0] if row else 0
 
 
+def _bigram_insert_sql(source: str) -> str:
+    """
+    INSERT ... SELECT of every CJK character pair in source, a (id, txt) subquery over
+    word/translation/notes; written without a CTE so it can run inside triggers.
+    """
+    return f"""
+        INSERT OR IGNORE INTO entry_bigram(gram, entry_id)
+        SELECT DISTINCT substr(t.txt, p.n, 2), t.id
+        FROM ({source}) t
+        JOIN bigram_pos p ON p.n < length(t.txt)
+        WHERE substr(t.txt, p.n, 2) GLOB '{BIGRAM_GLOB}'
+    """
+
+
+_BIGRAM_NEW_ROW = (
+    "SELECT new.id AS id, new.word AS txt UNION ALL SELECT new.id, new.translation UNION ALL SELECT new.id, new.notes"
+)
+
+
 def _migrate(conn: sqlite3.Connection):
     cur = conn.cursor()
     ver = _get_version(cur)
@@ -189,6 +240,173 @@ def _migrate(conn: sqlite3.Connection):
         )
         cur.execute("PRAGMA user_version = 7;")
         ver = 7
+    if ver < 8:
+        # keyset pagination: ORDER BY updated_at DESC, id DESC walks these indexes
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_deleted_updated ON entries(deleted_at, updated_at, id);"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_records_updated ON records(updated_at, id);")
+        cur.execute("PRAGMA user_version = 8;")
+        ver = 8
+    if ver < 9:
+        # trigram index next to entries_fts: unicode61 keeps a run of Chinese characters as
+        # one token, trigrams make CJK text and mid-word substrings matchable
+        cur.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS entries_trgm USING fts5(
+                word, translation, notes, content='entries', content_rowid='id', tokenize='trigram'
+            );
+            """
+        )
+        cur.execute("INSERT INTO entries_trgm(entries_trgm) VALUES('rebuild');")
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_entries_ai_trgm AFTER INSERT ON entries BEGIN
+                INSERT INTO entries_trgm(rowid, word, translation, notes)
+                VALUES (new.id, new.word, new.translation, new.notes);
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_entries_ad_trgm AFTER DELETE ON entries BEGIN
+                INSERT INTO entries_trgm(entries_trgm, rowid, word, translation, notes)
+                VALUES ('delete', old.id, old.word, old.translation, old.notes);
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_entries_au_trgm AFTER UPDATE ON entries BEGIN
+                INSERT INTO entries_trgm(entries_trgm, rowid, word, translation, notes)
+                VALUES ('delete', old.id, old.word, old.translation, old.notes);
+                INSERT INTO entries_trgm(rowid, word, translation, notes)
+                VALUES (new.id, new.word, new.translation, new.notes);
+            END;
+            """
+        )
+        cur.execute("PRAGMA user_version = 9;")
+        ver = 9
+    if ver < 10:
+        # symmetric-delete index for matching.symspell: delete variants of word/translation
+        # terms -> entry; filled incrementally past the (updated_at, id) watermark in the state row
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entry_symspell(
+                del_key TEXT NOT NULL,
+                entry_id INTEGER NOT NULL,
+                field TEXT NOT NULL,
+                PRIMARY KEY(del_key, entry_id, field),
+                FOREIGN KEY(entry_id) REFERENCES entries(id)
+            ) WITHOUT ROWID;
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_entry_symspell_entry ON entry_symspell(entry_id);")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entry_symspell_state(
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                synced_at REAL NOT NULL,
+                synced_id INTEGER NOT NULL
+            );
+            """
+        )
+        cur.execute("INSERT OR IGNORE INTO entry_symspell_state(id, synced_at, synced_id) VALUES (1, 0, 0);")
+        cur.execute("PRAGMA user_version = 10;")
+        ver = 10
+    if ver < 11:
+        # pinyin keys (tone3 "ren4xing4", plain "renxing", initials "rx") of Chinese words and
+        # translation senses -> entry; maintained by matching.pinyin past its own watermark
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entry_pinyin(
+                key TEXT NOT NULL,
+                entry_id INTEGER NOT NULL,
+                field TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                PRIMARY KEY(key, entry_id, field, kind),
+                FOREIGN KEY(entry_id) REFERENCES entries(id)
+            ) WITHOUT ROWID;
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_entry_pinyin_entry ON entry_pinyin(entry_id);")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entry_pinyin_state(
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                synced_at REAL NOT NULL,
+                synced_id INTEGER NOT NULL
+            );
+            """
+        )
+        cur.execute("INSERT OR IGNORE INTO entry_pinyin_state(id, synced_at, synced_id) VALUES (1, 0, 0);")
+        cur.execute("PRAGMA user_version = 11;")
+        ver = 11
+    if ver < 12:
+        # CJK bigrams -> entry for 2-character queries, which trigrams cannot answer (most
+        # Chinese words are two characters); bigram_pos supplies substr() offsets to the triggers
+        cur.execute("CREATE TABLE IF NOT EXISTS bigram_pos(n INTEGER PRIMARY KEY);")
+        cur.execute(
+            f"""
+            INSERT OR IGNORE INTO bigram_pos(n)
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {BIGRAM_MAX_CHARS})
+            SELECT n FROM seq;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entry_bigram(
+                gram TEXT NOT NULL,
+                entry_id INTEGER NOT NULL,
+                PRIMARY KEY(gram, entry_id),
+                FOREIGN KEY(entry_id) REFERENCES entries(id)
+            ) WITHOUT ROWID;
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_entry_bigram_entry ON entry_bigram(entry_id);")
+        cur.execute(
+            _bigram_insert_sql(
+                "SELECT id, word AS txt FROM entries UNION ALL SELECT id, translation FROM entries "
+                "UNION ALL SELECT id, notes FROM entries"
+            )
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_entries_ai_bigram AFTER INSERT ON entries BEGIN
+                {_bigram_insert_sql(_BIGRAM_NEW_ROW)};
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_entries_ad_bigram AFTER DELETE ON entries BEGIN
+                DELETE FROM entry_bigram WHERE entry_id = old.id;
+            END;
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_entries_au_bigram AFTER UPDATE OF word, translation, notes ON entries BEGIN
+                DELETE FROM entry_bigram WHERE entry_id = old.id;
+                {_bigram_insert_sql(_BIGRAM_NEW_ROW)};
+            END;
+            """
+        )
+        cur.execute("PRAGMA user_version = 12;")
+        ver = 12
+    if ver < 13:
+        # retrieval.suggest watermarks: links created / entries deleted since its last sync
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_record_links_created ON record_links(created_at);")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_entries_deleted_at ON entries(deleted_at) WHERE deleted_at IS NOT NULL;")
+        cur.execute("PRAGMA user_version = 13;")
+        ver = 13
+    if ver < 14:
+        # keyset cursors compare (updated_at, id) as a row value, which a NULL never satisfies;
+        # every writer sets updated_at, so only rows from old imports can be missing it
+        cur.execute("UPDATE entries SET updated_at = COALESCE(created_at, 0) WHERE updated_at IS NULL;")
+        cur.execute("UPDATE records SET updated_at = COALESCE(created_at, 0) WHERE updated_at IS NULL;")
+        cur.execute("PRAGMA user_version = 14;")
+        ver = 14
     if ver < DB_VERSION:
         cur.execute("PRAGMA user_version = ?;", (DB_VERSION,))
     conn.commit()
@@ -322,6 +540,49 @@ def list_entries(db_path: Path, limit: int = 50, offset: int = 0, include_delete
     ]
 
 
+def list_entries_page(
+    db_path: Path, limit: int = 50, cursor: Optional[str] = None, include_deleted: bool = False
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset-paginated list_entries: returns (entries, next_cursor); pass next_cursor back to
+    get the following page, None means this was the last one.
+    """
+    after = decode_cursor(cursor)
+    where = [] if include_deleted else ["deleted_at IS NULL"]
+    params: List[Any] = []
+    if after is not None:
+        where.append("(updated_at, id) < (?, ?)")
+        params.extend(after)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    conn = _connect(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT id, language, word, translation, notes, created_at, updated_at, deleted_at
+        FROM entries
+        {where_sql}
+        ORDER BY updated_at DESC, id DESC
+        LIMIT ?
+        """,
+        (*params, limit + 1),
+    )
+    rows, next_cursor = _keyset_page(cur.fetchall(), limit, 6)
+    conn.close()
+    return [
+        {
+            "id": r[0],
+            "language": r[1],
+            "word": r[2],
+            "translation": r[3],
+            "notes": r[4],
+            "created_at": r[5],
+            "updated_at": r[6],
+            "deleted_at": r[7],
+        }
+        for r in rows
+    ], next_cursor
+
+
 def upsert_relation(db_path: Path, from_id: int, to_id: int, rel_type: str) -> int:
     now = time.time()
     conn = _connect(db_path)
@@ -538,6 +799,32 @@ def list_records(db_path: Path, limit: int = 50, offset: int = 0) -> List[Dict[s
     return [{"id": r[0], "text": r[1], "created_at": r[2], "updated_at": r[3]} for r in rows]
 
 
+def list_records_page(
+    db_path: Path, limit: int = 50, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    after = decode_cursor(cursor)
+    where_sql = ""
+    params: List[Any] = []
+    if after is not None:
+        where_sql = "WHERE (updated_at, id) < (?, ?)"
+        params = list(after)
+    conn = _connect(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT id, text, created_at, updated_at
+        FROM records
+        {where_sql}
+        ORDER BY updated_at DESC, id DESC
+        LIMIT ?
+        """,
+        (*params, limit + 1),
+    )
+    rows, next_cursor = _keyset_page(cur.fetchall(), limit, 3)
+    conn.close()
+    return [{"id": r[0], "text": r[1], "created_at": r[2], "updated_at": r[3]} for r in rows], next_cursor
+
+
 def replace_record_links(db_path: Path, record_id: int, links: List[Dict[str, Any]]):
     conn = _connect(db_path)
     cur = conn.cursor()
@@ -3,10 +3,17 @@ from typing import List, Dict, Any, Optional
 import sqlite3
 from difflib import SequenceMatcher
 
+from .symspell import lookup_symspell
+
 
 def resolve_fuzzy(db_path: Path, q: str, language: Optional[str] = None, top_k: int = 5, threshold: float = 0.55) -> List[Dict[str, Any]]:
     if not q:
         return []
+    # typo candidates from the symmetric-delete index, authoritative even when empty; the full
+    # SequenceMatcher scan below only serves what the index cannot answer (CJK, long phrases)
+    hits = lookup_symspell(db_path, q, language, top_k=top_k)
+    if hits is not None:
+        return [h for h in hits if h["score"] >= threshold][:top_k]
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     if language:
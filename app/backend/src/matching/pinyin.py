@@ -0,0 +1,131 @@
+import re
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .watermark import sync_entry_index
+
+CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+SPLIT_RE = re.compile(r"[,;/，；、]+")
+PINYIN_QUERY_RE = re.compile(r"^(?:[a-z]+[1-5]?)+$")
+TONE_MARK_RE = re.compile(r"[āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ]")
+KIND_SCORES = {"tone": 0.92, "plain": 0.88, "initials": 0.6}
+
+
+class PinyinUnavailable(Exception):
+    pass
+
+
+def _pypinyin():
+    try:
+        import pypinyin  # type: ignore
+        from pypinyin.contrib.tone_convert import to_tone3  # type: ignore
+    except Exception as e:  # pragma: no cover - optional dependency
+        raise PinyinUnavailable(f"pypinyin not available: {e}")
+    return pypinyin, to_tone3
+
+
+def pinyin_keys(text: str) -> Set[Tuple[str, str]]:
+    """(kind, key) for the Chinese characters of text: tone3, plain and initials, ü written as v."""
+    han = "".join(CJK_RE.findall(text or ""))
+    if not han:
+        return set()
+    pypinyin, _ = _pypinyin()
+    tone = pypinyin.lazy_pinyin(han, style=pypinyin.Style.TONE3, neutral_tone_with_five=True)
+    plain = pypinyin.lazy_pinyin(han, style=pypinyin.Style.NORMAL)
+    return {
+        ("tone", "".join(tone)),
+        ("plain", "".join(plain)),
+        ("initials", "".join(s[0] for s in plain if s)),
+    }
+
+
+def _index_rows(entry_id: int, word: str, translation: str) -> Set[Tuple[str, int, str, str]]:
+    rows = set()
+    fields = [("word", word)] + [("translation", part) for part in SPLIT_RE.split(translation or "")]
+    for field, text in fields:
+        for kind, key in pinyin_keys(text):
+            rows.add((key, entry_id, field, kind))
+    return rows
+
+
+def _sync(conn: sqlite3.Connection) -> int:
+    _pypinyin()  # fail before reading the changed rows, the watermark stays put until pypinyin exists
+    return sync_entry_index(conn, "entry_pinyin", "entry_pinyin_state", ("key", "entry_id", "field", "kind"), _index_rows)
+
+
+def sync_pinyin(db_path: Path) -> int:
+    """Index pinyin for entries written since the last sync; raises PinyinUnavailable without pypinyin."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return _sync(conn)
+    finally:
+        conn.close()
+
+
+def _strip_tones(text: str) -> str:
+    text = re.sub(r"[üǖǘǚǜ]", "v", text)
+    return "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+
+
+def normalize_query(q: str) -> Optional[str]:
+    """
+    Lowercase pinyin without spaces/apostrophes ("Ren Xing" -> "renxing", "hǎo" -> "hao3",
+    "lü" -> "lv"); None when q does not look like pinyin. Tone marks become tone3 only when
+    every syllable is separated and marked ("xié zuò"), otherwise they are dropped.
+    """
+    text = unicodedata.normalize("NFC", (q or "").strip().lower())
+    chunks = [c for c in re.split(r"[\s'’-]+", text) if c]
+    if any(TONE_MARK_RE.search(c) for c in chunks):
+        if all(len(TONE_MARK_RE.findall(c)) == 1 for c in chunks):
+            _, to_tone3 = _pypinyin()
+            chunks = [to_tone3(c, v_to_u=False) for c in chunks]
+        else:
+            chunks = [_strip_tones(c) for c in chunks]
+    text = "".join(chunks).replace("ü", "v")
+    if not text or not PINYIN_QUERY_RE.match(text):
+        return None
+    return text
+
+
+def lookup_pinyin(db_path: Path, q: str, top_k: int = 5, initials: bool = True) -> List[Dict[str, Any]]:
+    """
+    Entries whose Chinese word or translation reads as q (tone3, plain or initials),
+    found with a single primary-key probe. Returns [] when q is not pinyin-like.
+    initials=False drops initials-only matches (for auto-linking, where "rx" is too weak).
+    """
+    key = normalize_query(q)
+    if key is None:
+        return []
+    conn = sqlite3.connect(db_path)
+    try:
+        _sync(conn)
+        rows = conn.execute(
+            """
+            SELECT p.entry_id, p.field, p.kind, e.language, e.word
+            FROM entry_pinyin p
+            CROSS JOIN entries e ON e.id = p.entry_id
+            WHERE p.key = ? AND e.deleted_at IS NULL
+            """,
+            (key,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    best: Dict[int, Dict[str, Any]] = {}
+    for eid, field, kind, lang, word in rows:
+        # single-letter initials would match half the notebook
+        if kind == "initials" and (not initials or len(key) < 2):
+            continue
+        score = KIND_SCORES[kind] - (0.03 if field == "translation" else 0.0)
+        if eid not in best or score > best[eid]["score"]:
+            best[eid] = {
+                "entry_id": eid,
+                "word": word,
+                "language": lang,
+                "score": score,
+                "match_type": f"pinyin_{kind}",
+            }
+    results = sorted(best.values(), key=lambda x: (-x["score"], x["entry_id"]))
+    return results[:top_k]
@@ -4,6 +4,7 @@ from difflib import SequenceMatcher
 
 from .exact import resolve_exact
 from .fuzzy import resolve_fuzzy
+from .pinyin import PinyinUnavailable, lookup_pinyin
 from search import search_like
 from semantic import SemanticUnavailable, semantic_search
 from ann.index_manager import ann_search
@@ -11,7 +12,7 @@ from ann.index_manager import ann_search
 
 def resolve_entry_candidates(db_path: Path, q: str, language: Optional[str] = None, top_k: int = 5) -> Dict[str, Any]:
     """
-    Resolve a query token into best + candidate list using exact, fuzzy, LIKE, and semantic fallbacks.
+    Resolve a query token into best + candidate list using exact, pinyin, fuzzy, LIKE, and semantic fallbacks.
     Always returns cross-language matches so Chinese tokens can link to English entries (and vice versa).
     """
     candidates: List[Dict[str, Any]] = []
@@ -40,19 +41,33 @@ def resolve_entry_candidates(db_path: Path, q: str, language: Optional[str] = No
         for c in resolve_exact(db_path, q, None):
             _push(c["entry_id"], c["language"], c["word"], 0.95, c["match_type"])
 
-    # 2) Fuzzy in hinted language, then any language with looser threshold
+    # 2) Fuzzy in hinted language
     if len(candidates) < top_k:
         for c in resolve_fuzzy(db_path, q, language, top_k=top_k * 2, threshold=0.35):
             _push(c["entry_id"], c["language"], c["word"], c.get("score", 0.0), c["match_type"])
             if len(candidates) >= top_k:
                 break
+
+    # 3) Pinyin typed for Chinese words/translations ("renxing", "ren4xing4"); one indexed probe.
+    #    "men", "can", "fan" are valid pinyin too, so it only runs when the hinted-language stages
+    #    found nothing, or for non-English hints when the token is not itself an English entry.
+    #    Initials-only matches ("rx") are too weak to auto-link and are left out.
+    english_entry = any(c["language"] == "en" and c["match_type"] == "exact_word" for c in candidates)
+    if len(candidates) < top_k and (not candidates or (language != "en" and not english_entry)):
+        try:
+            for c in lookup_pinyin(db_path, q, top_k=top_k, initials=False):
+                _push(c["entry_id"], c["language"], c["word"], c["score"], c["match_type"])
+        except PinyinUnavailable:
+            pass
+
+    # 4) Fuzzy in any language with looser threshold
     if len(candidates) < top_k:
         for c in resolve_fuzzy(db_path, q, None, top_k=top_k * 3, threshold=0.3):
             _push(c["entry_id"], c["language"], c["word"], c.get("score", 0.0), c["match_type"])
             if len(candidates) >= top_k:
                 break
 
-    # 3) LIKE search across word/translation/notes for substring overlap
+    # 5) LIKE search across word/translation/notes for substring overlap
     if len(candidates) < top_k:
         like_hits = search_like(db_path, q, limit=top_k * 2, offset=0)
         for h in like_hits:
@@ -62,7 +77,7 @@ def resolve_entry_candidates(db_path: Path, q: str, language: Optional[str] = No
             if len(candidates) >= top_k:
                 break
 
-    # 4) Semantic / ANN fallback (cross-language capable model)
+    # 6) Semantic / ANN fallback (cross-language capable model)
     if len(candidates) < top_k:
         try:
             try:
@@ -0,0 +1,158 @@
+import re
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .watermark import sync_entry_index
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7  # deletes are generated from the first 7 chars, bounding rows per term
+MAX_QUERY_LENGTH = 40  # longer queries are phrases/sentences, not typos of an entry word
+CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+SPLIT_RE = re.compile(r"[,;/，；、]+")
+
+
+def normalize_term(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text or "").lower().split())
+
+
+def indexable(term: str) -> bool:
+    # CJK terms are served by exact/trigram lookups; one- or two-char deletes of them are pure noise
+    return bool(term) and not CJK_RE.search(term)
+
+
+def answerable(term: str) -> bool:
+    """Whether lookup_symspell answers q authoritatively (an empty result then means no match)."""
+    return indexable(term) and len(term) <= MAX_QUERY_LENGTH
+
+
+def max_distance(term: str) -> int:
+    """Edit distance tolerated for a query: 1 for short words, 2 otherwise."""
+    return 1 if len(term) <= 4 else MAX_EDIT_DISTANCE
+
+
+def deletes(term: str, distance: int) -> Set[str]:
+    """term's prefix plus every string reachable from it by deleting up to distance chars."""
+    prefix = term[:PREFIX_LENGTH]
+    out = {prefix}
+    frontier = {prefix}
+    for _ in range(distance):
+        nxt = set()
+        for s in frontier:
+            for i in range(len(s)):
+                d = s[:i] + s[i + 1 :]
+                if d and d not in out:
+                    nxt.add(d)
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count as 1); limit + 1 if above limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+def entry_terms(word: str, translation: str) -> List[Tuple[str, str]]:
+    """(field, term) pairs indexed for an entry: the word and each latin translation sense."""
+    terms = []
+    w = normalize_term(word)
+    if indexable(w):
+        terms.append(("word", w))
+    for part in SPLIT_RE.split(translation or ""):
+        t = normalize_term(part)
+        if indexable(t):
+            terms.append(("translation", t))
+    return terms
+
+
+def _index_rows(entry_id: int, word: str, translation: str) -> Set[Tuple[str, int, str]]:
+    rows = set()
+    for field, term in entry_terms(word, translation):
+        for key in deletes(term, MAX_EDIT_DISTANCE):
+            rows.add((key, entry_id, field))
+    return rows
+
+
+def _sync(conn: sqlite3.Connection) -> int:
+    return sync_entry_index(conn, "entry_symspell", "entry_symspell_state", ("del_key", "entry_id", "field"), _index_rows)
+
+
+def sync_symspell(db_path: Path) -> int:
+    """Bring the on-disk index up to date with entry writes; returns how many entries were re-indexed."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return _sync(conn)
+    finally:
+        conn.close()
+
+
+def lookup_symspell(
+    db_path: Path, q: str, language: Optional[str] = None, top_k: int = 5
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Entries whose word or a translation sense is within max_distance(q) edits of q.
+    The number of probed keys depends only on len(q), not on the notebook size.
+    Returns None when q is not answerable (CJK or longer than MAX_QUERY_LENGTH), so callers
+    can pick another strategy; [] means there is no entry within reach.
+    """
+    term = normalize_term(q)
+    if not answerable(term):
+        return None
+    limit = max_distance(term)
+    keys = sorted(deletes(term, limit))
+    conn = sqlite3.connect(db_path)
+    try:
+        _sync(conn)
+        sql = f"""
+            SELECT DISTINCT s.entry_id, s.field, e.language, e.word, e.translation
+            FROM entry_symspell s
+            CROSS JOIN entries e ON e.id = s.entry_id
+            WHERE s.del_key IN ({','.join('?' * len(keys))}) AND e.deleted_at IS NULL
+        """
+        params: List[Any] = list(keys)
+        if language:
+            sql += " AND e.language = ?"
+            params.append(language)
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    best: Dict[int, Dict[str, Any]] = {}
+    for eid, field, lang, word, translation in rows:
+        candidates: Iterable[str]
+        if field == "word":
+            candidates = [normalize_term(word)]
+        else:
+            candidates = [normalize_term(p) for p in SPLIT_RE.split(translation or "")]
+        for cand in candidates:
+            dist = edit_distance(term, cand, limit)
+            if dist > limit:
+                continue
+            score = 1.0 - dist / max(len(term), len(cand), 1)
+            if eid not in best or score > best[eid]["score"]:
+                best[eid] = {
+                    "entry_id": eid,
+                    "word": word,
+                    "language": lang,
+                    "score": score,
+                    "distance": dist,
+                    "match_type": f"fuzzy_{field}",
+                }
+    results = sorted(best.values(), key=lambda x: (-x["score"], x["distance"], x["entry_id"]))
+    return results[:top_k]
@@ -0,0 +1,46 @@
+import sqlite3
+from typing import Callable, Iterable, Sequence, Tuple
+
+
+def sync_entry_index(
+    conn: sqlite3.Connection,
+    table: str,
+    state_table: str,
+    columns: Sequence[str],
+    build_rows: Callable[[int, str, str], Iterable[Tuple]],
+) -> int:
+    """
+    Re-index entries written since the (updated_at, id) watermark kept in state_table.
+    build_rows(entry_id, word, translation) yields rows for table's columns. Soft-deleted
+    entries keep stale rows; lookups join entries and filter deleted_at. Returns the number
+    of entries re-indexed; cheap no-op when nothing changed.
+    """
+    cur = conn.cursor()
+    row = cur.execute(f"SELECT synced_at, synced_id FROM {state_table} WHERE id = 1").fetchone()
+    synced_at, synced_id = row if row else (0.0, 0)
+    # row-value comparison is a range seek on idx_entries_deleted_updated
+    changed = cur.execute(
+        """
+        SELECT id, word, translation, updated_at
+        FROM entries
+        WHERE deleted_at IS NULL AND (updated_at, id) > (?, ?)
+        ORDER BY updated_at, id
+        """,
+        (synced_at, synced_id),
+    ).fetchall()
+    if not changed:
+        return 0
+    rows = set()
+    for eid, word, translation, _ in changed:
+        rows.update(build_rows(eid, word or "", translation or ""))
+    with conn:
+        cur.executemany(f"DELETE FROM {table} WHERE entry_id = ?", [(r[0],) for r in changed])
+        cur.executemany(
+            f"INSERT OR IGNORE INTO {table}({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+        )
+        last = changed[-1]
+        cur.execute(
+            f"INSERT OR REPLACE INTO {state_table}(id, synced_at, synced_id) VALUES (1, ?, ?)",
+            (last[3] or 0.0, last[0]),
+        )
+    return len(changed)
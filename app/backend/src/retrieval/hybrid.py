@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from db import get_entries_by_ids
+from search import search_fts
+from matching.symspell import lookup_symspell
+from semantic import SemanticUnavailable, semantic_search
+from ann.index_manager import ann_search
+
+RRF_K = 60
+DEFAULT_DEADLINE_MS = 300.0
+DEFAULT_BUDGETS_MS = {"fts": 100.0, "fuzzy": 200.0, "ann": 300.0}
+MAX_INFLIGHT_PER_BRANCH = 2  # abandoned-but-running calls a branch may have before it is skipped
+
+
+def _fuzzy_branch(db_path: Path, q: str, depth: int) -> List[Dict[str, Any]]:
+    # symspell candidates only; CJK/long queries it cannot answer are left to the fts branch
+    hits = lookup_symspell(db_path, q, top_k=depth) or []
+    rows = {r["id"]: r for r in get_entries_by_ids(db_path, [h["entry_id"] for h in hits])}
+    return [{**rows[h["entry_id"]], "score": h["score"]} for h in hits if h["entry_id"] in rows]
+
+
+def _ann_branch(db_path: Path, q: str, depth: int) -> List[Dict[str, Any]]:
+    try:
+        return ann_search(db_path, q, top_k=depth)
+    except SemanticUnavailable:
+        return semantic_search(db_path, q, top_k=depth)
+
+
+# name -> fn(db_path, q, depth); each branch opens its own connection, so they can run in threads
+BRANCHES: Dict[str, Callable[[Path, str, int], List[Dict[str, Any]]]] = {
+    "fts": lambda db_path, q, depth: search_fts(db_path, q, depth, 0),
+    "fuzzy": _fuzzy_branch,
+    "ann": _ann_branch,
+}
+
+# shared pool: a branch that misses the deadline keeps running here instead of blocking the response.
+# Per-branch in-flight caps keep abandoned work from filling it, so the pool never queues.
+_POOL = ThreadPoolExecutor(max_workers=len(BRANCHES) * MAX_INFLIGHT_PER_BRANCH, thread_name_prefix="hybrid")
+_INFLIGHT: Dict[str, int] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _acquire(name: str) -> bool:
+    with _INFLIGHT_LOCK:
+        if _INFLIGHT.get(name, 0) >= MAX_INFLIGHT_PER_BRANCH:
+            return False
+        _INFLIGHT[name] = _INFLIGHT.get(name, 0) + 1
+        return True
+
+
+def _release(name: str):
+    with _INFLIGHT_LOCK:
+        _INFLIGHT[name] = max(0, _INFLIGHT.get(name, 0) - 1)
+
+
+def _timed(fn, db_path: Path, q: str, depth: int):
+    start = time.perf_counter()
+    results = fn(db_path, q, depth)
+    return results, (time.perf_counter() - start) * 1000.0
+
+
+def rrf_fuse(ranked: Dict[str, List[Dict[str, Any]]], k: int = RRF_K) -> List[Dict[str, Any]]:
+    """Reciprocal rank fusion: score(d) = sum over branches of 1 / (k + rank)."""
+    fused: Dict[int, Dict[str, Any]] = {}
+    for name, results in ranked.items():
+        for rank, r in enumerate(results, start=1):
+            item = fused.get(r["id"])
+            if item is None:
+                item = fused[r["id"]] = {
+                    "id": r["id"],
+                    "language": r.get("language"),
+                    "word": r.get("word"),
+                    "translation": r.get("translation"),
+                    "notes": r.get("notes"),
+                    "score": 0.0,
+                    "ranks": {},
+                    "match_type": "hybrid",
+                }
+            item["score"] += 1.0 / (k + rank)
+            item["ranks"][name] = rank
+    return sorted(fused.values(), key=lambda x: (-x["score"], x["id"]))
+
+
+def search_hybrid(
+    db_path: Path,
+    q: str,
+    limit: int,
+    offset: int = 0,
+    deadline_ms: float = DEFAULT_DEADLINE_MS,
+    budgets_ms: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the FTS, fuzzy and ANN branches concurrently and fuse them with RRF.
+    A branch only counts if it finishes within min(its budget, deadline_ms); whatever is
+    done by then is returned and late futures are cancelled. A branch that still has
+    MAX_INFLIGHT_PER_BRANCH calls running from earlier requests is skipped ("saturated").
+    Returns {"items", "branches", "elapsed_ms"} where branches maps
+    name -> {"status": ok|timeout|saturated|unavailable|error, "ms", "count"}.
+    """
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    budgets.update(budgets_ms or {})
+    depth = limit + offset
+    start = time.perf_counter()
+    ranked: Dict[str, List[Dict[str, Any]]] = {}
+    branches: Dict[str, Dict[str, Any]] = {}
+    futures = {}
+    for name, fn in BRANCHES.items():
+        if not _acquire(name):
+            branches[name] = {"status": "saturated", "ms": 0.0, "count": 0}
+            continue
+        fut = _POOL.submit(_timed, fn, db_path, q, depth)
+        # runs on completion or cancellation, so the slot is always returned
+        fut.add_done_callback(lambda _f, n=name: _release(n))
+        futures[name] = fut
+    # all branches are already running, so waiting on them in budget order costs no extra time
+    order = sorted(futures, key=lambda n: min(float(budgets.get(n, deadline_ms)), deadline_ms))
+    for name in order:
+        cutoff = min(float(budgets.get(name, deadline_ms)), deadline_ms) / 1000.0
+        remaining = max(0.0, cutoff - (time.perf_counter() - start))
+        try:
+            results, ms = futures[name].result(timeout=remaining)
+        except FutureTimeout:
+            # only stops work that has not started; a running branch finishes in the background
+            futures[name].cancel()
+            branches[name] = {"status": "timeout", "ms": round(cutoff * 1000.0, 2), "count": 0}
+            continue
+        except SemanticUnavailable:
+            branches[name] = {"status": "unavailable", "ms": round((time.perf_counter() - start) * 1000.0, 2), "count": 0}
+            continue
+        except Exception as e:
+            branches[name] = {
+                "status": "error",
+                "ms": round((time.perf_counter() - start) * 1000.0, 2),
+                "count": 0,
+                "message": str(e),
+            }
+            continue
+        ranked[name] = results
+        branches[name] = {"status": "ok", "ms": round(ms, 2), "count": len(results)}
+
+    items = rrf_fuse(ranked)[offset : offset + limit]
+    return {
+        "items": items,
+        "branches": branches,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000.0, 2),
+    }
@@ -0,0 +1,369 @@
+import bisect
+import heapq
+import math
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+SHORT_PREFIX = 2  # prefixes up to this length answer from a precomputed top list
+TOP_CACHE = 32
+RECENCY_HALF_LIFE = 30 * 86400.0
+CHECK_EVERY = 128  # candidates scanned between budget checks
+DEFAULT_BUDGET_MS = 0.5
+SYNC_INTERVAL_S = 1.0  # background watermark sync period
+RERANK_INTERVAL_S = 3600.0  # short-prefix lists re-ranked from scratch as recency decays
+SPLIT_RE = re.compile(r"[,;/，；、]+")
+SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_key(text: str) -> str:
+    return SPACE_RE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip().lower()
+
+
+def _keys_for(word: str, translation: str) -> Set[str]:
+    """Normalized word plus every translation sense ("a, b; c" -> a, b, c)."""
+    keys = set()
+    for text in (word, translation):
+        for part in SPLIT_RE.split(text or ""):
+            key = normalize_key(part)
+            if key:
+                keys.add(key)
+    return keys
+
+
+def _recency(updated_at: Optional[float], now: float) -> float:
+    # decays from 1.0 with a 30 day half-life; evaluated at query time so old weights never go stale
+    return 0.5 ** (max(0.0, now - (updated_at or 0.0)) / RECENCY_HALF_LIFE)
+
+
+def _score(entry: Dict[str, Any], prefix: str, now: float) -> float:
+    # usage (record links) dominates recency; an exact key match ranks above longer completions
+    return math.log1p(entry["freq"]) + _recency(entry["updated_at"], now) + (1.0 if prefix in entry["keys"] else 0.0)
+
+
+def _short_prefixes(keys: Iterable[str]) -> Set[str]:
+    return {key[:n] for key in keys for n in range(1, SHORT_PREFIX + 1) if len(key) >= n}
+
+
+class PrefixIndex:
+    """
+    Sorted (key, entry_id) array searched with bisect. Each entry carries how often it is
+    linked in records and when it was last edited; suggest() scores those at query time and
+    returns the top-k entries whose word or a translation sense starts with the prefix.
+    """
+
+    def __init__(self):
+        self._pairs: List[Tuple[str, int]] = []
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        # short prefix -> up to TOP_CACHE entry ids, best first as of the last write or rebuild
+        self._top: Dict[str, List[int]] = {}
+        # held by readers and writers of the structures above; sync_lock serializes syncs
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        # watermarks of what the index has seen: entries (updated_at, id), deleted_at, link created_at
+        self.entry_mark: Tuple[float, int] = (0.0, 0)
+        self.deleted_mark = 0.0
+        self.link_mark = 0.0
+        self.ranked = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---- writes -----------------------------------------------------------
+    def apply(self, upserts: Iterable[Tuple[int, str, str, str, float, int]] = (), removals: Iterable[int] = ()):
+        """
+        Insert/replace (id, language, word, translation, updated_at, freq) rows and drop removed
+        ids. A short-prefix list is only re-ranked from its full range when an entry leaves a
+        full list or falls in score while on it; prefixes touched by several rows in one batch
+        are re-ranked once.
+        """
+        now = time.time()
+        stale: Set[str] = set()
+        with self.lock:
+            for entry_id in removals:
+                old = self._remove(entry_id)
+                if old is not None:
+                    self._evict(entry_id, _short_prefixes(old["keys"]), stale)
+            for entry_id, language, word, translation, updated_at, freq in upserts:
+                old = self._remove(entry_id)
+                entry = {
+                    "id": entry_id,
+                    "language": language,
+                    "word": word,
+                    "translation": translation,
+                    "updated_at": updated_at,
+                    "freq": freq,
+                    "keys": _keys_for(word, translation),
+                }
+                self._entries[entry_id] = entry
+                for key in entry["keys"]:
+                    bisect.insort(self._pairs, (key, entry_id))
+                self._place(entry, old, now, stale)
+            for prefix in stale:
+                self._top[prefix] = [eid for _, eid in self._rank(prefix, TOP_CACHE, now)[0]]
+
+    def _remove(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        old = self._entries.pop(entry_id, None)
+        if old is None:
+            return None
+        for key in old["keys"]:
+            i = bisect.bisect_left(self._pairs, (key, entry_id))
+            if i < len(self._pairs) and self._pairs[i] == (key, entry_id):
+                del self._pairs[i]
+        return old
+
+    def _evict(self, entry_id: int, prefixes: Iterable[str], stale: Set[str]):
+        for prefix in prefixes:
+            top = self._top.get(prefix)
+            if not top or entry_id not in top:
+                continue
+            if len(top) >= TOP_CACHE:
+                # something outside a full list may take the freed slot
+                stale.add(prefix)
+            else:
+                top.remove(entry_id)
+
+    def _place(self, entry: Dict[str, Any], old: Optional[Dict[str, Any]], now: float, stale: Set[str]):
+        entry_id = entry["id"]
+        prefixes = _short_prefixes(entry["keys"])
+        if old is not None:
+            self._evict(entry_id, _short_prefixes(old["keys"]) - prefixes, stale)
+        for prefix in prefixes - stale:
+            top = self._top.setdefault(prefix, [])
+            score = _score(entry, prefix, now)
+            if entry_id in top:
+                if len(top) >= TOP_CACHE and old is not None and score < _score(old, prefix, now):
+                    stale.add(prefix)
+                    continue
+                top.remove(entry_id)
+            elif len(top) >= TOP_CACHE and score <= min(_score(self._entries[i], prefix, now) for i in top):
+                continue
+            top.append(entry_id)
+            top.sort(key=lambda i: (-_score(self._entries[i], prefix, now), i))
+            del top[TOP_CACHE:]
+
+    def rebuild_top(self):
+        """Re-rank every short-prefix list from its full range, one prefix per lock hold."""
+        now = time.time()
+        with self.lock:
+            prefixes = _short_prefixes({key for key, _ in self._pairs})
+        for prefix in prefixes:
+            with self.lock:
+                self._top[prefix] = [eid for _, eid in self._rank(prefix, TOP_CACHE, now)[0]]
+        self.ranked = time.monotonic()
+
+    # ---- reads ------------------------------------------------------------
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._pairs, (prefix, -1))
+        hi = bisect.bisect_left(self._pairs, (prefix + "\U0010ffff", -1))
+        return lo, hi
+
+    def _rank(
+        self, prefix: str, k: int, now: float, deadline: Optional[float] = None
+    ) -> Tuple[List[Tuple[float, int]], bool]:
+        """Top-k (score, entry_id) for prefix; the bool is True if the deadline cut the scan short."""
+        lo, hi = self._range(prefix)
+        best: Dict[int, float] = {}
+        truncated = False
+        for n, i in enumerate(range(lo, hi)):
+            if deadline is not None and n % CHECK_EVERY == 0 and n and time.perf_counter() > deadline:
+                truncated = True
+                break
+            eid = self._pairs[i][1]
+            if eid not in best:
+                best[eid] = _score(self._entries[eid], prefix, now)
+        ranked = heapq.nlargest(k, ((s, eid) for eid, s in best.items()), key=lambda x: (x[0], -x[1]))
+        return ranked, truncated
+
+    def suggest(self, prefix: str, k: int = 8, budget_ms: float = DEFAULT_BUDGET_MS) -> Dict[str, Any]:
+        start = time.perf_counter()
+        now = time.time()
+        prefix = normalize_key(prefix)
+        truncated = False
+        with self.lock:
+            if not prefix:
+                ranked: List[Tuple[float, int]] = []
+            elif len(prefix) <= SHORT_PREFIX and k <= TOP_CACHE and prefix in self._top:
+                scored = ((_score(self._entries[eid], prefix, now), eid) for eid in self._top[prefix])
+                ranked = heapq.nlargest(k, scored, key=lambda x: (x[0], -x[1]))
+            else:
+                ranked, truncated = self._rank(prefix, k, now, start + budget_ms / 1000.0)
+            items = []
+            for score, eid in ranked:
+                e = self._entries[eid]
+                items.append(
+                    {
+                        "id": eid,
+                        "language": e["language"],
+                        "word": e["word"],
+                        "translation": e["translation"],
+                        "score": round(score, 4),
+                    }
+                )
+        return {
+            "items": items,
+            "truncated": truncated,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000.0, 4),
+        }
+
+
+_ENTRY_ROWS_SQL = """
+    SELECT e.id, e.language, e.word, e.translation, e.updated_at, e.deleted_at,
+           (SELECT COUNT(*) FROM record_links l WHERE l.entry_id = e.id) AS freq
+    FROM entries e
+"""
+
+_INDEXES: Dict[str, PrefixIndex] = {}
+_READY: Dict[str, threading.Event] = {}
+_STARTING = threading.Lock()
+
+
+def _key(db_path: Path) -> str:
+    return str(Path(db_path).resolve())
+
+
+def _marks(conn: sqlite3.Connection) -> Tuple[Tuple[float, int], float, float]:
+    entry = conn.execute(
+        "SELECT updated_at, id FROM entries WHERE deleted_at IS NULL ORDER BY updated_at DESC, id DESC LIMIT 1"
+    ).fetchone()
+    deleted = conn.execute("SELECT MAX(deleted_at) FROM entries WHERE deleted_at IS NOT NULL").fetchone()[0]
+    link = conn.execute("SELECT MAX(created_at) FROM record_links").fetchone()[0]
+    return (tuple(entry) if entry else (0.0, 0)), deleted or 0.0, link or 0.0
+
+
+def _build(db_path: Path) -> PrefixIndex:
+    index = PrefixIndex()
+    conn = sqlite3.connect(db_path)
+    # marks before rows: a write landing in between is picked up again by the first sync, never lost
+    index.entry_mark, index.deleted_mark, index.link_mark = _marks(conn)
+    rows = conn.execute(_ENTRY_ROWS_SQL + " WHERE e.deleted_at IS NULL").fetchall()
+    conn.close()
+    for eid, language, word, translation, updated_at, _, freq in rows:
+        keys = _keys_for(word, translation)
+        index._entries[eid] = {
+            "id": eid,
+            "language": language,
+            "word": word,
+            "translation": translation or "",
+            "updated_at": updated_at,
+            "freq": freq,
+            "keys": keys,
+        }
+        index._pairs.extend((key, eid) for key in keys)
+    index._pairs.sort()
+    index.rebuild_top()
+    return index
+
+
+def _maintain(db_path: Path, key: str):
+    ready = _READY[key]
+    try:
+        index = _build(db_path)
+        _INDEXES[key] = index
+    except sqlite3.Error:
+        # let a later start_index retry
+        with _STARTING:
+            _READY.pop(key, None)
+        ready.set()
+        return
+    ready.set()
+    while Path(db_path).exists():
+        time.sleep(SYNC_INTERVAL_S)
+        try:
+            sync_index(db_path)
+            if time.monotonic() - index.ranked > RERANK_INTERVAL_S:
+                index.rebuild_top()
+        except sqlite3.Error:
+            continue  # locked or mid-migration; try again next tick
+    with _STARTING:
+        _INDEXES.pop(key, None)
+        _READY.pop(key, None)
+
+
+def start_index(db_path: Path):
+    """
+    Build the index for db_path on a background thread and keep it synced from there
+    (idempotent). The server calls this at startup so suggest() never builds or syncs.
+    """
+    key = _key(db_path)
+    with _STARTING:
+        if key in _READY:
+            return
+        _READY[key] = threading.Event()
+    threading.Thread(target=_maintain, args=(Path(db_path), key), name="suggest-index", daemon=True).start()
+
+
+def get_index(db_path: Path, timeout: Optional[float] = None) -> Optional[PrefixIndex]:
+    """The loaded index for db_path, waiting up to timeout seconds for the background build."""
+    start_index(db_path)
+    ready = _READY.get(_key(db_path))
+    if ready is not None:
+        ready.wait(timeout)
+    return _INDEXES.get(_key(db_path))
+
+
+def _fetch(db_path: Path, ids: List[int]) -> Tuple[List[Tuple[Any, ...]], List[int]]:
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        _ENTRY_ROWS_SQL + f" WHERE e.id IN ({','.join('?' * len(ids))})", ids
+    ).fetchall()
+    conn.close()
+    upserts = [
+        (eid, language, word, translation or "", updated_at, freq)
+        for eid, language, word, translation, updated_at, deleted_at, freq in rows
+        if deleted_at is None
+    ]
+    live = {r[0] for r in upserts}
+    return upserts, [eid for eid in ids if eid not in live]
+
+
+def refresh_entries(db_path: Path, entry_ids: Iterable[int]):
+    """Re-read the given entries into a loaded index in one batch (no-op while it is building)."""
+    index = _INDEXES.get(_key(db_path))
+    ids = sorted({int(i) for i in entry_ids if i is not None})
+    if index is None or not ids:
+        return
+    upserts, removals = _fetch(db_path, ids)
+    index.apply(upserts, removals)
+
+
+def sync_index(db_path: Path) -> int:
+    """
+    Pick up writes made behind the server's back (other tools, direct db calls): entries
+    edited or deleted and record links created since the index's watermarks, each found
+    with one indexed range query. Returns how many entries were refreshed.
+    """
+    index = _INDEXES.get(_key(db_path))
+    if index is None:
+        return 0
+    with index.sync_lock:
+        conn = sqlite3.connect(db_path)
+        # read the new marks first: a write landing mid-sync is picked up now and again next time, never lost
+        marks = _marks(conn)
+        ids = {
+            r[0]
+            for r in conn.execute(
+                "SELECT id FROM entries WHERE deleted_at IS NULL AND (updated_at, id) > (?, ?)", index.entry_mark
+            )
+        }
+        ids.update(r[0] for r in conn.execute("SELECT id FROM entries WHERE deleted_at > ?", (index.deleted_mark,)))
+        ids.update(r[0] for r in conn.execute("SELECT entry_id FROM record_links WHERE created_at > ?", (index.link_mark,)))
+        conn.close()
+        if ids:
+            upserts, removals = _fetch(db_path, sorted(ids))
+            index.apply(upserts, removals)
+        index.entry_mark, index.deleted_mark, index.link_mark = marks
+    return len(ids)
+
+
+def suggest(db_path: Path, prefix: str, k: int = 8, budget_ms: float = DEFAULT_BUDGET_MS) -> Dict[str, Any]:
+    """Read-only lookup; while the index is still building this answers empty with building=True."""
+    index = _INDEXES.get(_key(db_path))
+    if index is None:
+        start_index(db_path)
+        return {"items": [], "truncated": True, "building": True, "elapsed_ms": 0.0}
+    return index.suggest(prefix, k, budget_ms)
@@ -1,8 +1,12 @@
+import json
+import re
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 import sqlite3
 from difflib import SequenceMatcher
 
+from db import _keyset_page, decode_cursor
+
 
 def _to_row_dict(row: Tuple[Any, ...]) -> Dict[str, Any]:
     return {
@@ -34,6 +38,34 @@ def search_like(db_path: Path, q: str, limit: int, offset: int) -> List[Dict[str
     return [_to_row_dict(r) for r in rows]
 
 
+def search_like_page(
+    db_path: Path, q: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """search_like with keyset pagination; returns (results, next_cursor)."""
+    after = decode_cursor(cursor)
+    pattern = f"%{q}%"
+    keyset = ""
+    params: List[Any] = [pattern, pattern, pattern]
+    if after is not None:
+        keyset = "AND (updated_at, id) < (?, ?)"
+        params.extend(after)
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT id, language, word, translation, notes, updated_at
+        FROM entries
+        WHERE deleted_at IS NULL AND (word LIKE ? OR translation LIKE ? OR notes LIKE ?) {keyset}
+        ORDER BY updated_at DESC, id DESC
+        LIMIT ?
+        """,
+        (*params, limit + 1),
+    )
+    rows, next_cursor = _keyset_page(cur.fetchall(), limit, 5)
+    conn.close()
+    return [_to_row_dict(r) for r in rows], next_cursor
+
+
 def search_fuzzy(db_path: Path, q: str, limit: int, offset: int, threshold: float = 0.5) -> List[Dict[str, Any]]:
     """
     Lightweight fuzzy search over word/translation/notes using SequenceMatcher.
@@ -63,23 +95,28 @@ def search_fuzzy(db_path: Path, q: str, limit: int, offset: int, threshold: floa
     return [_to_row_dict(r) for _, r in sliced]
 
 
-def search_fts(db_path: Path, q: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+PLAIN_QUERY_RE = re.compile(r"^[\w\s'-]+$")
+QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|([^\s()"]+)')
+
+
+def _fts_query(db_path: Path, table: str, match: str, limit: int, offset: int) -> List[Dict[str, Any]]:
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute(
-        """
+        f"""
         SELECT e.id, e.language, e.word, e.translation, e.notes,
-               bm25(entries_fts) as score,
-               snippet(entries_fts, 0, '[', ']', '...', 10) as snippet_word,
-               snippet(entries_fts, 1, '[', ']', '...', 10) as snippet_translation,
-               snippet(entries_fts, 2, '[', ']', '...', 10) as snippet_notes
-        FROM entries_fts
-        JOIN entries e ON e.id = entries_fts.rowid
-        WHERE e.deleted_at IS NULL AND entries_fts MATCH ?
+               bm25({table}) as score,
+               snippet({table}, 0, '[', ']', '...', 10) as snippet_word,
+               snippet({table}, 1, '[', ']', '...', 10) as snippet_translation,
+               snippet({table}, 2, '[', ']', '...', 10) as snippet_notes
+        FROM {table}
+        JOIN entries e ON e.id = {table}.rowid
+        WHERE e.deleted_at IS NULL AND {table} MATCH ?
         ORDER BY score ASC
         LIMIT ? OFFSET ?
         """,
-        (q, limit, offset),
+        (match, limit, offset),
     )
     rows = cur.fetchall()
     conn.close()
@@ -98,3 +135,160 @@ def search_fts(db_path: Path, q: str, limit: int, offset: int) -> List[Dict[str,
             }
         )
     return results
+
+
+def _search_bigram(db_path: Path, gram: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT e.id, e.language, e.word, e.translation, e.notes, e.updated_at
+        FROM entry_bigram b
+        CROSS JOIN entries e ON e.id = b.entry_id
+        WHERE b.gram = ? AND e.deleted_at IS NULL
+        ORDER BY e.updated_at DESC
+        LIMIT ? OFFSET ?
+        """,
+        (gram, limit, offset),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return [{**_to_row_dict(r), "score": 1.0, "match_type": "fts"} for r in rows]
+
+
+def _search_substring(db_path: Path, q: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+    """
+    Substring match by length: 3+ characters through the trigram index (entries_trgm),
+    two CJK characters through entry_bigram, two latin characters as an FTS token prefix;
+    only single characters fall back to LIKE.
+    """
+    q = q.strip()
+    if len(q) >= 3:
+        return _fts_query(db_path, "entries_trgm", '"' + q.replace('"', '""') + '"', limit, offset)
+    if len(q) == 2 and CJK_RE.fullmatch(q[0]) and CJK_RE.fullmatch(q[1]):
+        return _search_bigram(db_path, q, limit, offset)
+    if len(q) == 2 and q.isalnum():
+        return _fts_query(db_path, "entries_fts", '"' + q + '"*', limit, offset)
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    pattern = f"%{q}%"
+    cur.execute(
+        """
+        SELECT e.id, e.language, e.word, e.translation, e.notes, e.updated_at
+        FROM entries_trgm t
+        JOIN entries e ON e.id = t.rowid
+        WHERE e.deleted_at IS NULL AND (t.word LIKE ? OR t.translation LIKE ? OR t.notes LIKE ?)
+        ORDER BY e.updated_at DESC
+        LIMIT ? OFFSET ?
+        """,
+        (pattern, pattern, pattern, limit, offset),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return [{**_to_row_dict(r), "score": 1.0, "match_type": "fts"} for r in rows]
+
+
+def _parse_terms(q: str) -> List[Tuple[List[str], List[str]]]:
+    """
+    Split q into OR-groups of (required, excluded) substrings, following FTS5 precedence
+    (NOT binds tighter than AND, AND tighter than OR). Quoted phrases stay one term;
+    parentheses are ignored and a trailing prefix "*" is dropped.
+    """
+    groups: List[Tuple[List[str], List[str]]] = [([], [])]
+    negate = False
+    for m in QUERY_TOKEN_RE.finditer(q):
+        phrase, word = m.groups()
+        if word == "OR":
+            groups.append(([], []))
+            negate = False
+            continue
+        if word == "AND":
+            continue
+        if word == "NOT":
+            negate = True
+            continue
+        term = phrase.strip() if phrase is not None else word.rstrip("*")
+        if term:
+            groups[-1][1 if negate else 0].append(term)
+        negate = False
+    return [g for g in groups if g[0]]
+
+
+def _substring_ids(conn: sqlite3.Connection, term: str) -> Set[int]:
+    """Ids of entries containing term, through the same index _search_substring would use."""
+    if len(term) >= 3:
+        sql, params = "SELECT rowid FROM entries_trgm WHERE entries_trgm MATCH ?", ['"' + term.replace('"', '""') + '"']
+    elif len(term) == 2 and CJK_RE.fullmatch(term[0]) and CJK_RE.fullmatch(term[1]):
+        sql, params = "SELECT entry_id FROM entry_bigram WHERE gram = ?", [term]
+    elif len(term) == 2 and term.isalnum():
+        sql, params = "SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?", ['"' + term + '"*']
+    else:
+        pattern = f"%{term}%"
+        sql, params = "SELECT id FROM entries WHERE word LIKE ? OR translation LIKE ? OR notes LIKE ?", [pattern] * 3
+    return {r[0] for r in conn.execute(sql, params)}
+
+
+def _search_cjk(db_path: Path, q: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+    """
+    CJK queries: a single term is a substring search; several terms ("韧性 弹性",
+    "韧性 OR 强壮") are matched one by one through the trigram/bigram path and combined
+    as sets, newest first.
+    """
+    groups = _parse_terms(q)
+    if not groups:
+        return []
+    if len(groups) == 1 and len(groups[0][0]) == 1 and not groups[0][1]:
+        return _search_substring(db_path, groups[0][0][0], limit, offset)
+    conn = sqlite3.connect(db_path)
+    ids: Set[int] = set()
+    for required, excluded in groups:
+        hit = _substring_ids(conn, required[0])
+        for term in required[1:]:
+            if not hit:
+                break
+            hit &= _substring_ids(conn, term)
+        for term in excluded:
+            if not hit:
+                break
+            hit -= _substring_ids(conn, term)
+        ids |= hit
+    rows = []
+    if ids:
+        rows = conn.execute(
+            """
+            SELECT e.id, e.language, e.word, e.translation, e.notes, e.updated_at
+            FROM entries e
+            WHERE e.id IN (SELECT value FROM json_each(?)) AND e.deleted_at IS NULL
+            ORDER BY e.updated_at DESC, e.id DESC
+            LIMIT ? OFFSET ?
+            """,
+            (json.dumps(sorted(ids)), limit, offset),
+        ).fetchall()
+    conn.close()
+    return [{**_to_row_dict(r), "score": 1.0, "match_type": "fts"} for r in rows]
+
+
+def search_fts(db_path: Path, q: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+    """
+    Full-text search that picks the index by query script: queries containing CJK go to the
+    trigram index (substring semantics), everything else to the unicode61 entries_fts with its
+    FTS5 syntax (prefix*, OR, ...). Plain latin queries that find nothing there are retried as
+    substrings on the trigram index ("silien" -> "resilient"), and CJK queries that find
+    nothing as substrings are retried on entries_fts.
+    """
+    if CJK_RE.search(q):
+        results = _search_cjk(db_path, q, limit, offset)
+        if not results:
+            try:
+                results = _fts_query(db_path, "entries_fts", q, limit, offset)
+            except sqlite3.OperationalError:
+                results = []
+        return results
+    try:
+        results = _fts_query(db_path, "entries_fts", q, limit, offset)
+    except sqlite3.OperationalError:
+        # not valid FTS5 syntax (e.g. a stray quote); treat it as a literal substring
+        results = []
+    if not results and PLAIN_QUERY_RE.match(q.strip()):
+        results = _search_substring(db_path, q, limit, offset)
+    return results
@@ -1,11 +1,13 @@
 from typing import List, Dict, Any, Optional
 from pathlib import Path
+import os
 import sqlite3
 import math
 from array import array
 import time
 
-from db import get_entry, list_entries
+from db import get_entry, list_entries, get_entries_by_ids
+from semantic.encoder_backend import EncoderUnavailable, TorchEncoder
 
 
 DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
@@ -18,6 +20,11 @@ class SemanticUnavailable(Exception):
 
 _model_cache = {}
 
+# Encoder selection; the Electron main process can set these through the environment.
+ENCODER_BACKEND = os.environ.get("AI_VOCAB_ENCODER", "torch")
+ENCODER_THREADS = int(os.environ.get("AI_VOCAB_ENCODER_THREADS", "0") or 0)
+ENCODER_QUANTIZE = os.environ.get("AI_VOCAB_ENCODER_QUANTIZE", "1") != "0"
+
 
 def _pack_vec(vec: List[float]) -> bytes:
     arr = array("f", vec)
@@ -30,21 +37,45 @@ def _unpack_vec(buf: bytes) -> List[float]:
     return list(arr)
 
 
-def _ensure_model(model_name: str = DEFAULT_MODEL, cache_folder: Optional[Path] = None):
-    if "sentence_transformers" not in globals():
-        try:
-            import sentence_transformers  # type: ignore  # noqa: F401
-        except ImportError as e:
-            raise SemanticUnavailable("sentence_transformers not installed") from e
-    try:
-        from sentence_transformers import SentenceTransformer  # type: ignore
-    except Exception as e:
-        raise SemanticUnavailable("sentence_transformers import failed") from e
+def configure_encoder(backend: Optional[str] = None, threads: Optional[int] = None, quantize: Optional[bool] = None):
+    """
+    Select the sentence encoder backend ("torch" or "onnx"), intra-op thread count and
+    whether the ONNX export is int8-quantized. Cached models are dropped so the next
+    call to _ensure_model picks up the new settings.
+    """
+    global ENCODER_BACKEND, ENCODER_THREADS, ENCODER_QUANTIZE
+    if backend is not None:
+        ENCODER_BACKEND = backend
+    if threads is not None:
+        ENCODER_THREADS = int(threads)
+    if quantize is not None:
+        ENCODER_QUANTIZE = bool(quantize)
+    _model_cache.clear()
+
 
-    key = (model_name, str(cache_folder) if cache_folder else "")
+def _ensure_model(model_name: str = DEFAULT_MODEL, cache_folder: Optional[Path] = None):
+    key = (model_name, str(cache_folder) if cache_folder else "", ENCODER_BACKEND, ENCODER_THREADS, ENCODER_QUANTIZE)
     if key in _model_cache:
         return _model_cache[key]
-    model = SentenceTransformer(model_name, cache_folder=str(cache_folder) if cache_folder else None)
+    model = None
+    if ENCODER_BACKEND == "onnx":
+        try:
+            from semantic.onnx_encoder import OnnxEncoder
+
+            model = OnnxEncoder(
+                model_name,
+                cache_folder or DEFAULT_CACHE,
+                threads=ENCODER_THREADS,
+                quantize=ENCODER_QUANTIZE,
+            )
+        except Exception:  # noqa: BLE001
+            # missing onnxruntime or a failed export: fall back to the PyTorch encoder below
+            model = None
+    if model is None:
+        try:
+            model = TorchEncoder(model_name, cache_folder, threads=ENCODER_THREADS)
+        except EncoderUnavailable as e:
+            raise SemanticUnavailable(str(e)) from e
     _model_cache[key] = model
     return model
 
@@ -89,8 +120,32 @@ def ensure_embedding_for_entry(db_path: Path, entry_id: int, model_name: str = D
     return True
 
 
-def rebuild_embeddings(db_path: Path, model_name: str = DEFAULT_MODEL, cache_folder: Optional[Path] = None):
-    model = _ensure_model(model_name, cache_folder)
+def _write_embeddings(cur, model_name: str, rows, now: float):
+    cur.executemany(
+        """
+        INSERT INTO entry_embeddings(entry_id, model, dim, vec, updated_at)
+        VALUES(?, ?, ?, ?, ?)
+        ON CONFLICT(entry_id) DO UPDATE SET model=excluded.model, dim=excluded.dim, vec=excluded.vec, updated_at=excluded.updated_at
+        """,
+        [
+            (entry_id, model_name, len(emb), sqlite3.Binary(_pack_vec([float(x) for x in emb])), now)
+            for entry_id, emb in rows
+        ],
+    )
+
+
+def rebuild_embeddings(
+    db_path: Path,
+    model_name: str = DEFAULT_MODEL,
+    cache_folder: Optional[Path] = None,
+    workers: int = 1,
+    chunk_size: int = 256,
+):
+    """
+    Re-encode every live entry. With workers != 1 the texts are sharded across a
+    process pool (workers <= 0 uses every core) and chunks are written to SQLite
+    in order as they come back.
+    """
     entries = list_entries(db_path, limit=100000, offset=0, include_deleted=False)
     texts = []
     ids = []
@@ -102,22 +157,28 @@ def rebuild_embeddings(db_path: Path, model_name: str = DEFAULT_MODEL, cache_fol
         ids.append(e["id"])
     if not ids:
         return 0
-    embs = _encode(model, texts)
     now = time.time()
+    if workers == 1 or len(texts) <= chunk_size:
+        model = _ensure_model(model_name, cache_folder)
+        embs = _encode(model, texts)
+        conn = _get_conn(db_path)
+        _write_embeddings(conn.cursor(), model_name, zip(ids, embs), now)
+        conn.commit()
+        conn.close()
+        return len(ids)
+
+    from semantic.pool import iter_encoded_chunks
+
     conn = _get_conn(db_path)
     cur = conn.cursor()
-    for entry_id, emb in zip(ids, embs):
-        buf = _pack_vec([float(x) for x in emb])
-        cur.execute(
-            """
-            INSERT INTO entry_embeddings(entry_id, model, dim, vec, updated_at)
-            VALUES(?, ?, ?, ?, ?)
-            ON CONFLICT(entry_id) DO UPDATE SET model=excluded.model, dim=excluded.dim, vec=excluded.vec, updated_at=excluded.updated_at
-            """,
-            (entry_id, model_name, len(emb), sqlite3.Binary(buf), now),
-        )
-    conn.commit()
-    conn.close()
+    try:
+        for start, vecs in iter_encoded_chunks(texts, model_name, cache_folder, workers=workers, chunk_size=chunk_size):
+            _write_embeddings(cur, model_name, zip(ids[start : start + len(vecs)], vecs), now)
+            conn.commit()
+    except (ImportError, EncoderUnavailable) as e:
+        raise SemanticUnavailable(str(e)) from e
+    finally:
+        conn.close()
     return len(ids)
 
 
@@ -178,9 +239,101 @@ def semantic_search(db_path: Path, q: str, top_k: int = 10, model_name: str = DE
     return top
 
 
+def _load_entry_matrix(db_path: Path, model_name: str):
+    conn = _get_conn(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT entry_id, dim, vec FROM entry_embeddings WHERE model = ?",
+        (model_name,),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    ids = []
+    embs = []
+    for entry_id, dim, buf in rows:
+        vec = _unpack_vec(buf)
+        if len(vec) != dim:
+            continue
+        ids.append(entry_id)
+        embs.append(vec)
+    return ids, embs
+
+
+def semantic_search_batch(
+    db_path: Path,
+    queries: List[str],
+    top_k: int = 10,
+    model_name: str = DEFAULT_MODEL,
+    cache_folder: Optional[Path] = None,
+    query_embs: Optional[Any] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Batch variant of semantic_search: all queries are encoded in one model call and
+    scored against the stored embeddings with a single matrix product.
+    query_embs, if given, are the already encoded queries (row i = queries[i]).
+    Returns one hit list per query, in input order.
+    """
+    if not queries:
+        return []
+    if query_embs is None:
+        model = _ensure_model(model_name, cache_folder)
+        query_embs = _encode(model, list(queries))
+    q_embs = query_embs
+    ids, embs = _load_entry_matrix(db_path, model_name)
+    if not ids:
+        if rebuild_embeddings(db_path, model_name=model_name, cache_folder=cache_folder) == 0:
+            return [[] for _ in queries]
+        ids, embs = _load_entry_matrix(db_path, model_name)
+
+    try:
+        import numpy as np  # type: ignore
+    except ImportError as e:
+        raise SemanticUnavailable("numpy not installed") from e
+    qm = np.asarray(q_embs, dtype=np.float32)
+    m = np.asarray(embs, dtype=np.float32)
+    qm = qm / (np.linalg.norm(qm, axis=1, keepdims=True) + 1e-8)
+    m = m / (np.linalg.norm(m, axis=1, keepdims=True) + 1e-8)
+    sims = qm @ m.T
+    k = min(top_k, len(ids))
+    if k < len(ids):
+        top_idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    else:
+        top_idx = np.tile(np.arange(len(ids)), (len(queries), 1))
+
+    per_query = []
+    wanted = set()
+    for row, idxs in enumerate(top_idx):
+        ranked = sorted(idxs, key=lambda i: -sims[row, i])
+        hits = [(ids[i], float(sims[row, i])) for i in ranked]
+        per_query.append(hits)
+        wanted.update(eid for eid, _ in hits)
+    entries = {e["id"]: e for e in get_entries_by_ids(db_path, list(wanted))}
+
+    results = []
+    for hits in per_query:
+        top = []
+        for eid, score in hits:
+            entry = entries.get(eid)
+            if not entry:
+                continue
+            top.append(
+                {
+                    "id": eid,
+                    "language": entry["language"],
+                    "word": entry["word"],
+                    "translation": entry.get("translation"),
+                    "notes": entry.get("notes"),
+                    "score": score,
+                    "match_type": "semantic",
+                }
+            )
+        results.append(top)
+    return results
+
+
 def semantic_status(db_path: Path, model_name: str = DEFAULT_MODEL, cache_folder: Optional[Path] = None):
     try:
-        _ensure_model(model_name, cache_folder)
+        model = _ensure_model(model_name, cache_folder)
     except SemanticUnavailable:
         return {"enabled": False, "model": model_name}
     conn = _get_conn(db_path)
@@ -188,4 +341,4 @@ def semantic_status(db_path: Path, model_name: str = DEFAULT_MODEL, cache_folder
     cur.execute("SELECT COUNT(*) FROM entry_embeddings WHERE model = ?", (model_name,))
     count = cur.fetchone()[0]
     conn.close()
-    return {"enabled": True, "model": model_name, "count": count}
+    return {"enabled": True, "model": model_name, "encoder": getattr(model, "name", "torch"), "count": count}
@@ -0,0 +1,40 @@
+class EncoderUnavailable(Exception):
+    """Raised when an encoder backend cannot be loaded."""
+
+
+class BaseEncoder:
+    """
+    Minimal sentence-encoder interface used by the semantic package.
+    encode() mirrors SentenceTransformer.encode so call sites stay the same.
+    """
+
+    name = "base"
+
+    def encode(self, texts, convert_to_numpy: bool = True, normalize_embeddings: bool = True, batch_size: int = 32):
+        raise NotImplementedError
+
+
+class TorchEncoder(BaseEncoder):
+    name = "torch"
+
+    def __init__(self, model_name: str, cache_folder=None, threads: int = 0):
+        try:
+            from sentence_transformers import SentenceTransformer  # type: ignore
+        except Exception as e:
+            raise EncoderUnavailable("sentence_transformers not installed") from e
+        if threads:
+            try:
+                import torch  # type: ignore
+
+                torch.set_num_threads(threads)
+            except Exception:
+                pass
+        self.model = SentenceTransformer(model_name, cache_folder=str(cache_folder) if cache_folder else None)
+
+    def encode(self, texts, convert_to_numpy: bool = True, normalize_embeddings: bool = True, batch_size: int = 32):
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=convert_to_numpy,
+            normalize_embeddings=normalize_embeddings,
+        )
@@ -0,0 +1,183 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from semantic.encoder_backend import BaseEncoder, EncoderUnavailable
+
+
+def _safe_name(model_name: str) -> str:
+    return model_name.replace("/", "_").replace(":", "_")
+
+
+def onnx_paths(model_name: str, cache_folder: Path, quantize: bool):
+    base = Path(cache_folder) / "onnx" / _safe_name(model_name)
+    model_file = base / ("model.int8.onnx" if quantize else "model.onnx")
+    meta_path = base / "meta.json"
+    return base, model_file, meta_path
+
+
+def export_onnx(model_name: str, cache_folder: Path, quantize: bool = False) -> Path:
+    """
+    Export the transformer of a SentenceTransformer model to ONNX (optionally
+    int8 dynamic-quantized). Tokenizer files and the pooling mode are saved next
+    to it so inference only needs onnxruntime + transformers.
+    """
+    try:
+        import torch  # type: ignore
+        from sentence_transformers import SentenceTransformer  # type: ignore
+    except Exception as e:
+        raise EncoderUnavailable("torch/sentence_transformers required to export ONNX") from e
+
+    base, model_file, meta_path = onnx_paths(model_name, cache_folder, quantize)
+    if model_file.exists() and meta_path.exists():
+        return model_file
+    base.mkdir(parents=True, exist_ok=True)
+
+    st = SentenceTransformer(model_name, cache_folder=str(cache_folder))
+    transformer = st[0].auto_model
+    tokenizer = st.tokenizer
+    pooling = "mean"
+    if len(st) > 1 and getattr(st[1], "pooling_mode_cls_token", False):
+        pooling = "cls"
+
+    fp32_file = base / "model.onnx"
+    if not fp32_file.exists():
+        sample = tokenizer(["hello world"], return_tensors="pt", padding=True, truncation=True)
+        transformer.eval()
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                (sample["input_ids"], sample["attention_mask"]),
+                str(fp32_file),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "seq"},
+                    "attention_mask": {0: "batch", 1: "seq"},
+                    "last_hidden_state": {0: "batch", 1: "seq"},
+                },
+                opset_version=14,
+            )
+    if quantize:
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic  # type: ignore
+        except Exception as e:
+            raise EncoderUnavailable("onnxruntime quantization not available") from e
+        quantize_dynamic(str(fp32_file), str(model_file), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(str(base))
+    meta = {
+        "model": model_name,
+        "pooling": pooling,
+        "max_seq_length": int(getattr(st, "max_seq_length", 128) or 128),
+        "exported_at": time.time(),
+    }
+    meta_path.write_text(json.dumps(meta))
+    return model_file
+
+
+class OnnxEncoder(BaseEncoder):
+    """Runs an exported sentence encoder through onnxruntime on CPU."""
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, cache_folder: Path, threads: int = 0, quantize: bool = True):
+        try:
+            import numpy as np  # type: ignore
+            import onnxruntime as ort  # type: ignore
+            from transformers import AutoTokenizer  # type: ignore
+        except Exception as e:
+            raise EncoderUnavailable("onnxruntime/transformers not installed") from e
+        self.np = np
+        base, model_file, meta_path = onnx_paths(model_name, cache_folder, quantize)
+        if not model_file.exists() or not meta_path.exists():
+            export_onnx(model_name, cache_folder, quantize=quantize)
+        meta = json.loads(meta_path.read_text())
+        self.pooling = meta.get("pooling", "mean")
+        self.max_seq_length = int(meta.get("max_seq_length", 128))
+        self.tokenizer = AutoTokenizer.from_pretrained(str(base))
+
+        opts = ort.SessionOptions()
+        if threads:
+            opts.intra_op_num_threads = threads
+            opts.inter_op_num_threads = 1
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(model_file), sess_options=opts, providers=["CPUExecutionProvider"])
+
+    def encode(self, texts, convert_to_numpy: bool = True, normalize_embeddings: bool = True, batch_size: int = 32):
+        np = self.np
+        if isinstance(texts, str):
+            texts = [texts]
+        out = []
+        for i in range(0, len(texts), batch_size):
+            chunk = list(texts[i : i + batch_size])
+            tok = self.tokenizer(
+                chunk,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            input_ids = tok["input_ids"].astype(np.int64)
+            mask = tok["attention_mask"].astype(np.int64)
+            hidden = self.session.run(None, {"input_ids": input_ids, "attention_mask": mask})[0]
+            if self.pooling == "cls":
+                pooled = hidden[:, 0, :]
+            else:
+                m = mask[:, :, None].astype(np.float32)
+                pooled = (hidden * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+            out.append(pooled.astype(np.float32))
+        if not out:
+            return np.zeros((0, 0), dtype=np.float32)
+        embs = np.concatenate(out, axis=0)
+        if normalize_embeddings:
+            embs = embs / (np.linalg.norm(embs, axis=1, keepdims=True) + 1e-12)
+        return embs
+
+
+def benchmark_encoders(encoders: Dict[str, BaseEncoder], texts: List[str], repeats: int = 3) -> Dict[str, Any]:
+    """
+    Time each encoder on the same texts and report best-of-N seconds plus
+    texts/sec. Pairwise cosine parity against the first encoder is included.
+    """
+    import numpy as np  # type: ignore
+
+    report: Dict[str, Any] = {}
+    reference: Optional[Any] = None
+    for name, enc in encoders.items():
+        enc.encode(texts[:2])  # warm-up
+        best = None
+        embs = None
+        for _ in range(max(1, repeats)):
+            t0 = time.perf_counter()
+            embs = enc.encode(texts)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        embs = np.asarray(embs, dtype=np.float32)
+        entry: Dict[str, Any] = {"seconds": best, "texts_per_sec": len(texts) / best if best else None}
+        if reference is None:
+            reference = embs
+        else:
+            entry["min_cosine_vs_ref"] = float(np.min(np.sum(reference * embs, axis=1)))
+        report[name] = entry
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from semantic import DEFAULT_CACHE, DEFAULT_MODEL
+    from semantic.encoder_backend import TorchEncoder
+
+    parser = argparse.ArgumentParser(description="Compare torch vs ONNX encoder speed and parity")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--n", type=int, default=512, help="Number of synthetic texts")
+    args = parser.parse_args()
+
+    sample = [f"sample vocabulary entry number {i} 示例 {i}" for i in range(args.n)]
+    encs: Dict[str, BaseEncoder] = {"torch": TorchEncoder(args.model, DEFAULT_CACHE, threads=args.threads)}
+    encs["onnx"] = OnnxEncoder(args.model, DEFAULT_CACHE, threads=args.threads, quantize=False)
+    encs["onnx_int8"] = OnnxEncoder(args.model, DEFAULT_CACHE, threads=args.threads, quantize=True)
+    print(json.dumps(benchmark_encoders(encs, sample), indent=2))
@@ -0,0 +1,67 @@
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+_worker_model = None
+_worker_error = ""
+
+
+def plan_workers(workers: int = 0, total_threads: int = 0) -> Tuple[int, int]:
+    """
+    Split the configured core count into (processes, threads per process).
+    workers <= 0 means one process per core. Code-Files' source_parse.plan_workers
+    follows the same rules; that tree is not shipped with the backend.
+    """
+    cores = total_threads or os.cpu_count() or 1
+    n = workers if workers > 0 else cores
+    n = max(1, min(n, cores))
+    return n, max(1, cores // n)
+
+
+def _init_worker(model_name: str, cache_folder: Optional[str], threads: int, backend: str, quantize: bool):
+    global _worker_model, _worker_error
+    import semantic
+
+    semantic.configure_encoder(backend=backend, threads=threads, quantize=quantize)
+    try:
+        _worker_model = semantic._ensure_model(model_name, Path(cache_folder) if cache_folder else None)
+    except Exception as e:  # noqa: BLE001
+        # surfaced from _encode_chunk; raising here would make the pool respawn forever
+        _worker_error = str(e)
+
+
+def _encode_chunk(job: Tuple[int, List[str]]):
+    start, texts = job
+    if _worker_model is None:
+        from semantic import SemanticUnavailable
+
+        raise SemanticUnavailable(_worker_error or "encoder unavailable in worker")
+    embs = _worker_model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    return start, [[float(x) for x in row] for row in embs]
+
+
+def iter_encoded_chunks(
+    texts: List[str],
+    model_name: str,
+    cache_folder: Optional[Path] = None,
+    workers: int = 0,
+    chunk_size: int = 256,
+) -> Iterator[Tuple[int, List[List[float]]]]:
+    """
+    Shard texts across a process pool (each worker holds its own model copy with
+    pinned thread counts) and yield (start_offset, vectors) chunks in input order.
+    """
+    import multiprocessing as mp
+
+    import semantic
+
+    n_proc, threads = plan_workers(workers)
+    jobs: Iterable[Tuple[int, List[str]]] = ((i, texts[i : i + chunk_size]) for i in range(0, len(texts), chunk_size))
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(
+        processes=n_proc,
+        initializer=_init_worker,
+        initargs=(model_name, str(cache_folder) if cache_folder else None, threads, semantic.ENCODER_BACKEND, semantic.ENCODER_QUANTIZE),
+    ) as pool:
+        for start, vecs in pool.imap(_encode_chunk, jobs):
+            yield start, vecs
@@ -1,4 +1,5 @@
 import json
+import multiprocessing
 import sys
 from pathlib import Path
 from typing import Any, Dict, List
@@ -7,6 +8,7 @@ from db import (
     init_db,
     add_entry,
     list_entries,
+    list_entries_page,
     get_entry,
     update_entry,
     soft_delete_entry,
@@ -19,14 +21,24 @@ from db import (
     update_record,
     get_record,
     list_records,
+    list_records_page,
     replace_record_links,
     fetch_record_links,
     enqueue_ann_op,
 )
-from search import search_like, search_fuzzy, search_fts
+from search import search_like, search_like_page, search_fuzzy, search_fts
 from matching.tokens import extract_tokens
 from matching.resolve import resolve_entry_candidates
+from matching.symspell import sync_symspell
+from matching.pinyin import PinyinUnavailable, sync_pinyin
 from retrieval.graph_first import graph_bfs
+from retrieval.hybrid import search_hybrid, DEFAULT_DEADLINE_MS
+from retrieval.suggest import (
+    suggest,
+    refresh_entries as refresh_suggestions,
+    start_index as start_suggest_index,
+    DEFAULT_BUDGET_MS as SUGGEST_BUDGET_MS,
+)
 from semantic import (
     SemanticUnavailable,
     semantic_search,
@@ -34,7 +46,13 @@ from semantic import (
     semantic_status,
     DEFAULT_MODEL,
 )
-from ann.index_manager import ann_status as ann_status_fn, rebuild_ann_index, ann_search, apply_ann_updates
+from ann.index_manager import (
+    ann_status as ann_status_fn,
+    rebuild_ann_index,
+    ann_search,
+    ann_search_batch,
+    apply_ann_updates,
+)
 
 
 def write_response(res: Dict[str, Any]):
@@ -116,6 +134,15 @@ def _auto_link_entry(db_path: Path, entry_id: int, language: str, word: str, tra
     return created
 
 
+def _sync_entry_indexes(db_path: Path):
+    # write-time upkeep of the on-disk lookup indexes (symspell, pinyin)
+    sync_symspell(db_path)
+    try:
+        sync_pinyin(db_path)
+    except PinyinUnavailable:
+        pass
+
+
 def handle_add_entry(db_path: Path, payload: Dict[str, Any]):
     lang = payload.get("language")
     word = payload.get("word")
@@ -125,6 +152,8 @@ def handle_add_entry(db_path: Path, payload: Dict[str, Any]):
         raise ValueError("missing_fields")
     row_id = add_entry(db_path, lang, word, translation, notes)
     enqueue_ann_op(db_path, row_id, "upsert", "add_entry")
+    _sync_entry_indexes(db_path)
+    refresh_suggestions(db_path, [row_id])
     auto_relations = _auto_link_entry(db_path, row_id, lang, word, translation)
     return {"id": row_id, "linked_relations": auto_relations}
 
@@ -151,6 +180,8 @@ def handle_update_entry(db_path: Path, payload: Dict[str, Any]):
         raise ValueError("missing_fields")
     changed = update_entry(db_path, entry_id, lang, word, translation, notes)
     enqueue_ann_op(db_path, entry_id, "upsert", "update_entry")
+    _sync_entry_indexes(db_path)
+    refresh_suggestions(db_path, [entry_id])
     auto_relations = _auto_link_entry(db_path, entry_id, lang, word, translation)
     return {"updated": changed, "linked_relations": auto_relations}
 
@@ -161,6 +192,7 @@ def handle_delete_entry(db_path: Path, payload: Dict[str, Any]):
         raise ValueError("missing_fields")
     changed = soft_delete_entry(db_path, entry_id)
     enqueue_ann_op(db_path, entry_id, "delete", "delete_entry")
+    refresh_suggestions(db_path, [entry_id])
     return {"deleted": changed}
 
 
@@ -168,6 +200,12 @@ def handle_list_entries(db_path: Path, payload: Dict[str, Any]):
     limit = int(payload.get("limit", 50))
     offset = int(payload.get("offset", 0))
     include_deleted = bool(payload.get("include_deleted", False))
+    if "cursor" in payload:
+        # keyset mode: {"cursor": null} for the first page, then the returned next_cursor
+        entries, next_cursor = list_entries_page(
+            db_path, limit=limit, cursor=payload.get("cursor"), include_deleted=include_deleted
+        )
+        return {"items": entries, "next_cursor": next_cursor}
     entries = list_entries(db_path, limit=limit, offset=offset, include_deleted=include_deleted)
     return entries
 
@@ -200,12 +238,34 @@ def handle_search_entries(db_path: Path, payload: Dict[str, Any]):
     if not q:
         return []
     results = []
-    if mode == "fuzzy":
+    # keyset pagination (like mode only): respond with {"items", "next_cursor"}
+    paged = mode == "like" and "cursor" in payload
+    next_cursor = None
+    hybrid = None
+    if paged:
+        cursor = payload.get("cursor")
+        results, next_cursor = search_like_page(db_path, q, limit, cursor)
+        if not results and not cursor and fallback_fuzzy:
+            results = search_fuzzy(db_path, q, limit, 0)
+    elif mode == "fuzzy":
         results = search_fuzzy(db_path, q, limit, offset)
     elif mode == "fts":
         results = search_fts(db_path, q, limit, offset)
         if not results and fallback_fuzzy:
             results = search_fuzzy(db_path, q, limit, offset)
+    elif mode == "hybrid":
+        if not isinstance(payload.get("budgets_ms") or {}, dict):
+            raise ValueError("budgets_ms must be an object")
+        # {"items", "branches", "elapsed_ms"}: items carry the fused RRF score and per-branch ranks
+        hybrid = search_hybrid(
+            db_path,
+            q,
+            limit,
+            offset,
+            deadline_ms=float(payload.get("deadline_ms", DEFAULT_DEADLINE_MS)),
+            budgets_ms=payload.get("budgets_ms") or None,
+        )
+        results = hybrid["items"]
     elif mode == "semantic":
         try:
             # prefer ANN if available
@@ -231,9 +291,24 @@ def handle_search_entries(db_path: Path, payload: Dict[str, Any]):
         extra_ids = [i for i in related_ids if i not in ids]
         neighbors = get_entries_by_ids(db_path, extra_ids)
         results = results + neighbors
+    if paged:
+        return {"items": results, "next_cursor": next_cursor}
+    if hybrid is not None:
+        return {**hybrid, "items": results}
     return results
 
 
+def handle_semantic_search_batch(db_path: Path, payload: Dict[str, Any]):
+    queries = payload.get("queries")
+    limit = int(payload.get("limit", 10))
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("missing_fields")
+    queries = [q if isinstance(q, str) else str(q) for q in queries]
+    # falls back to semantic_search_batch itself, reusing the encoded queries
+    results = ann_search_batch(db_path, queries, top_k=limit)
+    return [{"q": q, "results": r} for q, r in zip(queries, results)]
+
+
 def _build_annotations(db_path: Path, text: str) -> Dict[str, Any]:
     tokens = extract_tokens(text)
     annotations = []
@@ -285,6 +360,13 @@ def _build_annotations_from_links(text: str, links: List[Dict[str, Any]]):
     return annotations
 
 
+def _replace_record_links(db_path: Path, rid: int, links: List[Dict[str, Any]]):
+    """replace_record_links plus one batched suggest refresh for the entries gaining or losing a link."""
+    old = fetch_record_links(db_path, rid)
+    replace_record_links(db_path, rid, links)
+    refresh_suggestions(db_path, [l["entry_id"] for l in old + links])
+
+
 def _get_record_with_annotations(db_path: Path, rid: int) -> Dict[str, Any]:
     rec = get_record(db_path, rid)
     if not rec:
@@ -301,7 +383,7 @@ def handle_add_record(db_path: Path, payload: Dict[str, Any]):
         raise ValueError("missing_fields")
     rid = add_record(db_path, text)
     built = _build_annotations(db_path, text)
-    replace_record_links(db_path, rid, built["links"])
+    _replace_record_links(db_path, rid, built["links"])
     return {"record_id": rid, "annotations": built["annotations"]}
 
 
@@ -314,7 +396,7 @@ def handle_update_record(db_path: Path, payload: Dict[str, Any]):
     if not ok:
         raise LookupError("not_found")
     built = _build_annotations(db_path, text)
-    replace_record_links(db_path, rid, built["links"])
+    _replace_record_links(db_path, rid, built["links"])
     return {"record_id": rid, "annotations": built["annotations"]}
 
 
@@ -331,6 +413,9 @@ def handle_get_record(db_path: Path, payload: Dict[str, Any]):
 def handle_list_records(db_path: Path, payload: Dict[str, Any]):
     limit = int(payload.get("limit", 50))
     offset = int(payload.get("offset", 0))
+    if "cursor" in payload:
+        records, next_cursor = list_records_page(db_path, limit=limit, cursor=payload.get("cursor"))
+        return {"items": records, "next_cursor": next_cursor}
     return list_records(db_path, limit=limit, offset=offset)
 
 
@@ -350,7 +435,7 @@ def handle_link_record(db_path: Path, payload: Dict[str, Any]):
     text = rec["text"]
     if start < 0 or end > len(text) or start >= end:
         raise ValueError("bad_range")
-    replace_record_links(
+    _replace_record_links(
         db_path,
         rid,
         # replace existing link on same span
@@ -383,7 +468,7 @@ def handle_unlink_record(db_path: Path, payload: Dict[str, Any]):
         raise ValueError("missing_fields")
     links = fetch_record_links(db_path, rid)
     remaining = [l for l in links if not (l["entry_id"] == entry_id and l["start"] == start and l["end"] == end)]
-    replace_record_links(
+    _replace_record_links(
         db_path,
         rid,
         remaining,
@@ -392,6 +477,16 @@ def handle_unlink_record(db_path: Path, payload: Dict[str, Any]):
     return {"ok": True, "annotations": rec_with_ann["annotations"] if rec_with_ann else []}
 
 
+def handle_suggest(db_path: Path, payload: Dict[str, Any]):
+    # prefix autocomplete from the in-memory index, built and synced on a background thread
+    q = payload.get("q", "")
+    limit = int(payload.get("limit", 8))
+    budget_ms = float(payload.get("budget_ms", SUGGEST_BUDGET_MS))
+    if not isinstance(q, str):
+        raise ValueError("q must be a string")
+    return suggest(db_path, q, k=max(1, limit), budget_ms=budget_ms)
+
+
 def handle_resolve_entry(db_path: Path, payload: Dict[str, Any]):
     q = payload.get("q", "")
     language = payload.get("language")
@@ -474,7 +569,8 @@ def handle_semantic_status(db_path: Path, payload: Dict[str, Any]):
 
 def handle_rebuild_embeddings(db_path: Path, payload: Dict[str, Any]):
     model = payload.get("model") or DEFAULT_MODEL
-    count = rebuild_embeddings(db_path, model_name=model)
+    workers = int(payload.get("workers", 1))
+    count = rebuild_embeddings(db_path, model_name=model, workers=workers)
     return {"rebuilt": count}
 
 
@@ -505,6 +601,8 @@ HANDLERS = {
     "upsert_relation": handle_upsert_relation,
     "list_relations": handle_list_relations,
     "search_entries": handle_search_entries,
+    "suggest": handle_suggest,
+    "semantic_search_batch": handle_semantic_search_batch,
     "add_record": handle_add_record,
     "update_record": handle_update_record,
     "get_record": handle_get_record,
@@ -527,6 +625,7 @@ def main():
         return
     db_path = Path(sys.argv[1])
     init_db(db_path)
+    start_suggest_index(db_path)
 
     for raw in sys.stdin:
         raw = raw.strip()
@@ -564,4 +663,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # the PyInstaller build re-runs this entry point in each semantic.pool spawn worker
+    multiprocessing.freeze_support()
     main()
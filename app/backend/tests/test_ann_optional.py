@@ -30,3 +30,25 @@ def test_semantic_fallback_when_ann_missing():
             return
         # if no exception, expect list
         assert isinstance(res, list)
+
+
+def test_ann_batch_fallback_reuses_encoded_queries(monkeypatch):
+    import ann.index_manager as im
+
+    calls = []
+    monkeypatch.setattr(im, "_ensure_model", lambda model, cache: object())
+    monkeypatch.setattr(im, "_encode", lambda model, texts: calls.append(list(texts)) or [[1.0, 0.0] for _ in texts])
+    monkeypatch.setattr(im, "ann_status", lambda db_path, model: {"enabled": False})
+    seen = {}
+
+    def fake_semantic_batch(db_path, queries, top_k, model_name, query_embs):
+        seen["embs"] = query_embs
+        return [[] for _ in queries]
+
+    monkeypatch.setattr(im, "semantic_search_batch", fake_semantic_batch)
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        assert im.ann_search_batch(db_path, ["a", "b"], top_k=3) == [[], []]
+    assert calls == [["a", "b"]]
+    assert seen["embs"] == [[1.0, 0.0], [1.0, 0.0]]
@@ -0,0 +1,47 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import semantic  # noqa: E402
+from semantic import DEFAULT_MODEL, SemanticUnavailable, configure_encoder, _ensure_model  # noqa: E402
+
+
+def test_onnx_backend_falls_back_when_unavailable():
+    configure_encoder(backend="onnx", threads=1)
+    try:
+        try:
+            model = _ensure_model(DEFAULT_MODEL, None)
+        except SemanticUnavailable:
+            # neither onnxruntime nor sentence_transformers installed
+            return
+        assert model.name in ("onnx", "torch")
+    finally:
+        configure_encoder(backend="torch", threads=0)
+
+
+def test_onnx_parity_and_speed_with_dependencies():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("sentence_transformers")
+    from semantic.encoder_backend import TorchEncoder
+    from semantic.onnx_encoder import OnnxEncoder, benchmark_encoders
+
+    texts = ["resilient", "robust", "韧性", "able to recover quickly", "猫", "a small animal"]
+    with tempfile.TemporaryDirectory() as d:
+        cache = Path(d)
+        torch_enc = TorchEncoder(DEFAULT_MODEL, semantic.DEFAULT_CACHE)
+        onnx_enc = OnnxEncoder(DEFAULT_MODEL, cache, threads=2, quantize=False)
+        ref = np.asarray(torch_enc.encode(texts), dtype=np.float32)
+        got = np.asarray(onnx_enc.encode(texts), dtype=np.float32)
+        assert got.shape == ref.shape
+        # same vectors -> cosine scores between pairs must agree
+        assert np.min(np.sum(ref * got, axis=1)) > 0.99
+        assert np.max(np.abs(ref @ ref.T - got @ got.T)) < 0.02
+
+        report = benchmark_encoders({"torch": torch_enc, "onnx": onnx_enc}, texts * 8, repeats=1)
+        assert report["torch"]["texts_per_sec"] > 0
+        assert report["onnx"]["min_cosine_vs_ref"] > 0.99
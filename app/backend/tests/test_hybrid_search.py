@@ -0,0 +1,73 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from db import init_db, add_entry  # noqa: E402
+from server import handle_search_entries  # noqa: E402
+from retrieval import hybrid  # noqa: E402
+from retrieval.hybrid import rrf_fuse  # noqa: E402
+
+
+def test_rrf_fuse_rewards_agreement():
+    fused = rrf_fuse(
+        {
+            "fts": [{"id": 1, "word": "a"}, {"id": 2, "word": "b"}],
+            "fuzzy": [{"id": 2, "word": "b"}, {"id": 3, "word": "c"}],
+        }
+    )
+    assert [r["id"] for r in fused] == [2, 1, 3]
+    assert fused[0]["ranks"] == {"fts": 2, "fuzzy": 1}
+    assert fused[0]["score"] == 1.0 / 62 + 1.0 / 61
+
+
+def test_hybrid_returns_at_deadline_with_finished_branches(monkeypatch):
+    def slow_ann(db_path, q, depth):
+        time.sleep(0.5)
+        return []
+
+    monkeypatch.setitem(hybrid.BRANCHES, "ann", slow_ann)
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        rid = add_entry(db_path, "en", "resilient", "韧性", "")
+        add_entry(db_path, "en", "fragile", "脆弱", "")
+
+        start = time.perf_counter()
+        res = handle_search_entries(db_path, {"q": "resilient", "mode": "hybrid", "deadline_ms": 100})
+        assert time.perf_counter() - start < 0.4
+        assert res["branches"]["ann"]["status"] == "timeout"
+        assert res["branches"]["fts"]["status"] == "ok"
+        assert res["items"][0]["id"] == rid
+        assert res["items"][0]["match_type"] == "hybrid"
+        assert set(res["items"][0]["ranks"]) >= {"fts", "fuzzy"}
+
+
+def test_hybrid_skips_saturated_branch_and_releases_slots(monkeypatch):
+    def slow_ann(db_path, q, depth):
+        time.sleep(0.3)
+        return []
+
+    monkeypatch.setitem(hybrid.BRANCHES, "ann", slow_ann)
+    # let branches abandoned by earlier tests finish and hand back their slots
+    for _ in range(40):
+        if not any(hybrid._INFLIGHT.values()):
+            break
+        time.sleep(0.05)
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        add_entry(db_path, "en", "resilient", "韧性", "")
+
+        payload = {"q": "resilent", "mode": "hybrid", "deadline_ms": 20}
+        for _ in range(hybrid.MAX_INFLIGHT_PER_BRANCH):
+            assert handle_search_entries(db_path, payload)["branches"]["ann"]["status"] == "timeout"
+        res = handle_search_entries(db_path, payload)
+        assert res["branches"]["ann"]["status"] == "saturated"
+        # the fuzzy branch answers the typo from the symspell index
+        assert res["items"] and res["items"][0]["ranks"].get("fuzzy") == 1
+
+        time.sleep(0.4)
+        assert handle_search_entries(db_path, payload)["branches"]["ann"]["status"] == "timeout"
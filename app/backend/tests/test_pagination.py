@@ -0,0 +1,80 @@
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from db import init_db, add_entry, add_record, encode_cursor, soft_delete_entry  # noqa: E402
+from server import handle_list_entries, handle_list_records, handle_search_entries  # noqa: E402
+
+
+def _walk(handler, db_path, payload):
+    seen = []
+    cursor = None
+    while True:
+        page = handler(db_path, {**payload, "cursor": cursor})
+        seen.extend(r["id"] for r in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_list_entries_cursor_walks_every_row_once_with_ties():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        ids = [add_entry(db_path, "en", f"word{i}", f"t{i}") for i in range(7)]
+        soft_delete_entry(db_path, ids[3])
+        # identical updated_at values must still page deterministically by id
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE entries SET updated_at = 100.0 WHERE id IN (?, ?, ?)", ids[:3])
+        conn.commit()
+        conn.close()
+
+        seen = _walk(handle_list_entries, db_path, {"limit": 2})
+        assert sorted(seen) == sorted(i for i in ids if i != ids[3])
+        assert len(seen) == len(set(seen))
+        assert seen[-3:] == [ids[2], ids[1], ids[0]]
+
+        offset_page = handle_list_entries(db_path, {"limit": 2, "offset": 0})
+        assert isinstance(offset_page, list) and len(offset_page) == 2
+
+
+def test_list_records_and_search_like_cursor():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        rids = [add_record(db_path, f"record {i}") for i in range(5)]
+        assert sorted(_walk(handle_list_records, db_path, {"limit": 2})) == sorted(rids)
+
+        hits = [add_entry(db_path, "en", f"apple{i}", "") for i in range(5)]
+        add_entry(db_path, "en", "pear", "")
+        assert sorted(_walk(handle_search_entries, db_path, {"q": "apple", "limit": 2})) == sorted(hits)
+
+
+def test_invalid_cursor_rejected():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        with pytest.raises(ValueError):
+            handle_list_entries(db_path, {"cursor": "not-a-cursor"})
+
+
+def test_null_updated_at_cursor_rejected_and_backfilled():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        ids = [add_entry(db_path, "en", f"word{i}", "") for i in range(3)]
+        with pytest.raises(ValueError):
+            handle_list_entries(db_path, {"cursor": encode_cursor(None, ids[1])})
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE entries SET updated_at = NULL WHERE id = ?", (ids[0],))
+        conn.execute("PRAGMA user_version = 13")
+        conn.commit()
+        conn.close()
+        init_db(db_path)
+        assert sorted(_walk(handle_list_entries, db_path, {"limit": 1})) == sorted(ids)
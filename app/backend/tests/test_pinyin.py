@@ -0,0 +1,68 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from db import init_db, add_entry, update_entry  # noqa: E402
+from matching.pinyin import lookup_pinyin, normalize_query  # noqa: E402
+from matching.resolve import resolve_entry_candidates  # noqa: E402
+
+
+def test_normalize_query():
+    assert normalize_query("Ren Xing") == "renxing"
+    assert normalize_query("lü") == "lv"
+    assert normalize_query("ren4 xing4") == "ren4xing4"
+    assert normalize_query("韧性") is None
+
+
+def test_normalize_query_tone_marks():
+    pytest.importorskip("pypinyin")
+    assert normalize_query("hǎo") == "hao3"
+    assert normalize_query("xiézuò") == "xiezuo"
+
+
+def test_pinyin_lookup_tones_plain_initials():
+    pytest.importorskip("pypinyin")
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        en = add_entry(db_path, "en", "resilient", "韧性, 弹性")
+        zh = add_entry(db_path, "zh", "协作", "collaboration")
+
+        assert [c["entry_id"] for c in lookup_pinyin(db_path, "renxing")] == [en]
+        assert lookup_pinyin(db_path, "ren4xing4")[0]["match_type"] == "pinyin_tone"
+        assert lookup_pinyin(db_path, "tanxing")[0]["entry_id"] == en
+        assert lookup_pinyin(db_path, "xz")[0]["match_type"] == "pinyin_initials"
+        assert lookup_pinyin(db_path, "xiézuò")[0]["entry_id"] == zh
+        assert lookup_pinyin(db_path, "xié zuò")[0]["match_type"] == "pinyin_tone"
+
+        update_entry(db_path, zh, "zh", "合作", "cooperation")
+        assert lookup_pinyin(db_path, "xiezuo") == []
+        assert lookup_pinyin(db_path, "hezuo")[0]["entry_id"] == zh
+
+        resolved = resolve_entry_candidates(db_path, "hezuo", "en", top_k=3)
+        assert resolved["best"]["entry_id"] == zh
+        assert resolved["best"]["match_type"] == "pinyin_plain"
+
+
+def test_resolve_pinyin_stage_does_not_override_english_tokens():
+    pytest.importorskip("pypinyin")
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        man = add_entry(db_path, "en", "man", "男人")
+        men = add_entry(db_path, "zh", "门", "door")
+        rx = add_entry(db_path, "en", "resilient", "韧性")
+
+        # record annotation hints latin tokens as "en": the fuzzy English match wins
+        resolved = resolve_entry_candidates(db_path, "men", "en", top_k=3)
+        assert resolved["best"]["entry_id"] == man
+        assert men not in [c["entry_id"] for c in resolved["candidates"]]
+        # without an English hit the pinyin stage still answers
+        assert resolve_entry_candidates(db_path, "renxing", "en")["best"]["entry_id"] == rx
+        assert resolve_entry_candidates(db_path, "men", None)["best"]["entry_id"] == men
+        # initials-only matches are never auto-link candidates
+        assert resolve_entry_candidates(db_path, "rx", None)["candidates"] == []
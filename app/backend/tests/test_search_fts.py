@@ -1,3 +1,4 @@
+import sqlite3
 import sys
 import tempfile
 from pathlib import Path
@@ -35,3 +36,49 @@ def test_search_fts_order_and_match_type():
         res = search_fts(db_path, "abc*", limit=10, offset=0)
         assert len(res) >= 2
         assert all(r.get("match_type") == "fts" for r in res)
+
+
+def test_search_fts_substring_via_trigram_index():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        rid = add_entry(db_path, "en", "resilient", "韧性很强", "")
+        add_entry(db_path, "zh", "协作", "collaboration", "")
+
+        # unicode61 keeps "韧性很强" as one token; the trigram index finds the substring
+        assert [r["id"] for r in search_fts(db_path, "韧性很", limit=10, offset=0)] == [rid]
+        assert [r["id"] for r in search_fts(db_path, "韧性", limit=10, offset=0)] == [rid]
+        assert [r["id"] for r in search_fts(db_path, "silien", limit=10, offset=0)] == [rid]
+        assert search_fts(db_path, "协作", limit=10, offset=0)[0]["word"] == "协作"
+
+
+def test_two_char_cjk_queries_use_bigram_index():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        rid = add_entry(db_path, "en", "teamwork", "团队协作", "")
+        assert [r["id"] for r in search_fts(db_path, "协作", limit=10, offset=0)] == [rid]
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT entry_id FROM entry_bigram WHERE gram = '协作'").fetchall() == [(rid,)]
+        conn.execute("UPDATE entries SET translation = '合作' WHERE id = ?", (rid,))
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM entry_bigram WHERE gram = '协作'").fetchone()[0] == 0
+        conn.close()
+        assert search_fts(db_path, "协作", limit=10, offset=0) == []
+        assert [r["id"] for r in search_fts(db_path, "合作", limit=10, offset=0)] == [rid]
+
+
+def test_multi_term_cjk_queries():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        e1 = add_entry(db_path, "en", "resilient", "韧性，弹性", "")
+        e2 = add_entry(db_path, "en", "sturdy", "强壮", "")
+
+        assert [r["id"] for r in search_fts(db_path, "韧性 弹性", limit=10, offset=0)] == [e1]
+        assert sorted(r["id"] for r in search_fts(db_path, "韧性 OR 强壮", limit=10, offset=0)) == [e1, e2]
+        assert search_fts(db_path, "韧性 强壮", limit=10, offset=0) == []
+        assert [r["id"] for r in search_fts(db_path, "强壮 OR 韧性 NOT 弹性", limit=10, offset=0)] == [e2]
+        # mixed scripts and a one-character term
+        assert [r["id"] for r in search_fts(db_path, "resil 韧", limit=10, offset=0)] == [e1]
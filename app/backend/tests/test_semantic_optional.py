@@ -5,7 +5,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from db import init_db, add_entry  # noqa: E402
-from server import handle_search_entries  # noqa: E402
+from server import handle_search_entries, handle_semantic_search_batch  # noqa: E402
 
 
 def test_semantic_disabled_graceful():
@@ -40,3 +40,33 @@ def test_semantic_with_dependency():
         res = handle_search_entries(db_path, {"q": "resilient", "mode": "semantic", "limit": 5})
         assert isinstance(res, list)
         assert len(res) >= 1
+
+
+def test_semantic_search_batch_requires_queries():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        try:
+            handle_semantic_search_batch(db_path, {"queries": []})
+        except ValueError as exc:
+            assert str(exc) == "missing_fields"
+        else:
+            raise AssertionError("expected missing_fields")
+
+
+def test_semantic_search_batch_with_dependency():
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        import pytest
+        pytest.skip("sentence_transformers not installed")
+
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        e1 = add_entry(db_path, "en", "resilient", "韧性", "able to recover quickly")
+        e2 = add_entry(db_path, "en", "cat", "猫", "animal")
+        res = handle_semantic_search_batch(db_path, {"queries": ["resilient", "cat"], "limit": 1})
+        assert [r["q"] for r in res] == ["resilient", "cat"]
+        assert res[0]["results"][0]["id"] == e1
+        assert res[1]["results"][0]["id"] == e2
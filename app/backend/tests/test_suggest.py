@@ -0,0 +1,123 @@
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from db import init_db, add_entry, add_record, replace_record_links  # noqa: E402
+from server import handle_suggest, handle_add_entry, handle_update_entry, handle_delete_entry  # noqa: E402
+from retrieval.suggest import TOP_CACHE, PrefixIndex, get_index, suggest, sync_index  # noqa: E402
+
+
+def _words(res):
+    return [r["word"] for r in res["items"]]
+
+
+def test_suggest_prefix_weights_and_incremental_writes():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        apple = add_entry(db_path, "en", "apple", "苹果")
+        add_entry(db_path, "en", "application", "应用, 申请")
+        rid = add_record(db_path, "apple apple")
+        replace_record_links(
+            db_path,
+            rid,
+            [{"entry_id": apple, "start": 0, "end": 5, "surface": "apple", "match_type": "exact", "score": 1.0}],
+        )
+
+        assert get_index(db_path) is not None
+        res = handle_suggest(db_path, {"q": "App", "limit": 5})
+        assert _words(res) == ["apple", "application"]
+        assert _words(handle_suggest(db_path, {"q": "申"})) == ["application"]
+
+        # writes through the server update the loaded index without a rebuild
+        new_id = handle_add_entry(db_path, {"language": "en", "word": "apricot", "translation": ""})["id"]
+        assert "apricot" in _words(handle_suggest(db_path, {"q": "ap"}))
+        handle_update_entry(db_path, {"id": new_id, "language": "en", "word": "banana", "translation": ""})
+        assert _words(handle_suggest(db_path, {"q": "ba"})) == ["banana"]
+        assert "apricot" not in _words(handle_suggest(db_path, {"q": "ap"}))
+        handle_delete_entry(db_path, {"id": new_id})
+        assert handle_suggest(db_path, {"q": "ban"})["items"] == []
+
+
+def test_suggest_is_fast_and_bounded_on_large_index():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        conn = sqlite3.connect(db_path)
+        now = time.time()
+        conn.executemany(
+            "INSERT INTO entries(language, word, translation, notes, created_at, updated_at) VALUES ('en', ?, '', '', ?, ?)",
+            [(f"word{i:05d}", now, now - i) for i in range(20000)],
+        )
+        conn.commit()
+        conn.close()
+
+        index = get_index(db_path)
+        assert len(index) == 20000
+        res = index.suggest("wo", k=10)
+        # newest first by recency weight; short prefixes answer from the precomputed list
+        assert [r["word"] for r in res["items"]][:2] == ["word00000", "word00001"]
+        assert not res["truncated"]
+        res = index.suggest("word1", k=10)
+        assert len(res["items"]) == 10
+        assert all(r["word"].startswith("word1") for r in res["items"])
+        assert index.suggest("word00042", k=3)["items"][0]["word"] == "word00042"
+
+
+def test_suggest_picks_up_links_written_outside_the_server():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        add_entry(db_path, "en", "cat", "猫")
+        catch = add_entry(db_path, "en", "catch", "抓")
+        index = get_index(db_path)
+        assert _words(index.suggest("cat")) == ["cat", "catch"]
+
+        rid = add_record(db_path, "catch catch catch")
+        links = [
+            {"entry_id": catch, "start": i, "end": i + 5, "surface": "catch", "match_type": "exact", "score": 1.0}
+            for i in (0, 6, 12)
+        ]
+        replace_record_links(db_path, rid, links)
+        # the background thread syncs once a second; suggest() itself never touches the DB
+        deadline = time.monotonic() + 5.0
+        while _words(index.suggest("cat")) != ["catch", "cat"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _words(index.suggest("cat")) == ["catch", "cat"]
+        # nothing new since the last sync
+        assert sync_index(db_path) == 0
+
+
+def test_suggest_answers_while_building():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        add_entry(db_path, "en", "dog", "狗")
+        res = suggest(db_path, "do")
+        assert res["items"] == [] and res["building"]
+        assert _words(get_index(db_path).suggest("do")) == ["dog"]
+
+
+def test_incremental_top_lists_match_a_full_rerank():
+    rng = random.Random(7)
+    index = PrefixIndex()
+    now = time.time()
+    words = [f"{a}{b}{i}" for a in "ab" for b in "ab" for i in range(40)]
+    index.apply([(i, "en", w, "", now - rng.randrange(90 * 86400), rng.randrange(5)) for i, w in enumerate(words)])
+    index.rebuild_top()
+    for _ in range(300):
+        eid = rng.randrange(len(words) + 20)
+        if rng.random() < 0.25:
+            index.apply(removals=[eid])
+        else:
+            word = rng.choice("ab") + rng.choice("ab") + str(eid)
+            index.apply([(eid, "en", word, "", now - rng.randrange(90 * 86400), rng.randrange(8))])
+    expected = {}
+    for prefix in index._top:
+        expected[prefix] = [eid for _, eid in index._rank(prefix, TOP_CACHE, now)[0]]
+    assert {p: set(t) for p, t in index._top.items()} == {p: set(t) for p, t in expected.items()}
@@ -0,0 +1,60 @@
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from db import init_db, add_entry, update_entry, soft_delete_entry  # noqa: E402
+from matching.fuzzy import resolve_fuzzy  # noqa: E402
+from matching.symspell import deletes, edit_distance, lookup_symspell, sync_symspell  # noqa: E402
+
+
+def test_edit_distance_and_deletes():
+    assert edit_distance("helo", "hello", 2) == 1
+    assert edit_distance("recieve", "receive", 2) == 1  # transposition
+    assert edit_distance("cat", "elephant", 2) == 3
+    assert deletes("cat", 1) == {"cat", "at", "ct", "ca"}
+
+
+def test_symspell_lookup_tracks_entry_writes():
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        rid = add_entry(db_path, "en", "resilient", "韧性")
+        zh = add_entry(db_path, "zh", "协作", "collaboration, teamwork")
+        add_entry(db_path, "en", "cat", "猫")
+
+        hits = lookup_symspell(db_path, "resilent", top_k=5)
+        assert [h["entry_id"] for h in hits] == [rid]
+        assert hits[0]["distance"] == 1
+        assert lookup_symspell(db_path, "colaboration")[0]["entry_id"] == zh
+        assert lookup_symspell(db_path, "cot")[0]["match_type"] == "fuzzy_word"
+        assert lookup_symspell(db_path, "韧性") is None
+
+        # index persists in the DB and follows updates/deletes
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM entry_symspell").fetchone()[0] > 0
+        conn.close()
+        update_entry(db_path, rid, "en", "robust", "韧性")
+        assert sync_symspell(db_path) == 1
+        assert lookup_symspell(db_path, "resilent") == []
+        assert lookup_symspell(db_path, "robst")[0]["entry_id"] == rid
+        soft_delete_entry(db_path, rid)
+        assert lookup_symspell(db_path, "robst") == []
+
+        assert resolve_fuzzy(db_path, "teamwrok")[0]["entry_id"] == zh
+
+
+def test_resolve_fuzzy_miss_does_not_scan(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        db_path = Path(d) / "test.db"
+        init_db(db_path)
+        add_entry(db_path, "en", "resilient", "韧性")
+
+        def no_scan(*args, **kwargs):
+            raise AssertionError("SequenceMatcher scan ran for an indexable query")
+
+        monkeypatch.setattr("matching.fuzzy.SequenceMatcher", no_scan)
+        assert resolve_fuzzy(db_path, "zzzzqqq") == []
+        assert resolve_fuzzy(db_path, "resilent")[0]["match_type"] == "fuzzy_word"
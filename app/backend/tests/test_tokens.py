@@ -31,5 +31,6 @@ def test_resolve_entry_exact_and_fuzzy():
         exact = resolve_entry_candidates(db_path, "resilient", "en", top_k=5)
         assert exact["best"] and exact["best"]["entry_id"] is not None
 
-        fuzzy = resolve_entry_candidates(db_path, "renxing", None, top_k=5)
-        assert fuzzy["candidates"], "should return fuzzy candidates even for transliteration-like strings"
+        fuzzy = resolve_entry_candidates(db_path, "resilent", None, top_k=5)
+        assert fuzzy["candidates"], "should return fuzzy candidates for misspelled words"
+        assert fuzzy["best"]["match_type"].startswith("fuzzy_")
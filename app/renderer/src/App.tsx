@@ -15,6 +15,8 @@ declare global {
           | "list_relations"
           | "upsert_relation"
           | "search_entries"
+          | "suggest"
+          | "semantic_search_batch"
           | "add_record"
           | "update_record"
           | "get_record"
@@ -91,6 +93,7 @@ function App() {
   const [translation, setTranslation] = useState("");
   const [notes, setNotes] = useState("");
   const [entries, setEntries] = useState<Entry[]>([]);
+  const [entriesCursor, setEntriesCursor] = useState<string | null>(null);
   const [selectedId, setSelectedId] = useState<number | null>(null);
   const [detail, setDetail] = useState<Entry | null>(null);
   const [relations, setRelations] = useState<Relation[]>([]);
@@ -99,7 +102,9 @@ function App() {
   const [editLanguage, setEditLanguage] = useState<"en" | "zh">("en");
   const [editNotes, setEditNotes] = useState("");
   const [query, setQuery] = useState("");
+  const [suggestions, setSuggestions] = useState<{ id: number; word: string; translation: string }[]>([]);
   const [records, setRecords] = useState<RecordItem[]>([]);
+  const [recordsCursor, setRecordsCursor] = useState<string | null>(null);
   const [recordText, setRecordText] = useState("");
   const [selectedRecord, setSelectedRecord] = useState<RecordItem | null>(null);
   const [candidateAnn, setCandidateAnn] = useState<{ recordId: number; ann: Annotation } | null>(null);
@@ -108,7 +113,7 @@ function App() {
     { entry_id: number; word: string; language: string; score: number; match_type: string }[]
   >([]);
   const [candidateError, setCandidateError] = useState<string | null>(null);
-  const [searchMode, setSearchMode] = useState<"like" | "fts" | "fuzzy" | "semantic">("fts");
+  const [searchMode, setSearchMode] = useState<"like" | "fts" | "fuzzy" | "semantic" | "hybrid">("fts");
   const [logPath, setLogPath] = useState("");
   const [logTail, setLogTail] = useState<string[]>([]);
   const [logFileTail, setLogFileTail] = useState("");
@@ -123,9 +128,14 @@ function App() {
     setStatus(`Received: ${res}`);
   };
 
-  const loadEntries = async () => {
-    const res = await window.api.backendRequest("list_entries", { limit: 100, offset: 0 });
-    if (res?.ok) setEntries(res.data || []);
+  // keyset paging: {cursor: null} starts over, passing next_cursor back appends the following page
+  const loadEntries = async (more = false) => {
+    const res = await window.api.backendRequest("list_entries", { limit: 100, cursor: more ? entriesCursor : null });
+    if (res?.ok) {
+      const items: Entry[] = res.data?.items || [];
+      setEntries((prev) => (more ? [...prev, ...items] : items));
+      setEntriesCursor(res.data?.next_cursor ?? null);
+    }
   };
 
   const handleAdd = async () => {
@@ -219,10 +229,12 @@ function App() {
     }
   };
 
-  const loadRecords = async () => {
-    const res = await window.api.backendRequest("list_records", { limit: 50, offset: 0 });
+  const loadRecords = async (more = false) => {
+    const res = await window.api.backendRequest("list_records", { limit: 50, cursor: more ? recordsCursor : null });
     if (res?.ok) {
-      setRecords(res.data || []);
+      const items: RecordItem[] = res.data?.items || [];
+      setRecords((prev) => (more ? [...prev, ...items] : items));
+      setRecordsCursor(res.data?.next_cursor ?? null);
     }
   };
 
@@ -266,7 +278,11 @@ function App() {
         window.api
           .backendRequest("search_entries", { q: query, mode: searchMode, limit: 100, offset: 0 })
           .then((res) => {
-            if (res?.ok) setEntries(res.data || []);
+            // hybrid mode answers {items, branches, elapsed_ms}
+            if (res?.ok) {
+              setEntries(Array.isArray(res.data) ? res.data : res.data?.items || []);
+              setEntriesCursor(null);
+            }
             else if (res?.error?.code === "SEMANTIC_DISABLED") {
               alert("Semantic search disabled or missing dependency.");
             }
@@ -276,6 +292,17 @@ function App() {
     return () => clearTimeout(timer);
   }, [query, searchMode]);
 
+  useEffect(() => {
+    // prefix autocomplete is served from memory, so it runs on every keystroke without the debounce
+    if (!query) {
+      setSuggestions([]);
+      return;
+    }
+    window.api.backendRequest("suggest", { q: query, limit: 8 }).then((res) => {
+      if (res?.ok) setSuggestions(res.data?.items || []);
+    });
+  }, [query]);
+
   useEffect(() => {
     loadEntries();
     loadRecords();
@@ -534,7 +561,7 @@ function App() {
           placeholder="输入中英混合文本，自动尝试链接到已有词条..."
         />
         <button onClick={handleAddRecord}>Save record</button>
-        <button onClick={loadRecords} style={{ marginLeft: 8 }}>
+        <button onClick={() => loadRecords()} style={{ marginLeft: 8 }}>
           Refresh
         </button>
         <div style={{ marginTop: 12 }}>
@@ -547,6 +574,7 @@ function App() {
               <span title={r.text}>{r.text.slice(0, 40)}{r.text.length > 40 ? "..." : ""}</span>
             </div>
           ))}
+          {recordsCursor && <button onClick={() => loadRecords(true)}>Load more</button>}
         </div>
         {selectedRecord && (
           <div style={{ marginTop: 12, padding: 8, border: "1px solid #ddd" }}>
@@ -610,15 +638,24 @@ function App() {
           placeholder="Search..."
           value={query}
           onChange={(e) => setQuery(e.target.value)}
+          list="entry-suggestions"
           style={{ marginRight: 8 }}
         />
+        <datalist id="entry-suggestions">
+          {suggestions.map((s) => (
+            <option key={s.id} value={s.word}>
+              {s.translation}
+            </option>
+          ))}
+        </datalist>
         <select value={searchMode} onChange={(e) => setSearchMode(e.target.value as any)} style={{ marginRight: 8 }}>
           <option value="fts">FTS</option>
           <option value="like">Like</option>
           <option value="fuzzy">Fuzzy</option>
           <option value="semantic">Semantic</option>
+          <option value="hybrid">Hybrid</option>
         </select>
-          <button onClick={loadEntries} style={{ marginBottom: 8 }}>
+          <button onClick={() => loadEntries()} style={{ marginBottom: 8 }}>
             Refresh
           </button>
         <ul>
@@ -632,6 +669,7 @@ function App() {
             </li>
           ))}
         </ul>
+        {entriesCursor && <button onClick={() => loadEntries(true)}>Load more</button>}
       </div>
 
       {detail && (